@@ -0,0 +1,713 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+
+# -----------
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2021 Troy Williams
+
+# uuid:   c4e1b7d2-0c52-11ec-9a03-0242ac130003
+# author: Troy Williams
+# email:  troy.williams@bluebill.net
+# date:   2021-08-29
+# -----------
+
+"""
+The build manifest records, for every file in the output folder, the
+fingerprint of what produced it: the hash of the staged Markdown input,
+the pandoc arguments, the hashes of the files the arguments reference
+(defaults, templates, includes, CSS) and the pandoc version. A document
+whose fingerprint hasn't changed, and whose output still exists, doesn't
+have to be transformed again.
+
+The OutputCache stores the pandoc outputs by fingerprint so they can be
+shared between checkouts, worktrees and branches of the same documents.
+"""
+
+# ------------
+# System Modules - Included with Python
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+
+from functools import lru_cache
+from pathlib import Path
+
+# ------------
+# 3rd Party - From pip
+
+import yaml
+
+# ------------
+# Custom Modules
+
+from .cache import file_digest
+
+# -------------
+
+# The name of the manifest file written to the output folder
+BUILD_MANIFEST_NAME = ".build-manifest.json"
+
+# Increment this whenever the format of the manifest changes
+BUILD_MANIFEST_SCHEMA_VERSION = 1
+
+# Arguments that change on every run without changing the output in a
+# way that matters, they are left out of the fingerprint.
+VOLATILE_ARGUMENTS = ("--variable=build_date:",)
+
+# Arguments that name a location in the checkout. They are part of the
+# fingerprint but not of the OutputCache key, which is shared by every
+# checkout.
+LOCATION_ARGUMENTS = ("--resource-path=",)
+
+
+@lru_cache(maxsize=None)
+def pandoc_version(pandoc="pandoc"):
+    """
+    Return the first line of `pandoc --version`, i.e. `pandoc 2.14.1`,
+    or None if pandoc can't be run.
+    """
+
+    try:
+        result = subprocess.run(
+            [pandoc, "--version"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            universal_newlines=True,
+        )
+
+    except OSError:
+        return None
+
+    lines = result.stdout.splitlines()
+
+    return lines[0].strip() if lines else None
+
+
+def defaults_files(defaults):
+    """
+    Return the files referenced by a pandoc defaults file (templates,
+    filters, includes, CSS, etc.). Every string value that names an
+    existing file is returned. Relative paths are tried against the
+    current folder and the folder containing the defaults file (pandoc
+    expands `${.}` to that folder).
+
+    # Parameters
+
+    defaults:pathlib.Path
+        - The defaults (YAML) file.
+
+    # Return
+
+    A sorted list of pathlib.Path objects.
+
+    """
+
+    try:
+        with defaults.open("r", encoding="utf-8") as fin:
+            data = yaml.safe_load(fin)
+
+    except (OSError, yaml.YAMLError):
+        return []
+
+    folder = defaults.parent
+    found = set()
+
+    def walk(value):
+
+        if isinstance(value, dict):
+            for v in value.values():
+                walk(v)
+
+        elif isinstance(value, list):
+            for v in value:
+                walk(v)
+
+        elif isinstance(value, str) and value and "\n" not in value:
+
+            value = value.replace("${.}", str(folder))
+
+            for candidate in (Path(value), folder.joinpath(value)):
+
+                try:
+                    if candidate.is_file():
+                        found.add(candidate.resolve())
+                        break
+
+                except (OSError, ValueError):
+                    break
+
+    walk(data)
+
+    return sorted(found)
+
+
+class DigestWriter:
+    """
+    A write only, text, file object that hashes what is written to it.
+    It fingerprints a document that is piped to pandoc without writing
+    it to a staging file.
+
+    # Usage
+
+    ```
+    digest = DigestWriter()
+    md.write(digest, transform=md_to_html_links)
+
+    manifest.fingerprint(cmd, output_file=of, input_digest=digest.hexdigest())
+    ```
+
+    """
+
+    def __init__(self):
+        self._hash = hashlib.sha256()
+
+        # the number of bytes written
+        self.size = 0
+
+    def write(self, s):
+
+        data = s.encode("utf-8")
+
+        self._hash.update(data)
+        self.size += len(data)
+
+        return len(s)
+
+    def hexdigest(self):
+        return self._hash.hexdigest()
+
+
+class BuildManifest:
+    """
+    The fingerprints of the files in an output folder. It is stored as
+    JSON, `BUILD_MANIFEST_NAME`, in the output folder.
+
+    # Usage
+
+    ```
+    manifest = BuildManifest(config["output.path"])
+
+    fingerprint = manifest.fingerprint(cmd, input_file=staged, output_file=of)
+
+    if not manifest.is_current(of, fingerprint):
+        run_cmd(cmd)
+        manifest.record(of, fingerprint)
+
+    manifest.save()
+    ```
+
+    # NOTE
+
+    Only the entries that were checked or recorded during the run are
+    saved, outputs that are no longer built drop out of the manifest. A
+    partial build saves with `prune=False` to keep the other entries.
+
+    """
+
+    def __init__(self, output, **kwargs):
+        """
+
+        # Parameters
+
+        output:pathlib.Path
+            - The output folder.
+
+        # Parameters (kwargs)
+
+        pandoc:str
+            - The pandoc executable, used to determine the version.
+            - Default - "pandoc"
+
+        """
+
+        self.output = output
+        self.path = output.joinpath(BUILD_MANIFEST_NAME)
+
+        self.pandoc_version = pandoc_version(kwargs.get("pandoc", "pandoc"))
+
+        self.entries = self._load()
+
+        # the entries checked or recorded during this run
+        self._seen = {}
+
+        # path -> digest of the files hashed during this run, the same
+        # templates are referenced by every command
+        self._digests = {}
+
+    def _load(self):
+
+        try:
+            with self.path.open("r", encoding="utf-8") as fin:
+                data = json.load(fin)
+
+        except (OSError, ValueError):
+            return {}
+
+        if data.get("schema") != BUILD_MANIFEST_SCHEMA_VERSION:
+            return {}
+
+        return data.get("outputs", {})
+
+    def _key(self, output_file):
+        return Path(os.path.relpath(output_file, self.output)).as_posix()
+
+    def _digest(self, path):
+
+        key = str(path)
+
+        if key not in self._digests:
+            self._digests[key] = file_digest(Path(path))
+
+        return self._digests[key]
+
+    def _argument(self, arg, files):
+        """
+        Replace a file argument, `path` or `--switch=path`, with the
+        hash of the file. Returns the argument unchanged if it doesn't
+        name a file.
+        """
+
+        switch, sep, value = arg.partition("=") if arg.startswith("-") else ("", "", arg)
+
+        if not value or "\n" in value:
+            return arg
+
+        try:
+            if not os.path.isfile(value):
+                return arg
+
+        except (OSError, ValueError):
+            return arg
+
+        digest = self._digest(value)
+
+        if value.endswith((".yaml", ".yml")):
+            for f in defaults_files(Path(value)):
+                files[str(f)] = self._digest(f)
+
+        return f"{switch}{sep}sha256:{digest}"
+
+    def fingerprint(
+        self, cmd, input_file=None, output_file=None, dependencies=(), input_digest=None
+    ):
+        """
+        Construct the fingerprint of a pandoc command.
+
+        # Parameters
+
+        cmd:list
+            - The pandoc command (argument vector).
+
+        input_file:pathlib.Path
+            - The staged Markdown file, it is represented by its hash.
+            - Default - None - the input is piped to pandoc
+
+        output_file:pathlib.Path
+            - The output file, it is left out of the fingerprint.
+
+        dependencies:iterable(pathlib.Path)
+            - Other files the output depends on that aren't arguments,
+              i.e. the CSS files.
+            - Default - ()
+
+        input_digest:str
+            - The hash of the input when it is piped to pandoc rather
+              than read from `input_file`, see `DigestWriter`.
+            - Default - None
+
+        # Return
+
+        A dictionary that can be compared with, and written as, JSON:
+
+        - input - the hash of the staged input
+        - command - the arguments, volatile arguments are removed and
+          arguments naming files are replaced by their hashes
+        - files - the hashes of the files referenced by the defaults
+          files and the `dependencies`
+        - pandoc - the pandoc version
+
+        """
+
+        files = {}
+        command = []
+
+        placeholders = {}
+
+        if input_file:
+            placeholders[str(input_file)] = "<input>"
+
+        if output_file:
+            placeholders[str(output_file)] = "<output>"
+
+        for arg in cmd:
+
+            arg = str(arg)
+
+            if arg.startswith(VOLATILE_ARGUMENTS):
+                continue
+
+            if arg in placeholders:
+                command.append(placeholders[arg])
+                continue
+
+            command.append(self._argument(arg, files))
+
+        for f in dependencies:
+            if Path(f).is_file():
+                files[str(f)] = self._digest(f)
+
+        return {
+            "input": input_digest or (self._digest(input_file) if input_file else None),
+            "command": command,
+            "files": dict(sorted(files.items())),
+            "pandoc": self.pandoc_version,
+        }
+
+    def is_current(self, output_file, fingerprint):
+        """
+        Is the output up to date? It has to exist and have been built
+        from the same fingerprint.
+        """
+
+        key = self._key(output_file)
+
+        if self.entries.get(key) == fingerprint and Path(output_file).exists():
+            self._seen[key] = fingerprint
+            return True
+
+        return False
+
+    def record(self, output_file, fingerprint):
+        """
+        Record the fingerprint the output was built from.
+        """
+
+        self._seen[self._key(output_file)] = fingerprint
+
+    def save(self, prune=True):
+        """
+        Write the manifest to the output folder.
+
+        # Parameters
+
+        prune:bool
+            - Drop the entries that weren't checked or recorded during
+              the run. Use False for a partial build.
+            - Default - True
+
+        """
+
+        self.output.mkdir(parents=True, exist_ok=True)
+
+        outputs = dict(self._seen) if prune else self.entries | self._seen
+
+        data = {
+            "schema": BUILD_MANIFEST_SCHEMA_VERSION,
+            "pandoc": self.pandoc_version,
+            "outputs": dict(sorted(outputs.items())),
+        }
+
+        # write to a temporary file and move it into place so an
+        # interrupted build doesn't leave a partial manifest
+        fd, tmp = tempfile.mkstemp(dir=self.output, suffix=".tmp")
+
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fo:
+                json.dump(data, fo, indent=2)
+
+            os.replace(tmp, self.path)
+
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+            raise
+
+        self.entries = outputs
+
+
+class OutputCache:
+    """
+    A content addressed store of pandoc outputs. An output is keyed by
+    the hash of the command fingerprint (which contains the hash of the
+    staged input) and the volatile arguments, i.e. the build date. The
+    same document built from another checkout or branch is copied, or
+    hard linked, from the cache instead of running pandoc.
+
+    # Usage
+
+    ```
+    cache = OutputCache(config["cache_folder"], max_size=512 * 2**20)
+
+    key = cache.key(fingerprint, cmd)
+
+    if not cache.fetch(key, of):
+        run_cmd(cmd)
+        cache.store(key, of)
+
+    cache.evict()
+    ```
+
+    # NOTE
+
+    The build date changes every minute unless it is pinned (see
+    `build_date` in the configuration), the outputs can only be reused
+    if it is pinned.
+
+    Hard linked outputs share the file with the cache. Remove an output
+    before writing a new version of it (`fetch` and `store` do), never
+    write to it in place. For the same reason, the last use of an
+    output is recorded on a separate, empty, file (`.used`) so the
+    modification time of the linked output isn't changed.
+
+    """
+
+    name = "pandoc"
+
+    def __init__(self, folder, **kwargs):
+        """
+
+        # Parameters
+
+        folder:pathlib.Path
+            - The application cache folder. The outputs are stored in a
+              sub-folder, `name`.
+
+        # Parameters (kwargs)
+
+        max_size:int
+            - The size, in bytes, the cache is trimmed to by `evict`.
+              The least recently used outputs are removed first.
+            - Default - None - unbounded
+
+        link:bool
+            - Hard link the outputs to and from the cache, falling back
+              to copying them if that isn't possible (i.e. a different
+              file system).
+            - Default - True
+
+        """
+
+        self.folder = folder.joinpath(self.name)
+
+        self.max_size = kwargs.get("max_size", None)
+        self.link = kwargs.get("link", True)
+
+    @staticmethod
+    def key(fingerprint, cmd):
+        """
+        Return the cache key of the pandoc command.
+
+        # Parameters
+
+        fingerprint:dict
+            - The fingerprint of the command, see
+              `BuildManifest.fingerprint`.
+
+        cmd:list
+            - The pandoc command. The volatile arguments, left out of
+              the fingerprint, are part of the key.
+
+        # NOTE
+
+        The paths of the checkout, the `LOCATION_ARGUMENTS` and the
+        names of the referenced files, are left out of the key, only
+        the hashes of the files are used.
+
+        """
+
+        volatile = [str(arg) for arg in cmd if str(arg).startswith(VOLATILE_ARGUMENTS)]
+
+        fingerprint = dict(fingerprint)
+
+        fingerprint["command"] = [
+            arg
+            for arg in fingerprint["command"]
+            if not arg.startswith(LOCATION_ARGUMENTS)
+        ]
+
+        fingerprint["files"] = sorted(fingerprint["files"].values())
+
+        data = json.dumps([fingerprint, volatile], sort_keys=True)
+
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def _entry(self, key):
+        return self.folder.joinpath(key[:2], key)
+
+    @staticmethod
+    def _used(entry):
+        """
+        Return the path to the file marking the last use of the entry.
+        """
+
+        return entry.with_suffix(".used")
+
+    def _place(self, source, target):
+        """
+        Link, or copy, the source to the target, replacing the target.
+        """
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, tmp = tempfile.mkstemp(dir=target.parent, suffix=".tmp")
+        os.close(fd)
+        os.remove(tmp)
+
+        try:
+            if self.link:
+                try:
+                    os.link(source, tmp)
+
+                except OSError:
+                    shutil.copyfile(source, tmp)
+
+            else:
+                shutil.copyfile(source, tmp)
+
+            os.replace(tmp, target)
+
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+            raise
+
+    def fetch(self, key, output_file):
+        """
+        Place the cached output at `output_file`. Returns True if the
+        output was in the cache, False otherwise.
+        """
+
+        entry = self._entry(key)
+
+        try:
+            self._place(entry, output_file)
+
+        except OSError:
+            return False
+
+        # the access time isn't reliable (noatime), the modification
+        # time of the `.used` file marks when the entry was last used.
+        # The entry may be linked to the output, it isn't touched.
+        try:
+            self._used(entry).touch()
+
+        except OSError:
+            pass
+
+        return True
+
+    def store(self, key, output_file):
+        """
+        Store the output in the cache. Returns True if it was stored.
+        """
+
+        try:
+            self._place(output_file, self._entry(key))
+
+        except OSError:
+            return False
+
+        return True
+
+    def _entries(self):
+
+        if not self.folder.exists():
+            return []
+
+        entries = []
+
+        for entry in self.folder.glob("*/*"):
+
+            if entry.suffix in (".tmp", ".used"):
+                continue
+
+            try:
+                st = entry.stat()
+
+            except OSError:
+                continue
+
+            used = st.st_mtime_ns
+
+            try:
+                used = max(used, self._used(entry).stat().st_mtime_ns)
+
+            except OSError:
+                pass
+
+            entries.append((used, st.st_size, entry))
+
+        return entries
+
+    def evict(self):
+        """
+        Remove the least recently used outputs until the cache is no
+        larger than `max_size`.
+
+        # Return
+
+        A tuple, the number of outputs removed and their size in bytes.
+
+        """
+
+        if self.max_size is None:
+            return 0, 0
+
+        entries = self._entries()
+
+        total = sum(size for _, size, _ in entries)
+
+        removed = 0
+        freed = 0
+
+        for _, size, entry in sorted(entries):
+
+            if total <= self.max_size:
+                break
+
+            try:
+                entry.unlink()
+
+            except OSError:
+                continue
+
+            try:
+                self._used(entry).unlink()
+
+            except OSError:
+                pass
+
+            total -= size
+            removed += 1
+            freed += size
+
+        return removed, freed
+
+    def stats(self):
+        """
+        Return a dictionary describing the contents of the cache, see
+        `JSONCache.stats`.
+        """
+
+        entries = self._entries()
+
+        return {
+            "folder": self.folder,
+            "entries": len(entries),
+            "size": sum(size for _, size, _ in entries),
+            "stale": 0,
+        }
+
+    def clear(self):
+        """
+        Remove all the outputs from the cache.
+        """
+
+        if self.folder.exists():
+            shutil.rmtree(self.folder)
@@ -0,0 +1,564 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+
+# -----------
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2021 Troy Williams
+
+# uuid:   4f3b6a2e-fd1c-11eb-9a03-0242ac130003
+# author: Troy Williams
+# email:  troy.williams@bluebill.net
+# date:   2021-08-14
+# -----------
+
+"""
+A persistent, on-disk cache of the parsed Markdown metadata (headers,
+links, YAML blocks and code fence locations) so repeated runs don't
+have to re-read and re-scan every file.
+"""
+
+# ------------
+# System Modules - Included with Python
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+from collections import namedtuple
+
+# ------------
+# Custom Modules
+
+from pathlib import Path
+
+from .markdown import (
+    scan_to_json,
+    scan_from_json,
+    YAML_PARSE_REQUIRED,
+)
+
+from .document import LSTManifest
+
+from .link_index import LinkIndex, LINK_INDEX_SCHEMA_VERSION
+
+# -------------
+
+# Increment this whenever the format of the cached data changes. Entries
+# with a different version are ignored.
+SCHEMA_VERSION = 3
+
+# The version of the format of the LST manifest entries
+MANIFEST_SCHEMA_VERSION = 1
+
+# A valid entry of the ParseCache
+ParseEntry = namedtuple(
+    "ParseEntry",
+    [
+        "scan",  # MarkdownScan - the scan of the file
+        "yaml",  # The parsed YAML blocks or YAML_PARSE_REQUIRED if they weren't cached
+    ],
+)
+
+
+def file_digest(filename):
+    """
+    Return the SHA256 hex digest of the contents of the file.
+    """
+
+    h = hashlib.sha256()
+
+    with filename.open("rb") as fin:
+        for chunk in iter(lambda: fin.read(1 << 20), b""):
+            h.update(chunk)
+
+    return h.hexdigest()
+
+
+class JSONCache:
+    """
+    The base of the caches that store an entry, as a JSON file, for each
+    file in the system. An entry is keyed on the path to the file and is
+    stored in a sub-folder of the application cache folder.
+
+    # NOTE
+
+    The hits and misses are counted for the current process only.
+    """
+
+    # The name of the sub-folder the entries are stored in
+    name = None
+
+    # The version of the format of the entries
+    schema = SCHEMA_VERSION
+
+    def __init__(self, folder):
+        """
+
+        # Parameters
+
+        folder:pathlib.Path
+            - The application cache folder. The entries are stored in
+              a sub-folder, `name`.
+
+        """
+
+        self.folder = folder.joinpath(self.name)
+
+        self.hits = 0
+        self.misses = 0
+
+    def _entry(self, filename):
+        """
+        Return the path to the cache entry for the file.
+        """
+
+        key = hashlib.sha256(str(filename).encode("utf-8")).hexdigest()
+
+        return self.folder.joinpath(key[:2], f"{key}.json")
+
+    def _read(self, entry):
+        try:
+            with entry.open("r", encoding="utf-8") as fin:
+                return json.load(fin)
+
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, entry, data):
+        entry.parent.mkdir(parents=True, exist_ok=True)
+
+        # write to a temporary file and move it into place so a reader
+        # (or another process) never sees a partial entry
+        fd, tmp = tempfile.mkstemp(dir=entry.parent, suffix=".tmp")
+
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fo:
+                json.dump(data, fo)
+
+            os.replace(tmp, entry)
+
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def _load_entry(self, filename):
+        """
+        Return the data of the entry for the file or None if there
+        isn't an entry of the current schema.
+        """
+
+        data = self._read(self._entry(filename))
+
+        if (
+            data is None
+            or data.get("schema") != self.schema
+            or data.get("path") != str(filename)
+        ):
+            return None
+
+        return data
+
+    def stats(self):
+        """
+        Return a dictionary describing the contents of the cache:
+
+        - folder - the folder the entries are stored in
+        - entries - the number of entries
+        - size - the total size of the entries in bytes
+        - stale - the number of entries from a different schema version
+          or for files that no longer exist
+
+        """
+
+        entries = 0
+        size = 0
+        stale = 0
+
+        if self.folder.exists():
+            for entry in self.folder.rglob("*.json"):
+                entries += 1
+                size += entry.stat().st_size
+
+                data = self._read(entry)
+
+                if (
+                    data is None
+                    or data.get("schema") != self.schema
+                    or not os.path.exists(data.get("path", ""))
+                ):
+                    stale += 1
+
+        return {
+            "folder": self.folder,
+            "entries": entries,
+            "size": size,
+            "stale": stale,
+        }
+
+    def clear(self):
+        """
+        Remove all the entries from the cache.
+        """
+
+        if self.folder.exists():
+            shutil.rmtree(self.folder)
+
+
+class ParseCache(JSONCache):
+    """
+    Stores the MarkdownScan, and the parsed YAML blocks, of each
+    Markdown file as a JSON file within the cache folder. An entry is keyed on the path to the Markdown file
+    and is valid as long as the size and modification time of the file
+    match. If they don't match, the contents are hashed and if the hash
+    matches the entry is refreshed and reused. Otherwise the file has to
+    be scanned again.
+
+    # Usage
+
+    ```
+    cache = ParseCache(config["cache_folder"])
+
+    md = MarkdownDocument(path, cache=cache)
+    md.headers  # served from the cache if possible
+    md.yaml_value("UUID")  # the file isn't read
+    ```
+
+    # NOTE
+
+    The hits and misses are counted for the current process only.
+
+    The YAML is only cached if it survives the round trip through JSON
+    unchanged (i.e. it doesn't contain dates). Otherwise, it is parsed
+    from the file when it is needed.
+    """
+
+    name = "parse"
+
+    def fetch(self, filename, **kwargs):
+        """
+        Return the ParseEntry for the file or None if there isn't a
+        valid entry.
+
+        # Parameters
+
+        filename:pathlib.Path
+            - The path to the Markdown file.
+
+        # Parameters (kwargs)
+
+        Passed to `scan_from_json` (i.e. `intern_urls`).
+
+        """
+
+        data = self._load_entry(filename)
+
+        if data is None:
+            self.misses += 1
+            return None
+
+        try:
+            st = filename.stat()
+
+        except OSError:
+            self.misses += 1
+            return None
+
+        if data["size"] != st.st_size or data["mtime"] != st.st_mtime_ns:
+
+            # the file was touched, but did the contents change?
+            if data["sha256"] != file_digest(filename):
+                self.misses += 1
+                return None
+
+            data["size"] = st.st_size
+            data["mtime"] = st.st_mtime_ns
+
+            self._write(self._entry(filename), data)
+
+        self.hits += 1
+
+        return ParseEntry(
+            scan_from_json(data["scan"], **kwargs),
+            data.get("yaml", YAML_PARSE_REQUIRED),
+        )
+
+    def load(self, filename, **kwargs):
+        """
+        Return the cached MarkdownScan for the file or None if there
+        isn't a valid entry. See `fetch`.
+        """
+
+        entry = self.fetch(filename, **kwargs)
+
+        return None if entry is None else entry.scan
+
+    def store(self, filename, scan, **kwargs):
+        """
+        Store the MarkdownScan for the file.
+
+        # Parameters
+
+        filename:pathlib.Path
+            - The path to the Markdown file.
+
+        scan:MarkdownScan
+            - The scan of the current contents of the file.
+
+        # Parameters (kwargs)
+
+        stamp:tuple(int, int, int)
+            - The (size, mtime_ns, inode) of the file taken before it was
+              read, see `MarkdownDocument.stamp`.
+            - Default - None - the file is checked
+
+        digest:str
+            - The SHA256 hex digest of the bytes that were scanned.
+            - Default - None - the file is read and hashed
+
+        yaml:object
+            - The parsed YAML blocks of the file.
+            - Default - YAML_PARSE_REQUIRED - the YAML isn't stored
+
+        """
+
+        stamp = kwargs.get("stamp", None)
+        digest = kwargs.get("digest", None)
+
+        try:
+            if stamp is None:
+                st = filename.stat()
+                stamp = (st.st_size, st.st_mtime_ns)
+
+            if digest is None:
+                digest = file_digest(filename)
+
+        except OSError:
+            return
+
+        data = {
+            "schema": self.schema,
+            "path": str(filename),
+            "size": stamp[0],
+            "mtime": stamp[1],
+            "sha256": digest,
+            "scan": scan_to_json(scan),
+        }
+
+        yaml = kwargs.get("yaml", YAML_PARSE_REQUIRED)
+
+        if yaml is not YAML_PARSE_REQUIRED:
+            try:
+                if json.loads(json.dumps(yaml)) == yaml:
+                    data["yaml"] = yaml
+
+            except (TypeError, ValueError):
+                # dates, sets and other values JSON can't represent
+                pass
+
+        self._write(self._entry(filename), data)
+
+
+class ManifestCache(JSONCache):
+    """
+    Stores the resolved manifest of an LST file, the ordered Markdown
+    files and the LST files it depends on, as a JSON file within the
+    cache folder. The size and modification time of every LST file the
+    manifest was resolved from are recorded. The entry is valid as long
+    as none of them have changed.
+
+    # Usage
+
+    ```
+    resolver = LSTResolver(cache=ManifestCache(config["cache_folder"]))
+
+    lst = LSTDocument(path, resolver=resolver)
+    lst.links  # served from the cache if possible
+    ```
+
+    # NOTE
+
+    The entries are plain JSON, see `manifest_to_json`.
+    """
+
+    name = "lst"
+
+    schema = MANIFEST_SCHEMA_VERSION
+
+    def load(self, filename):
+        """
+        Return the cached LSTManifest for the LST file or None if there
+        isn't a valid entry.
+
+        # Parameters
+
+        filename:pathlib.Path
+            - The path to the LST file.
+
+        """
+
+        data = self._load_entry(filename)
+
+        if data is None:
+            self.misses += 1
+            return None
+
+        for path, (size, mtime) in data["dependencies"].items():
+
+            try:
+                st = os.stat(path)
+
+            except OSError:
+                self.misses += 1
+                return None
+
+            if size != st.st_size or mtime != st.st_mtime_ns:
+                self.misses += 1
+                return None
+
+        self.hits += 1
+
+        return LSTManifest(
+            tuple(Path(f) for f in data["links"]),
+            frozenset(Path(f) for f in data["dependencies"]),
+        )
+
+    def store(self, filename, manifest):
+        """
+        Store the LSTManifest for the LST file.
+
+        # Parameters
+
+        filename:pathlib.Path
+            - The path to the LST file.
+
+        manifest:LSTManifest
+            - The manifest resolved from the current LST files.
+
+        """
+
+        dependencies = {}
+
+        try:
+            for f in sorted(manifest.dependencies):
+                st = f.stat()
+                dependencies[str(f)] = (st.st_size, st.st_mtime_ns)
+
+        except OSError:
+            return
+
+        self._write(
+            self._entry(filename),
+            {
+                "schema": self.schema,
+                "path": str(filename),
+                "links": [str(f) for f in manifest.links],
+                "dependencies": dependencies,
+            },
+        )
+
+
+class LinkIndexCache(JSONCache):
+    """
+    Stores the LinkIndex of a corpus as a JSON file within the cache
+    folder. The entry is keyed on the root folder of the index. The
+    index records the size and modification time of every document so
+    `LinkIndex.refresh` only has to re-scan the documents that changed.
+
+    # Usage
+
+    ```
+    cache = LinkIndexCache(config["cache_folder"])
+
+    index = cache.load(root) or LinkIndex(root)
+    index.refresh(discover(root, extensions=[".md"]))
+
+    cache.store(index)
+    ```
+
+    """
+
+    name = "links"
+
+    schema = LINK_INDEX_SCHEMA_VERSION
+
+    def load(self, root):
+        """
+        Return the cached LinkIndex for the root folder or None if there
+        isn't a valid entry.
+
+        # Parameters
+
+        root:pathlib.Path
+            - The root folder of the index.
+
+        """
+
+        root = Path(os.path.normpath(os.path.abspath(root)))
+
+        data = self._load_entry(root)
+
+        index = None if data is None else LinkIndex.from_json(data)
+
+        if index is None:
+            self.misses += 1
+
+        else:
+            self.hits += 1
+
+        return index
+
+    def store(self, index):
+        """
+        Store the LinkIndex.
+
+        # Parameters
+
+        index:LinkIndex
+            - The index to store.
+
+        """
+
+        data = index.to_json()
+        data["path"] = str(index.root)
+
+        self._write(self._entry(index.root), data)
+
+
+def manifest_to_json(filename, manifest, root=None):
+    """
+    Convert an LSTManifest to a dictionary that can be written as JSON.
+    The paths are sorted where the order doesn't matter so the output
+    of two runs (or two commits) can be compared with diff.
+
+    # Parameters
+
+    filename:pathlib.Path
+        - The path to the LST file.
+
+    manifest:LSTManifest
+        - The resolved LST file.
+
+    root:pathlib.Path
+        - If provided, the paths are written relative to `root`.
+        - Default - None
+
+    # Return
+
+    A dictionary:
+
+    - lst - the path to the LST file
+    - links - the list of Markdown files in order
+    - dependencies - the sorted list of LST files
+
+    """
+
+    def path(f):
+        return (f.relative_to(root) if root else f).as_posix()
+
+    return {
+        "lst": path(filename),
+        "links": [path(f) for f in manifest.links],
+        "dependencies": sorted(path(f) for f in manifest.dependencies),
+    }
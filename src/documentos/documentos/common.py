@@ -19,14 +19,22 @@ Common methods shared amoung the rest of the code base.
 # ------------
 # System Modules
 
+import os
+import shutil
 import subprocess
+import tempfile
 
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
 from pathlib import Path
 from itertools import zip_longest
 
 # ------------
 # Custom Modules
 
+from .discovery import discover, DEFAULT_IGNORE
+
 
 def run_cmd(cmd, **kwargs):
     """
@@ -44,6 +52,10 @@ def run_cmd(cmd, **kwargs):
         - The path to change the current working directory to
         - Default - None
 
+    check:bool
+        - Raise subprocess.CalledProcessError if the command fails.
+        - Default - False
+
     # NOTE
 
     Reference: <https://docs.python.org/3/library/subprocess.html>
@@ -79,8 +91,14 @@ def run_cmd(cmd, **kwargs):
         cwd=cwd,
     )
 
-    # Gather the results of the operation from STDOUT
-    return [line.strip() for line in p.stdout]
+    # Gather the results of the operation from STDOUT and wait for the
+    # process to exit
+    stdout, _ = p.communicate()
+
+    if kwargs.get("check", False) and p.returncode != 0:
+        raise subprocess.CalledProcessError(p.returncode, cmd, output=stdout)
+
+    return [line.strip() for line in stdout.splitlines()]
 
 
 def find_folder_on_path(path, target='.git', **kwargs):
@@ -236,6 +254,179 @@ def relative_path(left, right):
     return Path("/".join(cwd + rs))
 
 
+def build_date(config):
+    """
+    Return the build date passed to pandoc, `%Y-%m-%dT%H%M%z`. In order
+    of precedence:
+
+    - `build_date` from the configuration, used as is (pinned)
+    - the `SOURCE_DATE_EPOCH` environment variable (reproducible builds)
+    - the current time
+
+    The date is in the `default_timezone`.
+
+    # Parameters
+
+    config:dict
+        - The configuration dictionary.
+
+    # NOTE
+
+    A pinned date makes the pandoc commands, and the outputs, the same
+    from one build to the next so they can be cached.
+
+    """
+
+    tz = ZoneInfo(config["default_timezone"])
+
+    pinned = config.get("build_date")
+
+    if isinstance(pinned, datetime):
+        # a TOML date-time rather than a string
+        return pinned.strftime("%Y-%m-%dT%H%M%z")
+
+    if pinned:
+        return str(pinned)
+
+    epoch = os.environ.get("SOURCE_DATE_EPOCH")
+
+    if epoch:
+        when = datetime.fromtimestamp(int(epoch), tz=timezone.utc).astimezone(tz)
+
+    else:
+        when = datetime.now().replace(tzinfo=tz)
+
+    return when.strftime("%Y-%m-%dT%H%M%z")
+
+
+def copy_file(source, target):
+    """
+    Copy the file, and its modification time, unless the target has the
+    same size and modification time, i.e. it was copied by a previous
+    build.
+
+    # Parameters
+
+    source:pathlib.Path
+        - The file to copy.
+
+    target:pathlib.Path
+        - The path of the copy.
+
+    # Return
+
+    True if the file was copied.
+
+    """
+
+    st = source.stat()
+
+    try:
+        tt = target.stat()
+
+        if tt.st_size == st.st_size and tt.st_mtime_ns == st.st_mtime_ns:
+            return False
+
+    except OSError:
+        pass
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+
+    shutil.copy2(source, target)
+
+    return True
+
+
+def copy_tree(source, target):
+    """
+    Copy the folder tree, only copying the files that changed, see
+    `copy_file`. Files are not removed from the target.
+
+    # Parameters
+
+    source:pathlib.Path
+        - The folder to copy.
+
+    target:pathlib.Path
+        - The path of the copy.
+
+    # Return
+
+    A tuple, the number of files (copied, unchanged).
+
+    """
+
+    copied = 0
+    unchanged = 0
+
+    for f in discover(source, ignore=()):
+
+        if copy_file(f, target.joinpath(f.relative_to(source))):
+            copied += 1
+
+        else:
+            unchanged += 1
+
+    return copied, unchanged
+
+
+@contextmanager
+def staging_area(config):
+    """
+    A context manager returning the temporary folder the documents are
+    staged in for pandoc, or None if they are piped to pandoc's STDIN
+    (the default). The folder, and its contents, are removed on exit.
+
+    # Parameters
+
+    config:dict
+        - The configuration dictionary. `staging_folder` is used.
+
+    # Usage
+
+    ```
+    with staging_area(config) as tmp_path:
+
+        if tmp_path is None:
+            # pipe the document to pandoc
+            ...
+    ```
+
+    # NOTE
+
+    Staging is a fallback for when pandoc can't read from STDIN, i.e.
+    a filter that needs the input file. Stage to a memory backed folder,
+    like `/dev/shm`, outside of the repository so editors and file
+    watchers don't see the files come and go.
+
+    """
+
+    folder = config.get("staging_folder")
+
+    if folder is None:
+        yield None
+        return
+
+    folder.mkdir(parents=True, exist_ok=True)
+
+    with tempfile.TemporaryDirectory(dir=folder) as tmp:
+        yield Path(tmp)
+
+
+def md_to_html_links(line):
+    """
+    Change the intra-document links on the line from *.md to *.html.
+    Pandoc will not alter the links.
+
+    # NOTE
+
+    No checks or validation are applied, the line should be one that
+    contains relative links.
+    """
+
+    return line.replace(".md", ".html")
+
+
 def search(root=None, extensions=None, recursive=True, **kwargs):
     """
 
@@ -258,9 +449,19 @@ def search(root=None, extensions=None, recursive=True, **kwargs):
           files.
         - Default - True
 
+    # Parameters (kwargs)
+
+    ignore:iterable(str)
+        - The folders that are not searched, see `discovery.discover`.
+        - Default - DEFAULT_IGNORE (`.git` and `.venv`)
+
+    workers:int
+        - The number of threads used to walk the top-level folders.
+        - Default - None
+
     # Return
 
-    Each file as it is found.
+    Each file, in sorted order.
 
     # NOTE
 
@@ -278,9 +479,12 @@ def search(root=None, extensions=None, recursive=True, **kwargs):
 
     """
 
-    pattern = root.rglob if recursive else root.glob
-
-    for f in pattern("*.*"):
+    snapshot = discover(
+        root,
+        extensions=extensions,
+        recursive=recursive,
+        ignore=kwargs.get("ignore", DEFAULT_IGNORE),
+        workers=kwargs.get("workers", None),
+    )
 
-        if extensions is None or f.suffix.lower() in extensions:
-            yield f
+    yield from snapshot
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+
+# -----------
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2021 Troy Williams
+
+# uuid:   5a0e3c44-ff5e-11eb-9a03-0242ac130003
+# author: Troy Williams
+# email:  troy.williams@bluebill.net
+# date:   2021-08-17
+# -----------
+
+"""
+Find the files within a folder tree using `os.scandir`. The tree is
+walked once for any number of extensions, ignored folders (`.git`,
+output folders, virtual environments, etc.) are not descended into and
+the top-level folders can be walked in parallel threads.
+
+The result is a FileSnapshot that can answer questions about the files
+(does the file exist, where are the files with this name) without
+touching the file system again.
+"""
+
+# ------------
+# System Modules - Included with Python
+
+import os
+
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatch
+from pathlib import Path
+
+# -------------
+
+# The folders that are never searched
+DEFAULT_IGNORE = (".git", ".venv")
+
+
+def default_ignore(config):
+    """
+    Return the ignore patterns for the configuration, the
+    `DEFAULT_IGNORE` folders, the output folder, if one is configured,
+    and the `ignore_folders` patterns.
+
+    # Parameters
+
+    config:dict
+        - The configuration dictionary. `root`, `output` and
+          `ignore_folders` are used.
+
+    """
+
+    ignore = list(DEFAULT_IGNORE)
+
+    if "output" in config:
+        ignore.append(str(config["root"].joinpath(config["output"])))
+
+    ignore.extend(config.get("ignore_folders", []))
+
+    return ignore
+
+
+class FileSnapshot:
+    """
+    The files found by `discover`. The paths are stored as strings and
+    converted to pathlib.Path objects on demand.
+
+    # Usage
+
+    ```
+    snapshot = discover(root, extensions=[".md", ".lst"])
+
+    for f in snapshot.with_extension(".md"):
+        ...
+
+    snapshot.exists(root / "index.md")
+    snapshot.by_name("index.md")
+    ```
+
+    # NOTE
+
+    The snapshot isn't updated when the file system changes.
+
+    """
+
+    def __init__(self, root, files):
+        """
+
+        # Parameters
+
+        root:pathlib.Path
+            - The folder that was searched.
+
+        files:list(str)
+            - The full paths of the files that were found.
+
+        """
+
+        self.root = root
+        self.files = files
+
+        self._paths = set(files)
+
+        self._names = {}
+
+        for f in files:
+            self._names.setdefault(os.path.basename(f), []).append(f)
+
+    def __iter__(self):
+        return (Path(f) for f in self.files)
+
+    def __len__(self):
+        return len(self.files)
+
+    def exists(self, path):
+        """
+        Is the file part of the snapshot? The path is normalized
+        (`..` and `.` are removed) but symbolic links are not resolved.
+
+        # Parameters
+
+        path:pathlib.Path
+            - The path to the file. A relative path is relative to the
+              root of the snapshot.
+
+        """
+
+        return os.path.normpath(os.path.join(self.root, path)) in self._paths
+
+    def by_name(self, name):
+        """
+        Return the list of paths to the files with the name (i.e.
+        `index.md`), there may be more than one within the tree.
+        """
+
+        return [Path(f) for f in self._names.get(name, [])]
+
+    def names(self):
+        """
+        Return a dictionary keyed by the file names mapped to the list
+        of paths to the files with that name.
+        """
+
+        return {k: [Path(f) for f in v] for k, v in self._names.items()}
+
+    def with_extension(self, *extensions):
+        """
+        Return the paths of the files that have one of the extensions.
+        The extensions have to be dotted and lower case i.e. '.md'.
+        """
+
+        return [
+            Path(f)
+            for f in self.files
+            if os.path.splitext(f)[1].lower() in extensions
+        ]
+
+
+def _is_ignored(path, name, root, ignore):
+    """
+    Does the folder match any of the ignore patterns?
+
+    - A pattern without a `/` is matched against the folder name, i.e.
+      `.git` or `*.egg-info`.
+    - An absolute path matches that folder.
+    - Any other pattern is matched against the path of the folder
+      relative to the root, i.e. `output/en/html`.
+
+    """
+
+    for pattern in ignore:
+
+        if os.path.isabs(pattern):
+            if os.path.normpath(pattern) == path:
+                return True
+
+        elif "/" in pattern:
+            if fnmatch(os.path.relpath(path, root).replace(os.sep, "/"), pattern):
+                return True
+
+        elif fnmatch(name, pattern):
+            return True
+
+    return False
+
+
+def _walk(top, root, extensions, ignore, recursive=True):
+    """
+    Walk the folder, `top`, returning the files that match the
+    extensions and the sub-folders that weren't walked (when
+    `recursive` is False, none are walked).
+    """
+
+    files = []
+    folders = []
+
+    stack = [top]
+
+    while stack:
+
+        folder = stack.pop()
+
+        try:
+            with os.scandir(folder) as it:
+                entries = list(it)
+
+        except OSError:
+            continue
+
+        for entry in entries:
+
+            if entry.is_dir(follow_symlinks=False):
+
+                if not _is_ignored(entry.path, entry.name, root, ignore):
+                    (stack if recursive else folders).append(entry.path)
+
+            elif extensions is None or os.path.splitext(entry.name)[1].lower() in extensions:
+                files.append(entry.path)
+
+    return files, folders
+
+
+def discover(root, extensions=None, **kwargs):
+    """
+    Find the files within the `root` folder that match the extensions.
+
+    # Parameters
+
+    root:pathlib.Path
+        - The folder to search.
+
+    extensions:iterable(str)
+        - The extensions of the files to find. They have to be dotted
+          and lower case i.e. ['.md', '.lst'].
+        - Default - None - find all files
+
+    # Parameters (kwargs)
+
+    ignore:iterable(str)
+        - The folders that are not searched. Patterns without a `/` are
+          matched against the folder name, absolute paths against the
+          folder and anything else against the path relative to `root`.
+        - Default - DEFAULT_IGNORE
+
+    recursive:bool
+        - Search all nested folders from root recursively for the target
+          files.
+        - Default - True
+
+    workers:int
+        - The number of threads used to walk the top-level folders. Use
+          1 to walk the tree in the current thread.
+        - Default - None - let the ThreadPoolExecutor decide
+
+    # Return
+
+    A FileSnapshot, the files are sorted.
+
+    """
+
+    ignore = tuple(kwargs.get("ignore", DEFAULT_IGNORE))
+    recursive = kwargs.get("recursive", True)
+    workers = kwargs.get("workers", None)
+
+    if extensions is not None:
+        extensions = frozenset(extensions)
+
+    root_path = os.path.normpath(os.path.abspath(root))
+
+    # The files in the root folder and the top-level folders
+    files, folders = _walk(root_path, root_path, extensions, ignore, recursive=False)
+
+    if recursive and folders:
+
+        def walk(top):
+            return _walk(top, root_path, extensions, ignore)[0]
+
+        if workers == 1 or len(folders) == 1:
+            results = [walk(top) for top in folders]
+
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(walk, folders))
+
+        for result in results:
+            files.extend(result)
+
+    files.sort()
+
+    return FileSnapshot(Path(root_path), files)
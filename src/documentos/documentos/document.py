@@ -19,25 +19,290 @@ associated helpers.
 # ------------
 # System Modules - Included with Python
 
+import hashlib
+import io
+import mmap
+import os
+import re
+import threading
+
+from array import array
+from collections import namedtuple, OrderedDict
+from collections.abc import MutableSequence
 from functools import cached_property
+from multiprocessing import Pool
+from pathlib import Path
 
 # ------------
 # 3rd Party - From pip
 
+import yaml
+
 # ------------
 # Custom Modules
 
 from .markdown import (
-    find_all_atx_headers,
-    extract_all_markdown_links,
+    scan_markdown,
+    stream_markdown,
+    scan_anchors,
+    load_yaml_lines,
+    find_yaml_value,
+    YAML_PARSE_REQUIRED,
 )
 
 from .common import search as main_search
 
-from .markdown import extract_yaml
-
 # ------------
 
+# The maximum number of files mapped by MappedLines at the same time.
+# Each map holds a file descriptor, the least recently used map is
+# closed, and mapped again when it is needed.
+MAX_OPEN_MAPS = 64
+
+# The line endings recognized by `readlines()` (universal newlines)
+LINE_END = re.compile(rb"\r\n|\r|\n")
+
+# `load_corpus` scans fewer files than this in the current process,
+# starting a process pool costs more than scanning them.
+POOL_MIN_FILES = 32
+
+
+class MappedLines(MutableSequence):
+    """
+    A list-like view of the lines of a text file backed by a memory map.
+    Only the offsets of the lines are kept in memory, in a compact
+    array, and each line is decoded when it is accessed. The operating
+    system can page the file in and out as required so a large corpus
+    can be held without keeping every line as a Python string.
+
+    It behaves like the list returned by `readlines()`, the lines
+    include the line feed and `\r\n` and `\r` are translated to `\n`.
+    Lines can be replaced or appended, these are held in memory.
+    Inserting or deleting lines in the middle of the file converts the
+    view to a regular list and closes the map.
+
+    # Usage
+
+    ```
+    contents = MappedLines(Path("file.md"))
+
+    contents[12]                       # decoded on demand
+    contents[12] = "New text\n"        # held in memory
+    contents.extend(["more\n"])
+    ```
+
+    # NOTE
+
+    The file should not be modified while it is mapped, call `close`
+    before writing to it. At most `MAX_OPEN_MAPS` files are mapped at
+    the same time.
+    """
+
+    # id -> MappedLines, the open maps, least recently used first
+    _open = OrderedDict()
+    _lock = threading.Lock()
+
+    def __init__(self, filename, encoding="utf-8"):
+        """
+
+        # Parameters
+
+        filename:pathlib.Path
+            - The path to the file to map.
+
+        encoding:str
+            - The encoding used to decode the lines
+            - Default - utf-8
+
+        """
+
+        self.filename = filename
+        self.encoding = encoding
+
+        self._map = None
+
+        with self._lock:
+            data = self._mapped()
+
+            size = len(data)
+
+            # The offset to the start of each line followed by the size
+            # of the file. Line i is `_map[_offsets[i]:_offsets[i + 1]]`
+            self._offsets = array("I" if size < 2**32 else "Q", [0])
+            self._offsets.extend(m.end() for m in LINE_END.finditer(data))
+
+        if self._offsets[-1] != size:
+            self._offsets.append(size)
+
+        self._size = size
+
+        self._count = len(self._offsets) - 1
+
+        # lines that have been replaced, keyed by index
+        self._changes = {}
+
+        # lines appended to the end of the file
+        self._tail = []
+
+        # The regular list the view is converted to if lines are
+        # inserted or deleted.
+        self._lines = None
+
+    def _mapped(self):
+        """
+        Return the map of the file, mapping it if it isn't open. The
+        caller holds `_lock`.
+        """
+
+        if self._map is not None:
+            self._open.move_to_end(id(self))
+            return self._map
+
+        with self.filename.open("rb") as fin:
+            size = fin.seek(0, 2)
+
+            # the offsets are only valid for the file they were read from
+            if self.__dict__.get("_size", size) != size:
+                raise ValueError(f"{self.filename} changed while it was mapped")
+
+            # mmap cannot map an empty file
+            if not size:
+                return b""
+
+            self._map = mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self._open[id(self)] = self
+
+        while len(self._open) > MAX_OPEN_MAPS:
+            _, oldest = self._open.popitem(last=False)
+            oldest._unmap()
+
+        return self._map
+
+    def _unmap(self):
+        """
+        Close the map, the caller holds `_lock`.
+        """
+
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+        self._open.pop(id(self), None)
+
+    def close(self):
+        """
+        Close the map of the file, it is mapped again if a line that
+        hasn't been changed is read.
+        """
+
+        with self._lock:
+            self._unmap()
+
+    def _decode(self, i):
+
+        with self._lock:
+            data = self._mapped()[self._offsets[i] : self._offsets[i + 1]]
+
+        line = data.decode(self.encoding)
+
+        if line.endswith("\r\n"):
+            line = line[:-2] + "\n"
+
+        elif line.endswith("\r"):
+            line = line[:-1] + "\n"
+
+        return line
+
+    def _materialize(self):
+        if self._lines is None:
+            self._lines = list(self)
+
+            # the lines are held in memory, the map isn't needed
+            self.close()
+
+        return self._lines
+
+    def _index(self, i):
+        n = len(self)
+
+        if i < 0:
+            i += n
+
+        if i < 0 or i >= n:
+            raise IndexError("MappedLines index out of range")
+
+        return i
+
+    def __len__(self):
+        if self._lines is not None:
+            return len(self._lines)
+
+        return self._count + len(self._tail)
+
+    def __getitem__(self, i):
+        if self._lines is not None:
+            return self._lines[i]
+
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+
+        i = self._index(i)
+
+        if i >= self._count:
+            return self._tail[i - self._count]
+
+        if i in self._changes:
+            return self._changes[i]
+
+        return self._decode(i)
+
+    def __setitem__(self, i, value):
+        if self._lines is not None or isinstance(i, slice):
+            self._materialize()[i] = value
+            return
+
+        i = self._index(i)
+
+        if i >= self._count:
+            self._tail[i - self._count] = value
+
+        else:
+            self._changes[i] = value
+
+    def __delitem__(self, i):
+        del self._materialize()[i]
+
+    def insert(self, i, value):
+        if self._lines is None and i >= len(self):
+            self._tail.append(value)
+
+        else:
+            self._materialize().insert(i, value)
+
+    def __iter__(self):
+        if self._lines is not None:
+            yield from self._lines
+            return
+
+        for i in range(self._count):
+            yield self._changes[i] if i in self._changes else self._decode(i)
+
+        yield from self._tail
+
+    def __eq__(self, other):
+        if isinstance(other, (list, MappedLines)):
+            return len(self) == len(other) and all(
+                a == b for a, b in zip(self, other)
+            )
+
+        return NotImplemented
+
+    def __reduce__(self):
+        # The memory map can't be pickled (multiprocessing), send the
+        # lines as a regular list.
+        return (list, (list(self),))
+
 
 class MarkdownDocument:
     """
@@ -109,23 +374,18 @@ class MarkdownDocument:
                   ![image caption](URL)
                 - 'url' - The URL to the image
 
+    stamp: tuple(int, int, int)
+        - The (size, mtime_ns, inode) of the file when the contents (or
+          the scan) were read from it. None if nothing has been read.
+
     # NOTE
 
-    How to clear the cache:
-    - https://stackoverflow.com/questions/59899732/python-cached-property-how-to-delete
+    The values are cached. To keep a document in step with the file
+    (i.e. in a watch loop) call `refresh()`, it discards the cached
+    values only if the file changed. After changing the `contents` in
+    memory, call `invalidate()` so the scan is recalculated.
 
-    ```
-    def _clear_cache(self):
-        for cache_item in [
-            'contents',
-            'headers',
-            'yaml_block',
-            'links',
-            'line_look_up ',
-        ]:
-            if cache_item in self.__dict__:
-                del self.__dict__[cache_item]
-    ```
+    - https://stackoverflow.com/questions/59899732/python-cached-property-how-to-delete
     """
 
     def __init__(self, filename, **kwargs):
@@ -136,10 +396,130 @@ class MarkdownDocument:
         filename:pathlib.Path
             - The path to the Markdown file
 
+        # Parameters (kwargs)
+
+        memory_map:bool
+            - Back `contents` with a memory map of the file (MappedLines)
+              instead of a list of strings. The lines are decoded on
+              demand, reducing the memory used when a large number of
+              documents are held at once.
+            - Default - False
+
+        cache:ParseCache
+            - A persistent cache to load the `scan` from (and store it
+              to) so the file doesn't have to be read and scanned
+              again if it hasn't changed.
+            - Default - None
+
+        intern_urls:bool
+            - Intern the URL strings of the links (`sys.intern`) so
+              documents linking to the same URLs share one copy.
+            - Default - False
+
+        streaming:bool
+            - Scan the document, and read its YAML block, straight from
+              the file without loading the `contents`. The memory used
+              doesn't grow with the size of the file, which suits very
+              large generated documents. `contents` can still be used,
+              it is loaded on demand.
+            - Default - False
+
         """
 
         self.filename = filename
 
+        self.memory_map = kwargs.get("memory_map", False)
+        self.cache = kwargs.get("cache", None)
+        self.intern_urls = kwargs.get("intern_urls", False)
+        self.streaming = kwargs.get("streaming", False)
+
+        self.stamp = None
+
+    def _stat(self):
+        """
+        Return the (size, mtime_ns, inode) of the file or None if it
+        can't be accessed.
+        """
+
+        try:
+            st = os.stat(self.filename)
+
+        except OSError:
+            return None
+
+        return (st.st_size, st.st_mtime_ns, st.st_ino)
+
+    def refresh(self, stamp=None):
+        """
+        Check the file against the `stamp` recorded when it was read. If
+        it changed, discard the `contents` and everything derived from
+        them, they are re-read and re-scanned the next time they are
+        used. An unchanged file costs one `os.stat`.
+
+        # Parameters
+
+        stamp:tuple(int, int, int)
+            - The current (size, mtime_ns, inode) of the file, if the
+              caller has already called stat (i.e. DocumentStore).
+            - Default - None - the file is checked
+
+        # Return
+
+        True if the cached values were discarded, False otherwise.
+
+        # NOTE
+
+        Changes made to the `contents` in memory are lost if the file
+        changed.
+
+        """
+
+        if self.stamp is None:
+            return False
+
+        if stamp is None:
+            stamp = self._stat()
+
+        if stamp == self.stamp:
+            return False
+
+        self.close()
+        self.invalidate()
+
+        self.stamp = None
+
+        return True
+
+    def close(self):
+        """
+        Discard the `contents`, closing the memory map if the document
+        was created with `memory_map=True`. They are read again the next
+        time they are used.
+        """
+
+        contents = self.__dict__.pop("contents", None)
+
+        if isinstance(contents, MappedLines):
+            contents.close()
+
+    def invalidate(self):
+        """
+        Discard the `scan` and the properties derived from it
+        (`headers`, `links`, `anchors`, `yaml_block` and
+        `line_look_up`). Call this after changing the `contents` so they
+        are recalculated from the new contents.
+        """
+
+        for cache_item in (
+            "scan",
+            "headers",
+            "links",
+            "anchors",
+            "yaml_block",
+            "line_look_up",
+        ):
+            self.__dict__.pop(cache_item, None)
+
     def __eq__(self, other):
         return self.filename == other.filename
 
@@ -153,11 +533,164 @@ class MarkdownDocument:
     def contents(self):
         """
         Return a list representing the contents of the markdown file.
+        If the document was created with `memory_map=True`, a
+        MappedLines object is returned instead.
         """
 
+        # stat before reading, a change during the read is caught by
+        # the next refresh
+        self.stamp = self._stat()
+
+        if self.memory_map:
+            return MappedLines(self.filename)
+
         with self.filename.open("r", encoding="utf-8") as fin:
             return fin.readlines()
 
+    @cached_property
+    def scan(self):
+        """
+        Walk the contents of the document once, gathering the headers,
+        links, YAML block locations and code fence locations. The other
+        cached properties (`headers`, `links` and `yaml_block`) are
+        served from this result.
+
+        # Return
+
+        A MarkdownScan named tuple, see `scan_markdown`.
+
+        # NOTE
+
+        If the document has a cache and the contents haven't been
+        loaded (or assigned), the scan, and `yaml_block`, are loaded
+        from the cache if the file hasn't changed. Otherwise, the file
+        is hashed as it is scanned and the results are stored.
+
+        """
+
+        if "contents" in self.__dict__:
+            return scan_markdown(self.contents, intern_urls=self.intern_urls)
+
+        self.stamp = self._stat()
+
+        if self.cache is None:
+
+            if self.streaming:
+                return scan_markdown(self._lines(), intern_urls=self.intern_urls)
+
+            return scan_markdown(self.contents, intern_urls=self.intern_urls)
+
+        entry = self.cache.fetch(self.filename, intern_urls=self.intern_urls)
+
+        if entry is not None:
+
+            if entry.yaml is not YAML_PARSE_REQUIRED:
+                self.__dict__["yaml_block"] = entry.yaml
+
+            return entry.scan
+
+        fin, digest = open_digest(self.filename)
+
+        with fin:
+
+            if self.streaming or self.memory_map:
+                scan = scan_markdown(fin, intern_urls=self.intern_urls)
+
+            else:
+                self.__dict__["contents"] = fin.readlines()
+                scan = scan_markdown(self.contents, intern_urls=self.intern_urls)
+
+        block = _parse_yaml(self.filename, scan, self.__dict__.get("contents", None))
+
+        if block is not YAML_PARSE_REQUIRED:
+            self.__dict__["yaml_block"] = block
+
+        self.cache.store(
+            self.filename,
+            scan,
+            stamp=self.stamp,
+            digest=digest.hexdigest(),
+            yaml=block,
+        )
+
+        return scan
+
+    def _lines(self):
+        """
+        Yield the lines of the document, from the `contents` if they
+        have been loaded (they may have been changed) otherwise straight
+        from the file.
+        """
+
+        if "contents" in self.__dict__:
+            yield from self.contents
+            return
+
+        with self.filename.open("r", encoding="utf-8") as fin:
+            yield from fin
+
+    def _yaml_lines(self):
+        """
+        Return the lines of the YAML blocks. A streaming document only
+        reads the file up to the end of the last YAML block.
+        """
+
+        yaml_lines = self.scan.yaml_lines
+
+        if not self.streaming or "contents" in self.__dict__:
+            return [self.contents[i] for i in yaml_lines]
+
+        return read_lines(self.filename, yaml_lines)
+
+    def stream(self):
+        """
+        Walk the document, line by line, without loading the
+        `contents`. See `stream_markdown`.
+
+        # Return
+
+        A generator of tuples (line number, line, block_state) where
+        block_state is "code" or "yaml" for the lines of code fences and
+        YAML blocks (including the markers) and None otherwise.
+
+        # NOTE
+
+        If the `contents` have been loaded, or assigned, they are
+        walked instead of the file.
+
+        """
+
+        return stream_markdown(self._lines())
+
+    def write(self, fo, transform=None, lines=None):
+        """
+        Write the document to a file object line by line, i.e. to a
+        staging file. The `contents` are not loaded if they haven't been
+        already.
+
+        # Parameters
+
+        fo:file object
+            - The file to write to.
+
+        transform:callable
+            - A function that takes a line and returns the line to
+              write, i.e. to adjust links.
+            - Default - None - write the lines as they are
+
+        lines:set(int)
+            - The line numbers (0 based) to apply the `transform` to.
+            - Default - None - every line
+
+        """
+
+        for i, line in enumerate(self._lines()):
+
+            if transform is not None and (lines is None or i in lines):
+                line = transform(line)
+
+            fo.write(line)
+
     @cached_property
     def headers(self):
         """
@@ -174,13 +707,8 @@ class MarkdownDocument:
         (23, "[hello World](./en.md) ")
         """
 
-        items = find_all_atx_headers(
-            self.contents,
-            include_line_numbers=True,
-        )
-
         headers = {}
-        for item in items:
+        for item in self.scan.headers:
 
             # (x, y, z) <- basic format
             # x - line number
@@ -208,7 +736,69 @@ class MarkdownDocument:
         overwrite those from earlier blocks.
         """
 
-        return extract_yaml(md_lines=self.contents)
+        # loading the scan from the ParseCache also loads the YAML
+        self.scan
+
+        if "yaml_block" in self.__dict__:
+            return self.__dict__["yaml_block"]
+
+        return load_yaml_lines(self._yaml_lines())
+
+    @cached_property
+    def anchors(self):
+        """
+        The anchors pandoc would generate for the document, header
+        identifiers and `{#id}` attributes. See `scan_anchors`.
+
+        # Return
+
+        A frozenset of the anchors (without the leading `#`).
+        """
+
+        return scan_anchors(self.scan)
+
+    def yaml_value(self, key, default=None):
+        """
+        Return the value of a top-level key from the YAML blocks. Simple
+        string values, like `UUID` and `title`, are answered by scanning
+        the YAML lines without parsing the YAML. Anything more
+        complicated falls back to the full parse, `yaml_block`.
+
+        # Parameters
+
+        key:str
+            - The top-level key to look up.
+
+        default:object
+            - The value to return if there is no YAML block or the key
+              isn't defined.
+            - Default - None
+
+        # NOTE
+
+        Invalid YAML will not raise an exception unless the full parse
+        is required.
+
+        """
+
+        # loading the scan from the ParseCache also loads the YAML
+        self.scan
+
+        if "yaml_block" not in self.__dict__:
+
+            value = find_yaml_value(
+                self._yaml_lines(),
+                key,
+                default=default,
+            )
+
+            if value is not YAML_PARSE_REQUIRED:
+                return value
+
+        if not self.yaml_block:
+            return default
+
+        return self.yaml_block.get(key, default)
 
     @cached_property
     def links(self):
@@ -256,7 +846,14 @@ class MarkdownDocument:
 
         """
 
-        return extract_all_markdown_links(self.contents)
+        scan = self.scan
+
+        return (
+            scan.all_links,
+            scan.absolute_links,
+            scan.relative_links,
+            scan.image_links,
+        )
 
     def all_links(self):
         return self.links[0]
@@ -295,43 +892,531 @@ class MarkdownDocument:
         return reverse
 
 
-class LSTDocument:
+class DocumentStore:
     """
-    Represents an LST file in the system. It will resolve all the links
-    relative to the current LST file to actual paths to Markdown files.
-    Any nested LST will be resolved and added.
-
-    It is assumed that links with the LST file are relative to the
-    location of the current LST file.
-
-    # Attributes
+    Hands out one MarkdownDocument per file, keyed by the resolved path,
+    so the stages of a build (and the plugins) share the contents and
+    the parsed metadata instead of each reading and parsing the file
+    again.
 
-    filename: pathlib.Path
-        - The path to the LST file that the instance will represent.
-        - The path needs to be the full path to the LST file.
+    # Usage
 
-    contents: list(str)
-        - The contents of the LST file line-by-line
+    ```
+    store = DocumentStore(cache=config["parse_cache"])
 
-    links: list(pathlib.Path)
-        - The list of links contained with the file.
-        - LST files will be resolved recursively and replaced with the
-        Markdown links.
+    md = store.get(path)
+    md is store.get(path)  # True
 
+    search(root, document=store.get)
+    ```
 
     # NOTE
 
-    Only pathlib.Path objects are stored. They would have to be
-    converted to MarkdownDocument objects in another process.
+    The documents are shared. A change to the contents of a document
+    (i.e. adjusting the links during a build) is seen by everything that
+    holds it.
+
+    """
+
+    def __init__(self, **kwargs):
+        """
+
+        # Parameters (kwargs)
+
+        The kwargs are passed to every MarkdownDocument the store
+        creates (`memory_map`, `cache`, `intern_urls`).
+
+        """
+
+        self.document_kwargs = kwargs
+
+        # resolved path -> MarkdownDocument
+        self._documents = {}
+
+        # resolved path -> the number of times it was requested
+        self._requests = {}
+
+    def get(self, filename):
+        """
+        Return the MarkdownDocument for the file, creating it on the
+        first request.
+
+        # Parameters
+
+        filename:pathlib.Path
+            - The path to the Markdown file.
+
+        """
+
+        key = Path(filename).resolve()
+
+        md = self._documents.get(key)
+
+        if md is None:
+            md = MarkdownDocument(key, **self.document_kwargs)
+            self._documents[key] = md
+
+        self._requests[key] = self._requests.get(key, 0) + 1
+
+        return md
+
+    def refresh(self):
+        """
+        Bring the documents up to date with the file system, one
+        `os.stat` per document. Documents whose files changed discard
+        their cached values (see `MarkdownDocument.refresh`), documents
+        whose files were removed are dropped from the store.
+
+        # Return
+
+        A dictionary with the number of documents `checked`, the number
+        that `changed` and the number `removed`.
+
+        """
+
+        checked = len(self._documents)
+        changed = 0
+        removed = []
+
+        for key, md in self._documents.items():
+
+            stamp = md._stat()
+
+            if stamp is None:
+                removed.append(key)
+                continue
+
+            if md.refresh(stamp):
+                changed += 1
+
+        for key in removed:
+            self._documents[key].close()
+
+            del self._documents[key]
+            del self._requests[key]
+
+        return {
+            "checked": checked,
+            "changed": changed,
+            "removed": len(removed),
+        }
+
+    def close(self):
+        """
+        Discard the contents of the documents, closing their memory
+        maps. The parsed metadata is kept.
+        """
+
+        for md in self._documents.values():
+            md.close()
+
+    def __contains__(self, filename):
+        return Path(filename).resolve() in self._documents
+
+    def __len__(self):
+        return len(self._documents)
+
+    def __iter__(self):
+        return iter(self._documents.values())
+
+    def stats(self):
+        """
+        Return a dictionary describing the use of the store:
+
+        - documents - the number of documents created
+        - requests - the number of requests for documents
+        - reads - the number of documents whose contents were read
+        - parses - the number of documents that were scanned
+        - saved_reads - the number of times the contents of a document
+          were requested after they were read
+        - saved_parses - the number of times the scan of a document was
+          requested after it was scanned
+
+        # NOTE
+
+        The saved counts assume every request beyond the first would
+        have created a new document and read (or scanned) it again.
+
+        """
+
+        reads = 0
+        parses = 0
+        saved_reads = 0
+        saved_parses = 0
+
+        for key, md in self._documents.items():
+
+            repeats = self._requests[key] - 1
+
+            if "contents" in md.__dict__:
+                reads += 1
+                saved_reads += repeats
+
+            if "scan" in md.__dict__:
+                parses += 1
+                saved_parses += repeats
+
+        return {
+            "documents": len(self._documents),
+            "requests": sum(self._requests.values()),
+            "reads": reads,
+            "parses": parses,
+            "saved_reads": saved_reads,
+            "saved_parses": saved_parses,
+        }
+
+
+class AnchorIndex:
+    """
+    The anchors of every document in the corpus, keyed by the
+    normalized path of the document. It is built once per run so a
+    `#section` in a relative link can be checked without reading the
+    target document.
+
+    # Usage
+
+    ```
+    anchors = AnchorIndex.build(load_corpus(paths, store=store))
+
+    anchors.get(path)  # frozenset, or None if the document isn't indexed
+    anchors.has_anchor(path, "sec:introduction")
+    ```
+
+    # NOTE
+
+    The index is plain data, it can be sent to worker processes (i.e.
+    through the initializer of a multiprocessing Pool).
+
+    """
+
+    def __init__(self):
+
+        # normalized path -> frozenset of anchors
+        self._anchors = {}
+
+    @staticmethod
+    def key(path):
+        return os.path.normpath(os.path.abspath(path))
+
+    @classmethod
+    def build(cls, documents):
+        """
+        Construct the index from the MarkdownDocument objects.
+        """
+
+        index = cls()
+
+        for md in documents:
+            index.add(md)
+
+        return index
+
+    def add(self, md):
+        """
+        Add, or replace, the anchors of the MarkdownDocument.
+        """
+
+        self._anchors[self.key(md.filename)] = md.anchors
+
+    def get(self, path):
+        """
+        Return the frozenset of anchors of the document or None if the
+        document isn't part of the index.
+        """
+
+        return self._anchors.get(self.key(path))
+
+    def has_anchor(self, path, anchor):
+        """
+        Does the document define the anchor? Returns None if the
+        document isn't part of the index.
+        """
+
+        anchors = self.get(path)
+
+        if anchors is None:
+            return None
+
+        return anchor in anchors
+
+    def __contains__(self, path):
+        return self.key(path) in self._anchors
+
+    def __len__(self):
+        return len(self._anchors)
+
+
+class LSTCycleError(ValueError):
+    """
+    Raised when an LST file includes itself, directly or through other
+    LST files.
+
+    # Attributes
+
+    chain:list(pathlib.Path)
+        - The LST files that make up the cycle, starting and ending
+          with the same file.
+
+    """
+
+    def __init__(self, chain):
+
+        self.chain = list(chain)
+
+        super().__init__(
+            "LST include cycle: " + " -> ".join(str(f) for f in self.chain)
+        )
+
+
+# The result of resolving an LST file
+LSTManifest = namedtuple(
+    "LSTManifest",
+    [
+        "links",  # tuple of the Markdown file paths, in order
+        "dependencies",  # frozenset of the LST file paths that were read
+    ],
+)
+
+
+class LSTResolver:
+    """
+    Resolve LST files to the ordered list of Markdown files they
+    reference. Nested LST files are resolved recursively.
+
+    Each LST file is read and resolved once. An LST file included from
+    several parents is served from the cache. Share one resolver for a
+    run (build, graph, validate, etc.) so every LSTDocument benefits.
+
+    # Usage
+
+    ```
+    resolver = LSTResolver()
+
+    manifest = resolver.resolve(Path("./en/documents/all.lst").resolve())
+
+    for md in manifest.links:
+        ...
+    ```
+
+    # NOTE
+
+    The in-memory cache isn't invalidated when the LST files change.
+    Use a new resolver (or `clear`) for each run. The persistent cache,
+    if provided, is validated against the LST files.
+
+    """
+
+    def __init__(self, **kwargs):
+        """
+
+        # Parameters (kwargs)
+
+        cache:ManifestCache
+            - A persistent cache to load the manifests of the LST files
+              passed to `resolve` from (and store them to). The nested
+              LST files are only cached in memory.
+            - Default - None
+
+        """
+
+        self.cache = kwargs.get("cache", None)
+
+        # LST path -> list of the entries (pathlib.Path) in the file
+        self._entries = {}
+
+        # LST path -> LSTManifest
+        self._manifests = {}
+
+        self.reads = 0
+        self.hits = 0
+
+    def entries(self, filename):
+        """
+        Return the Markdown and LST paths listed in the LST file, in
+        order. The paths are resolved relative to the LST file. Empty
+        lines and comments (`#`) are ignored.
+
+        # Parameters
+
+        filename:pathlib.Path
+            - The full path to the LST file.
+
+        """
+
+        if filename not in self._entries:
+
+            with filename.open("r", encoding="utf-8") as fin:
+                contents = fin.readlines()
+
+            self.reads += 1
+
+            entries = []
+
+            for line in contents:
+
+                left, _, _ = line.partition("#")
+                left = left.strip()
+
+                # Is the line commented or empty?
+                if len(left) == 0:
+                    continue
+
+                f = filename.parent.joinpath(left).resolve()
+
+                if f.suffix.lower() in (".md", ".lst"):
+                    entries.append(f)
+
+            self._entries[filename] = entries
+
+        return self._entries[filename]
+
+    def resolve(self, filename):
+        """
+        Resolve the LST file.
+
+        # Parameters
+
+        filename:pathlib.Path
+            - The full path to the LST file.
+
+        # Return
+
+        An LSTManifest:
+
+        - links - tuple of the paths to the Markdown files in the order
+          they appear, nested LST files are expanded in place.
+        - dependencies - frozenset of the paths to the LST files that
+          were read, including `filename`.
+
+        # Raises
+
+        LSTCycleError if an LST file includes itself.
+
+        """
+
+        if self.cache is None or filename in self._manifests:
+            return self._resolve(filename, [])
+
+        manifest = self.cache.load(filename)
+
+        if manifest is None:
+            manifest = self._resolve(filename, [])
+            self.cache.store(filename, manifest)
+
+        self._manifests[filename] = manifest
+
+        return manifest
+
+    def _resolve(self, filename, chain):
+
+        if filename in chain:
+            raise LSTCycleError(chain[chain.index(filename) :] + [filename])
+
+        if filename in self._manifests:
+            self.hits += 1
+            return self._manifests[filename]
+
+        chain.append(filename)
+
+        links = []
+        dependencies = {filename}
+
+        for f in self.entries(filename):
+
+            if f.suffix.lower() == ".md":
+                links.append(f)
+
+            else:
+                manifest = self._resolve(f, chain)
+
+                links.extend(manifest.links)
+                dependencies |= manifest.dependencies
+
+        chain.pop()
+
+        manifest = LSTManifest(tuple(links), frozenset(dependencies))
+
+        self._manifests[filename] = manifest
+
+        return manifest
+
+    def clear(self):
+        """
+        Discard the cached LST files.
+        """
+
+        self._entries.clear()
+        self._manifests.clear()
+
+
+class LSTDocument:
+    """
+    Represents an LST file in the system. It will resolve all the links
+    relative to the current LST file to actual paths to Markdown files.
+    Any nested LST will be resolved and added.
+
+    It is assumed that links with the LST file are relative to the
+    location of the current LST file.
+
+    # Attributes
+
+    filename: pathlib.Path
+        - The path to the LST file that the instance will represent.
+        - The path needs to be the full path to the LST file.
+
+    contents: list(str)
+        - The contents of the LST file line-by-line
+
+    links: list(pathlib.Path)
+        - The list of links contained with the file.
+        - LST files will be resolved recursively and replaced with the
+        Markdown links.
+
+
+    dependencies: frozenset(pathlib.Path)
+        - The LST files the links were resolved from, including this
+          one.
+
+    store: DocumentStore
+        - Where to get the MarkdownDocument objects for the links from.
+
+    # NOTE
+
+    Only pathlib.Path objects are stored. They would have to be
+    converted to MarkdownDocument objects in another process.
 
     We are also not going to validate the Markdown file links within the
     process. That will be left to validation processes.
     """
 
     def __init__(self, filename, **kwargs):
-        """ """
+        """
+
+        # Parameters
+
+        filename:pathlib.Path
+            - The path to the LST file
+
+        # Parameters (kwargs)
+
+        resolver:LSTResolver
+            - The resolver used to resolve the links. Documents sharing
+              a resolver share the parsed LST files.
+            - Default - None, a resolver is created for the document.
+
+        store:DocumentStore
+            - The store the MarkdownDocument objects for the links are
+              taken from, see `documents`.
+            - Default - None, a store is created for the document.
+
+        """
 
         self.filename = filename
+        self.resolver = kwargs.get("resolver", None) or LSTResolver()
+        self.store = kwargs.get("store", None)
+
+        if self.store is None:
+            self.store = DocumentStore()
 
     @cached_property
     def contents(self):
@@ -342,6 +1427,14 @@ class LSTDocument:
         with self.filename.open("r", encoding="utf-8") as fin:
             return fin.readlines()
 
+    @cached_property
+    def manifest(self):
+        """
+        The resolved LST file, see `LSTResolver.resolve`.
+        """
+
+        return self.resolver.resolve(self.filename)
+
     @cached_property
     def links(self):
         """
@@ -349,28 +1442,24 @@ class LSTDocument:
         files within the document.
         """
 
-        links = []
-
-        # NOTE: This loop could be hidden in a generator so it could ignore
-        # comments
-        for line in self.contents:
+        return list(self.manifest.links)
 
-            left, _, _ = line.strip().partition("#")
-
-            # Is the line commented or empty?
-            if len(left) == 0:
-                continue
-
-            f = self.filename.parent.joinpath(left).resolve()
+    @property
+    def documents(self):
+        """
+        The MarkdownDocument objects for the links, in order, from the
+        store.
+        """
 
-            if f.suffix.lower() == ".md":
-                links.append(f)
+        return [self.store.get(f) for f in self.links]
 
-            if f.suffix.lower() == ".lst":
-                lst = LSTDocument(f)
-                links.extend(lst.links)
+    @property
+    def dependencies(self):
+        """
+        The LST files the links were resolved from, including this one.
+        """
 
-        return links
+        return self.manifest.dependencies
 
 
 def search(root=None, extension=".md", document=MarkdownDocument, **kwargs):
@@ -412,6 +1501,265 @@ def search(root=None, extension=".md", document=MarkdownDocument, **kwargs):
     ]
 
 
+class _DigestReader(io.RawIOBase):
+    """
+    A binary file that hashes the bytes as they are read, see
+    `open_digest`.
+    """
+
+    def __init__(self, fin):
+        self.fin = fin
+        self.sha256 = hashlib.sha256()
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        n = self.fin.readinto(b)
+
+        if n:
+            self.sha256.update(memoryview(b)[:n])
+
+        return n
+
+    def close(self):
+        self.fin.close()
+        super().close()
+
+
+def open_digest(filename):
+    """
+    Open the file to read text (UTF-8, universal newlines), computing
+    the SHA256 digest of its bytes as they are read. The file is
+    scanned and hashed in one read.
+
+    # Parameters
+
+    filename:pathlib.Path
+        - The file to open.
+
+    # Return
+
+    A tuple (file object, hashlib object). The digest is complete once
+    the file has been read to the end.
+
+    """
+
+    reader = _DigestReader(filename.open("rb", buffering=0))
+    fin = io.TextIOWrapper(io.BufferedReader(reader), encoding="utf-8")
+
+    return fin, reader.sha256
+
+
+def read_lines(filename, line_numbers):
+    """
+    Return the lines of the file with the line numbers (0 based,
+    sorted). The file is only read up to the last of the lines.
+    """
+
+    if not line_numbers:
+        return []
+
+    wanted = set(line_numbers)
+    results = []
+
+    with filename.open("r", encoding="utf-8") as fin:
+        for i, line in enumerate(fin):
+
+            if i in wanted:
+                results.append(line)
+
+            if i >= line_numbers[-1]:
+                break
+
+    return results
+
+
+def _parse_yaml(filename, scan, contents=None):
+    """
+    Parse the YAML blocks found by the scan, for the ParseCache. The
+    lines are taken from the `contents` if provided, otherwise they are
+    read from the file.
+
+    # Return
+
+    The parsed YAML blocks or YAML_PARSE_REQUIRED if the YAML is
+    invalid. The error is raised when the document parses it.
+
+    """
+
+    if not scan.yaml_lines:
+        return None
+
+    if contents is None:
+        lines = read_lines(filename, scan.yaml_lines)
+
+    else:
+        lines = [contents[i] for i in scan.yaml_lines]
+
+    try:
+        return load_yaml_lines(lines)
+
+    except yaml.YAMLError:
+        return YAML_PARSE_REQUIRED
+
+
+def _scan_file(item):
+    """
+    Read and scan a Markdown file, the process pool worker for
+    `load_corpus`.
+
+    # Parameters
+
+    item:tuple
+        - (pathlib.Path, intern_urls, cached) - if `cached` is True the
+          file is hashed and the YAML is parsed for the ParseCache.
+
+    # Return
+
+    A tuple (MarkdownScan, SHA256 hex digest, parsed YAML). Only the
+    results are returned to the parent process, not the contents or the
+    document. The digest is None and the YAML is YAML_PARSE_REQUIRED if
+    `cached` is False.
+
+    """
+
+    filename, intern_urls, cached = item
+
+    # The file is scanned as it is read, the worker never holds the
+    # contents of a large document.
+
+    # NOTE: Interning in the worker also shrinks the result, pickle
+    # writes an object that is referenced many times once.
+
+    if not cached:
+        with filename.open("r", encoding="utf-8") as fin:
+            scan = scan_markdown(fin, intern_urls=intern_urls)
+
+        return scan, None, YAML_PARSE_REQUIRED
+
+    fin, digest = open_digest(filename)
+
+    with fin:
+        scan = scan_markdown(fin, intern_urls=intern_urls)
+
+    return scan, digest.hexdigest(), _parse_yaml(filename, scan)
+
+
+def load_corpus(paths, workers=None, **kwargs):
+    """
+    Read and scan the Markdown files in a process pool and return the
+    MarkdownDocument objects with the `scan` (and the properties served
+    from it, `headers`, `links`, etc.) already filled in.
+
+    # Parameters
+
+    paths:iterable(pathlib.Path)
+        - The Markdown files to load.
+
+    workers:int
+        - The maximum number of processes to use. Use 1 to load the
+          files in the current process. The pool is never larger than
+          the number of files to scan and fewer than `POOL_MIN_FILES`
+          files are scanned in the current process.
+        - Default - None - the number of CPUs
+
+    # Parameters (kwargs)
+
+    store:DocumentStore
+        - The store to get the documents from. Documents that have
+          already been scanned, or have had their contents loaded, are
+          left alone.
+        - Default - None - a new store is created
+
+    chunksize:int
+        - The number of files sent to a worker at a time.
+        - Default - None - calculated from the number of files and
+          workers
+
+    # Return
+
+    The list of MarkdownDocument objects in the same order as `paths`.
+
+    # NOTE
+
+    The workers return the scans, not the documents. The contents of
+    the files are read again, lazily, if they are needed.
+
+    If a document has a ParseCache, the cache is checked in this
+    process and only the misses are sent to the workers. The workers
+    hash the files as they scan them and parse the YAML, the results
+    are stored in the cache.
+
+    """
+
+    store = kwargs.get("store", None)
+
+    if store is None:
+        store = DocumentStore()
+
+    documents = [store.get(f) for f in paths]
+
+    pending = []
+
+    for md in dict.fromkeys(documents):
+
+        if "scan" in md.__dict__ or "contents" in md.__dict__:
+            continue
+
+        # the stamp the scan will be checked against by `refresh`
+        md.stamp = md._stat()
+
+        if md.cache is not None:
+            entry = md.cache.fetch(md.filename, intern_urls=md.intern_urls)
+
+            if entry is not None:
+                md.__dict__["scan"] = entry.scan
+
+                if entry.yaml is not YAML_PARSE_REQUIRED:
+                    md.__dict__["yaml_block"] = entry.yaml
+
+                continue
+
+        pending.append(md)
+
+    if not pending:
+        return documents
+
+    items = [(md.filename, md.intern_urls, md.cache is not None) for md in pending]
+
+    workers = min(workers or os.cpu_count() or 1, len(pending))
+
+    if workers == 1 or len(pending) < POOL_MIN_FILES:
+        scans = [_scan_file(item) for item in items]
+
+    else:
+        chunksize = kwargs.get("chunksize", None) or max(
+            1, len(items) // (workers * 4)
+        )
+
+        with Pool(processes=workers) as p:
+            scans = p.map(_scan_file, items, chunksize=chunksize)
+
+    for md, (scan, digest, block) in zip(pending, scans):
+
+        md.__dict__["scan"] = scan
+
+        if block is not YAML_PARSE_REQUIRED:
+            md.__dict__["yaml_block"] = block
+
+        if md.cache is not None:
+            md.cache.store(
+                md.filename,
+                scan,
+                stamp=md.stamp,
+                digest=digest,
+                yaml=block,
+            )
+
+    return documents
+
+
 def reverse_relative_links(md_files, root=None):
     """
 
@@ -446,7 +1794,8 @@ def reverse_relative_links(md_files, root=None):
             key = key.relative_to(root)
 
         for url in md.relative_links():
-            p = md.filename.parent.joinpath(url[1]["md"]).resolve()
+            # normalize the path, the file system isn't needed for that
+            p = Path(os.path.normpath(md.filename.parent.joinpath(url[1]["md"])))
 
             if root:
                 p = p.relative_to(root)
@@ -28,7 +28,7 @@ from .validation import (
 )
 
 
-def validate_urls(document, root=None):
+def validate_urls(document, root=None, **kwargs):
     """
 
     Validate the urls that are contained within the markdown file.
@@ -43,6 +43,13 @@ def validate_urls(document, root=None):
         - Optional root folder so that we can display a shorter path
           name for the document.
 
+    # Parameters (kwargs)
+
+    anchors:AnchorIndex
+        - If provided, the section anchors of the relative links are
+          checked, see `validate_relative_url`.
+        - Default - None
+
     # Return
 
     A list of strings containing the issues and line numbers. If there
@@ -68,7 +75,11 @@ def validate_urls(document, root=None):
     for rurl in document.relative_links():
         line, url = rurl
 
-        msg = validate_relative_url(url["url"], document=document.filename)
+        msg = validate_relative_url(
+            url["url"],
+            document=document.filename,
+            anchors=kwargs.get("anchors", None),
+        )
 
         if msg:
             messages.append(f'{msg} - {path} - line {line} - `{url["full"]}`')
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+
+# -----------
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2021 Troy Williams
+
+# uuid:   8c41e2b6-0d1c-11ec-9a03-0242ac130003
+# author: Troy Williams
+# email:  troy.williams@bluebill.net
+# date:   2021-08-30
+# -----------
+
+"""
+Run external commands (pandoc) concurrently. The work is done by the
+child processes, a thread is all that is needed to wait on each one, so
+the jobs are run in a ThreadPoolExecutor with a bounded number of
+workers. The exit code, STDERR and wall time of every job are collected
+so failures can be reported instead of disappearing.
+"""
+
+# ------------
+# System Modules - Included with Python
+
+import os
+import subprocess
+import tempfile
+import time
+
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# -------------
+
+# The result of running a command with `run_process`
+ProcessResult = namedtuple(
+    "ProcessResult",
+    [
+        "returncode",  # int - the exit code of the process
+        "stdout",  # str - the captured STDOUT
+        "stderr",  # str - the captured STDERR
+        "elapsed",  # float - the wall time in seconds
+    ],
+)
+
+# The result of a job run by `run_jobs`
+JobResult = namedtuple(
+    "JobResult",
+    [
+        "name",  # str - the name of the job, displayed in the summary
+        "status",  # str - "built", "cached" or "failed"
+        "returncode",  # int - the exit code of the process or None if it wasn't run
+        "stderr",  # str - the captured STDERR
+        "elapsed",  # float - the wall time in seconds
+    ],
+)
+
+
+def run_process(cmd, **kwargs):
+    """
+    Run the command and wait for it to finish, capturing STDOUT and
+    STDERR.
+
+    # Parameters
+
+    cmd:list(str)
+        - The command and its arguments.
+
+    # Parameters (kwargs)
+
+    cwd:pathlib.Path
+        - The path to change the current working directory to
+        - Default - None
+
+    stdin:callable
+        - Writes the input of the command to the (text, UTF-8) file
+          object it is passed, i.e. `MarkdownDocument.write`. The input
+          is streamed to the process, it isn't held in memory.
+        - Default - None - the command doesn't read STDIN
+
+    # Return
+
+    A ProcessResult. A command that can't be started, i.e. pandoc isn't
+    installed, has a return code of 127 and the error as STDERR.
+
+    # NOTE
+
+    STDOUT and STDERR are written to temporary files, not pipes, so the
+    process can't block writing to them while the input is written.
+
+    """
+
+    stdin = kwargs.get("stdin", None)
+
+    start = time.perf_counter()
+
+    with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+
+        try:
+            p = subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE if stdin else subprocess.DEVNULL,
+                stdout=out,
+                stderr=err,
+                cwd=kwargs.get("cwd", None),
+                encoding="utf-8" if stdin else None,
+            )
+
+        except OSError as e:
+            return ProcessResult(127, "", str(e), time.perf_counter() - start)
+
+        if stdin:
+            try:
+                with p.stdin as fo:
+                    stdin(fo)
+
+            except BrokenPipeError:
+                # the process exited without reading all of the input,
+                # the exit code says why
+                pass
+
+        returncode = p.wait()
+
+        out.seek(0)
+        err.seek(0)
+
+        return ProcessResult(
+            returncode,
+            out.read().decode("utf-8", errors="replace"),
+            err.read().decode("utf-8", errors="replace"),
+            time.perf_counter() - start,
+        )
+
+
+def default_jobs():
+    """
+    Return the default number of concurrent jobs, the number of CPUs
+    available to the process.
+    """
+
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0)) or 1
+
+    return os.cpu_count() or 1
+
+
+def run_jobs(jobs, fn, **kwargs):
+    """
+    Call `fn` for each job in a thread pool and return the results.
+
+    # Parameters
+
+    jobs:list
+        - The jobs, passed to `fn` one at a time.
+
+    fn:callable
+        - Runs the job, i.e. waits on a process, and returns its result.
+          It is called from the worker threads.
+
+    # Parameters (kwargs)
+
+    workers:int
+        - The maximum number of jobs running at the same time.
+        - Default - None - `default_jobs()`
+
+    size:callable
+        - Returns the size of a job, the largest jobs are started first.
+          A large document started last is the tail of the build.
+        - Default - None - the jobs are started in order
+
+    # Return
+
+    The list of results in the same order as `jobs`.
+
+    # NOTE
+
+    An exception raised by `fn` is raised by `run_jobs` after the jobs
+    that have started are finished.
+
+    """
+
+    workers = kwargs.get("workers", None) or default_jobs()
+    size = kwargs.get("size", None)
+
+    order = list(range(len(jobs)))
+
+    if size is not None:
+        order.sort(key=lambda i: size(jobs[i]), reverse=True)
+
+    results = [None] * len(jobs)
+
+    if not jobs:
+        return results
+
+    # The executor starts the jobs in the order they were submitted
+    with ThreadPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+
+        futures = {executor.submit(fn, jobs[i]): i for i in order}
+
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+
+    return results
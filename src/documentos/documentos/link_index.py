@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+
+# -----------
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2021 Troy Williams
+
+# uuid:   3b8e5d6a-0b17-11ec-9a03-0242ac130003
+# author: Troy Williams
+# email:  troy.williams@bluebill.net
+# date:   2021-08-27
+# -----------
+
+"""
+An index of the relative links between the Markdown documents of the
+corpus. For every document it records the links leaving it (outgoing)
+and the links pointing at it (incoming) so questions like "who links to
+this file?" or "what breaks if this folder moves?" can be answered
+without reading the corpus.
+
+The paths are normalized with `posixpath`, the file system isn't used
+to resolve them. Every path in the index is relative to the root of the
+index and uses `/` as the separator, i.e. `en/documents/index.md`.
+"""
+
+# ------------
+# System Modules - Included with Python
+
+import os
+import posixpath
+
+from collections import namedtuple
+from pathlib import Path
+
+# ------------
+# Custom Modules
+
+from .document import DocumentStore, load_corpus
+
+# -------------
+
+# Increment this whenever the format of the saved index changes
+LINK_INDEX_SCHEMA_VERSION = 1
+
+# A relative link from the `source` document to the `target` document.
+# The anchor is the section portion of the link without the `#` or None.
+Edge = namedtuple(
+    "Edge",
+    [
+        "source",  # str - the path of the document containing the link
+        "target",  # str - the path of the document the link points to
+        "line",  # int - the line number (0 based) of the link in the source
+        "anchor",  # str - the section anchor or None
+    ],
+)
+
+
+def normalize(path):
+    """
+    Normalize a `/` separated path without touching the file system,
+    `a/./b/../c.md` -> `a/c.md`.
+    """
+
+    return posixpath.normpath(path)
+
+
+def link_target(source, md):
+    """
+    Return the path of the document a relative link in `source` points
+    to.
+
+    # Parameters
+
+    source:str
+        - The normalized path of the document containing the link.
+
+    md:str
+        - The file portion of the relative URL, i.e. `../b.md`. An
+          empty string, a link to a section of the same document,
+          returns `source`.
+
+    """
+
+    if not md:
+        return source
+
+    return normalize(posixpath.join(posixpath.dirname(source), md))
+
+
+def _is_within(path, prefix):
+    """
+    Is the path the prefix or nested within the prefix folder?
+    """
+
+    return path == prefix or path.startswith(prefix + "/")
+
+
+class LinkIndex:
+    """
+    The relative links between the documents of a corpus, indexed by
+    source and by target.
+
+    # Usage
+
+    ```
+    index = LinkIndex(config["documents.path"])
+    index.refresh(discover(config["documents.path"], extensions=[".md"]))
+
+    for edge in index.incoming("chapter/index.md"):
+        print(edge.source, edge.line, edge.anchor)
+
+    for edge in index.affected_by_move("chapter"):
+        ...
+    ```
+
+    # NOTE
+
+    The index is updated incrementally, `refresh` only re-scans the
+    documents whose size or modification time changed. Use
+    `LinkIndexCache` to keep the index between runs.
+
+    """
+
+    def __init__(self, root):
+        """
+
+        # Parameters
+
+        root:pathlib.Path
+            - The folder the paths of the index are relative to.
+
+        """
+
+        self.root = Path(os.path.normpath(os.path.abspath(root)))
+
+        # source -> list of Edge
+        self._outgoing = {}
+
+        # target -> {source -> list of Edge}
+        self._incoming = {}
+
+        # source -> (size, mtime_ns) of the document when it was indexed
+        self._stamps = {}
+
+    def key(self, path):
+        """
+        Return the index key for the path, the normalized path relative
+        to the root. Keys (str) are returned as is, after normalization.
+        """
+
+        if isinstance(path, str) and not os.path.isabs(path):
+            return normalize(path.replace(os.sep, "/"))
+
+        relative = os.path.relpath(os.path.abspath(path), self.root)
+
+        return normalize(relative.replace(os.sep, "/"))
+
+    def __contains__(self, path):
+        return self.key(path) in self._outgoing
+
+    def __len__(self):
+        return len(self._outgoing)
+
+    def __iter__(self):
+        return iter(self._outgoing)
+
+    def sources(self):
+        """
+        Return the keys of the documents in the index.
+        """
+
+        return list(self._outgoing)
+
+    def outgoing(self, path):
+        """
+        Return the list of Edges leaving the document.
+        """
+
+        return list(self._outgoing.get(self.key(path), []))
+
+    def incoming(self, path):
+        """
+        Return the list of Edges pointing at the document, sorted by
+        source and line.
+        """
+
+        sources = self._incoming.get(self.key(path), {})
+
+        return [e for source in sorted(sources) for e in sources[source]]
+
+    def targets(self):
+        """
+        Return the keys of every document that is linked to. This
+        includes documents that aren't in the index, i.e. broken links.
+        """
+
+        return list(self._incoming)
+
+    def affected_by_move(self, path):
+        """
+        Return the Edges that break if the file or folder is moved.
+        These are the links from outside into the path and the links
+        from within the path to the outside. Links within the folder
+        are not affected.
+
+        # Parameters
+
+        path:pathlib.Path or str
+            - The file or folder to move.
+
+        # Return
+
+        A tuple of two lists of Edges, (incoming, outgoing).
+
+        """
+
+        prefix = self.key(path)
+
+        incoming = [
+            e
+            for target, sources in self._incoming.items()
+            if _is_within(target, prefix)
+            for source, edges in sources.items()
+            if not _is_within(source, prefix)
+            for e in edges
+        ]
+
+        outgoing = [
+            e
+            for source, edges in self._outgoing.items()
+            if _is_within(source, prefix)
+            for e in edges
+            if not _is_within(e.target, prefix)
+        ]
+
+        incoming.sort(key=lambda e: (e.source, e.line))
+        outgoing.sort(key=lambda e: (e.source, e.line))
+
+        return incoming, outgoing
+
+    def set_edges(self, source, edges, stamp=None):
+        """
+        Replace the outgoing edges of the document.
+
+        # Parameters
+
+        source:str
+            - The key of the document.
+
+        edges:list(Edge)
+            - The relative links of the document.
+
+        stamp:tuple(int, int)
+            - The (size, mtime_ns) of the document the edges were read
+              from.
+            - Default - None
+
+        """
+
+        self.remove(source)
+
+        self._outgoing[source] = edges
+        self._stamps[source] = stamp
+
+        for e in edges:
+            self._incoming.setdefault(e.target, {}).setdefault(source, []).append(e)
+
+    def remove(self, path):
+        """
+        Remove the document, and its outgoing edges, from the index.
+        """
+
+        source = self.key(path)
+
+        for e in self._outgoing.pop(source, []):
+
+            sources = self._incoming.get(e.target)
+
+            if sources is None:
+                continue
+
+            sources.pop(source, None)
+
+            if not sources:
+                del self._incoming[e.target]
+
+        self._stamps.pop(source, None)
+
+    def update(self, md):
+        """
+        Index, or re-index, the relative links of the MarkdownDocument.
+        """
+
+        source = self.key(md.filename)
+
+        edges = [
+            Edge(
+                source,
+                link_target(source, link["md"]),
+                line,
+                link["section"][1:] if link["section"] else None,
+            )
+            for line, link in md.relative_links()
+        ]
+
+        try:
+            st = md.filename.stat()
+            stamp = (st.st_size, st.st_mtime_ns)
+
+        except OSError:
+            stamp = None
+
+        self.set_edges(source, edges, stamp)
+
+    def refresh(self, paths, **kwargs):
+        """
+        Bring the index up to date with the Markdown files. Files that
+        are new or whose size or modification time changed are scanned,
+        files that are no longer in `paths` are removed.
+
+        # Parameters
+
+        paths:iterable(pathlib.Path)
+            - All of the Markdown files of the corpus, i.e. a
+              FileSnapshot.
+
+        # Parameters (kwargs)
+
+        store:DocumentStore
+            - The store to get the documents from.
+            - Default - None - a new store is created
+
+        workers:int
+            - The number of processes used to scan the changed files,
+              see `load_corpus`.
+            - Default - None
+
+        # Return
+
+        A dictionary with the number of documents that were `added`,
+        `updated`, `removed` and `unchanged`.
+
+        """
+
+        store = kwargs.get("store", None) or DocumentStore()
+
+        seen = set()
+        changed = []
+
+        counts = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+
+        for f in paths:
+
+            f = Path(f)
+            source = self.key(f)
+            seen.add(source)
+
+            try:
+                st = f.stat()
+
+            except OSError:
+                continue
+
+            if source not in self._outgoing:
+                counts["added"] += 1
+
+            elif self._stamps.get(source) != (st.st_size, st.st_mtime_ns):
+                counts["updated"] += 1
+
+            else:
+                counts["unchanged"] += 1
+                continue
+
+            changed.append(f)
+
+        for md in load_corpus(changed, workers=kwargs.get("workers", None), store=store):
+            self.update(md)
+
+        for source in [s for s in self._outgoing if s not in seen]:
+            self.remove(source)
+            counts["removed"] += 1
+
+        return counts
+
+    def to_json(self):
+        """
+        Return the index as a dictionary that can be written as JSON.
+        Only the outgoing edges are stored, the incoming edges are
+        rebuilt when the index is loaded.
+        """
+
+        return {
+            "schema": LINK_INDEX_SCHEMA_VERSION,
+            "root": str(self.root),
+            "documents": {
+                source: {
+                    "stamp": self._stamps.get(source),
+                    "links": [[e.target, e.line, e.anchor] for e in edges],
+                }
+                for source, edges in self._outgoing.items()
+            },
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        """
+        Construct the index from the dictionary returned by `to_json`.
+        Returns None if the data is from a different schema version.
+        """
+
+        if data.get("schema") != LINK_INDEX_SCHEMA_VERSION:
+            return None
+
+        index = cls(data["root"])
+
+        for source, entry in data["documents"].items():
+
+            stamp = entry["stamp"]
+
+            index.set_edges(
+                source,
+                [Edge(source, *link) for link in entry["links"]],
+                tuple(stamp) if stamp is not None else None,
+            )
+
+        return index
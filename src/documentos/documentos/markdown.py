@@ -29,11 +29,22 @@ However, pandoc has specific syntax:
 
 import re
 
+from collections import namedtuple
+from functools import lru_cache
+
 # ------------
 # 3rd Party Modules
 
 import yaml
 
+# Use the libyaml based loader when PyYAML was built with it, it is
+# considerably faster than the pure Python loader.
+try:
+    from yaml import CSafeLoader as YAMLLoader
+
+except ImportError:
+    from yaml import SafeLoader as YAMLLoader
+
 from rich.console import Console
 console = Console()
 
@@ -42,31 +53,56 @@ console = Console()
 
 from .markdown_classifiers import (
     AbsoluteURLRule,
-    ATXHeaderRule,
+    AnyATXHeaderRule,
     MarkdownAttributeSyntax,
     MarkdownImageRule,
     MarkdownLinkRule,
     RelativeMarkdownURLRule,
     MDFence,
+    shared_rule,
 )
 
-# -------------
-
+from .records import Header, RelativeLink, link_record
 
-# define the rules outside so they can take advantage of memoization
-# (if any headers repeat - probably unlikely)
-
-atx_rules = [
-    ATXHeaderRule(key="Rule 1", count=1),
-    ATXHeaderRule(key="Rule 2", count=2),
-    ATXHeaderRule(key="Rule 3", count=3),
-    ATXHeaderRule(key="Rule 4", count=4),
-    ATXHeaderRule(key="Rule 5", count=5),
-    ATXHeaderRule(key="Rule 6", count=6),
-]
+# -------------
 
-md_link_rule = MarkdownLinkRule()
-md_attribute_syntax_rule = MarkdownAttributeSyntax()
+# The number of distinct header texts memoized by `section_to_anchor`
+# and `clean_atx_header_text`. Headings like "Overview" or "Parameters"
+# repeat across a corpus.
+SECTION_CACHE_SIZE = 4096
+
+# The anchor and the display title of an ATX header
+SectionAnchor = namedtuple("SectionAnchor", ["anchor", "title"])
+
+
+# The rules come from the process-wide registry so the compiled regex and
+# memoization are shared by every call (and module) that uses them.
+
+# Headers rarely repeat, so there is no point memoizing them
+atx_header_rule = shared_rule(AnyATXHeaderRule, key="ATX Header", cache_size=0)
+
+md_link_rule = shared_rule(MarkdownLinkRule)
+md_image_rule = shared_rule(MarkdownImageRule)
+md_attribute_syntax_rule = shared_rule(MarkdownAttributeSyntax)
+absolute_url_rule = shared_rule(AbsoluteURLRule)
+relative_url_rule = shared_rule(RelativeMarkdownURLRule)
+
+
+MarkdownScan = namedtuple(
+    "MarkdownScan",
+    [
+        "headers",  # list of tuples (line number, depth, text)
+        "all_links",  # list of tuples (line number, dict)
+        "absolute_links",  # list of tuples (line number, dict)
+        "relative_links",  # list of tuples (line number, dict)
+        "image_links",  # list of tuples (line number, dict)
+        "yaml_lines",  # list of line numbers inside YAML blocks (no markers)
+        "fences",  # list of tuples (start line, end line, "code" or "yaml")
+        "text_lines",  # number of lines outside of code fences and YAML blocks
+        "prefiltered",  # number of text lines that skipped the link regex
+        "attribute_ids",  # list of tuples (line number, id) of {#id} attributes
+    ],
+)
 
 
 def find_atx_header(line, **kwargs):
@@ -93,12 +129,7 @@ def find_atx_header(line, **kwargs):
 
     """
 
-    for rule in atx_rules:
-
-        if rule.match(line):
-            return rule.atx_count, rule.extract_data(line)
-
-    return None
+    return atx_header_rule.extract_data(line)
 
 
 def find_all_atx_headers(contents, **kwargs):
@@ -146,6 +177,7 @@ def find_all_atx_headers(contents, **kwargs):
     return headers
 
 
+@lru_cache(maxsize=SECTION_CACHE_SIZE)
 def section_to_anchor(s):
     """
     Given the text of an ATX header, construct a valid anchor from it.
@@ -283,20 +315,21 @@ def extract_markdown_links(line, **kwargs):
 
     # Note
 
-    The line classifier rules perform memoization and should be
-    instantiated above the loop that calls this method. I don't expect
-    many duplicate lines so this optimization is not necessary. Mostly
-    it is about the match and the extract data
+    The line classifier rules are shared, see `shared_rule`.
 
     """
 
-    link_rule = MarkdownLinkRule()
-
     matches = []
 
-    if link_rule.match(line.strip()):
+    # Every link contains `](`, skip the regex if it isn't there.
+    if "](" not in line:
+        return matches
+
+    line = line.strip()
+
+    if md_link_rule.match(line):
 
-        matches = link_rule.extract_data(line.strip())
+        matches = md_link_rule.extract_data(line)
 
     return matches
 
@@ -332,23 +365,18 @@ def extract_relative_markdown_links(line, **kwargs):
 
     # Note
 
-    The line classifier rules perform memoization and should be
-    instantiated above the loop that calls this method. I don't expect
-    many duplicate lines so this optimization is not necessary. Mostly
-    it is about the match and the extract data
+    The line classifier rules are shared, see `shared_rule`.
 
     """
 
     matches = []
 
-    relative_rule = RelativeMarkdownURLRule()
-
     for r in extract_markdown_links(line):
 
         url = r["url"]
 
-        if relative_rule.match(url):
-            matches.append(relative_rule.extract_data(url))
+        if relative_url_rule.match(url):
+            matches.append(relative_url_rule.extract_data(url))
 
     return matches
 
@@ -378,12 +406,17 @@ def extract_markdown_image_links(line, **kwargs):
 
     """
 
-    image_rule = MarkdownImageRule()
+    # Every image link contains `![` and `](`, skip the regex if they
+    # aren't there.
+    if "![" not in line or "](" not in line:
+        return []
+
+    line = line.strip()
 
     # Contains a valid markdown link?
-    if image_rule.match(line.strip()):
+    if md_image_rule.match(line):
 
-        return image_rule.extract_data(line.strip())
+        return md_image_rule.extract_data(line)
 
     return []
 
@@ -414,15 +447,13 @@ def extract_relative_markdown_image_links(line, **kwargs):
 
     """
 
-    relative_rule = RelativeMarkdownURLRule()
-
     matches = []
 
     for m in extract_markdown_image_links(line):
 
-        if relative_rule.match(m["url"]):
+        if relative_url_rule.match(m["url"]):
 
-            result = relative_rule.extract_data(m["url"])
+            result = relative_url_rule.extract_data(m["url"])
 
             matches.append(result | m)
 
@@ -497,10 +528,7 @@ def adjust_markdown_links(line, md_file, **kwargs):
 
     # Note
 
-    The line classifier rules perform memoization and should be
-    instantiated above the loop that calls this method. I don't expect
-    many duplicate lines so this optimization is not necessary. Mostly
-    it is about the match and the extract data
+    The line classifier rules are shared, see `shared_rule`.
     """
 
     remove_relative_md_link = (
@@ -544,6 +572,7 @@ def adjust_markdown_links(line, md_file, **kwargs):
     return line
 
 
+@lru_cache(maxsize=SECTION_CACHE_SIZE)
 def clean_atx_header_text(text):
     """
     The text of the ATX header can contain links and attributes that
@@ -559,9 +588,6 @@ def clean_atx_header_text(text):
     The cleaned text
     """
 
-    md_link_rule = MarkdownLinkRule()
-    md_attribute_syntax_rule = MarkdownAttributeSyntax()
-
     # Remove attributes from the text, if any
     if md_attribute_syntax_rule.match(text):
 
@@ -583,6 +609,103 @@ def clean_atx_header_text(text):
     return text
 
 
+def section_anchors(texts):
+    """
+    Given the ATX header texts of a document, in document order,
+    return the anchor and the cleaned title for each header.
+
+    Pandoc makes the automatic identifiers unique within a document.
+    The first "Overview" header is `#overview`, the second
+    `#overview-1`, the third `#overview-2`, and so on. Identifiers
+    defined with the header attribute syntax, {#id}, are used as is.
+
+    # Parameters
+
+    texts:iterable(str)
+        - The text of the ATX headers, in the order they appear in the
+          document.
+
+    # Return
+
+    A list of `SectionAnchor(anchor, title)` tuples, one for each
+    header text.
+
+    # NOTE
+
+    The anchors and titles are memoized, only the de-duplication is
+    done per document.
+
+    """
+
+    used = set()
+    results = []
+
+    for text in texts:
+
+        anchor = section_to_anchor(text)
+
+        if anchor in used and not md_attribute_syntax_rule.match(text):
+
+            n = 1
+            while f"{anchor}-{n}" in used:
+                n += 1
+
+            anchor = f"{anchor}-{n}"
+
+        used.add(anchor)
+        results.append(SectionAnchor(anchor, clean_atx_header_text(text)))
+
+    return results
+
+
+def corpus_section_anchors(corpus):
+    """
+    Construct the anchors and cleaned titles for the headers of every
+    document in a corpus.
+
+    # Parameters
+
+    corpus:dict
+        - key - something that identifies the document (i.e. the path)
+        - value - iterable of the ATX header texts in document order
+
+    # Return
+
+    A dictionary, keyed like `corpus`, of the lists returned by
+    `section_anchors`.
+
+    """
+
+    return {key: section_anchors(texts) for key, texts in corpus.items()}
+
+
+def scan_anchors(scan):
+    """
+    Return the anchors pandoc would generate for the document, the
+    targets a `#section` in a link can point to:
+
+    - the automatic identifiers of the headers, `section_anchors`
+    - the identifiers defined with the attribute syntax, `{#id}`, on
+      headers, images, equations and tables. This includes the
+      pandoc-fignos, eqnos and tablenos labels, i.e. `{#fig:label}`.
+
+    # Parameters
+
+    scan:MarkdownScan
+        - The scan of the document.
+
+    # Return
+
+    A frozenset of the anchors (without the leading `#`).
+
+    """
+
+    anchors = {a.anchor for a in section_anchors(h.text for h in scan.headers)}
+    anchors.update(i for _, i in scan.attribute_ids)
+
+    return frozenset(anchors)
+
+
 def extract_all_markdown_links(contents, **kwargs):
     """
     Given a list of strings representing the contents of a markdown
@@ -640,11 +763,13 @@ def extract_all_markdown_links(contents, **kwargs):
            ![image caption](URL)
         - 'image' - The url to the image
 
-    """
+    # NOTE
+
+    The dictionaries are read-only, slotted records (`Link`,
+    `RelativeLink` and `ImageLink` from the records module). They
+    support the dictionary style access.
 
-    md_link_rule = MarkdownLinkRule()
-    absolute_url_rule = AbsoluteURLRule()
-    relative_url_rule = RelativeMarkdownURLRule()
+    """
 
     all_links = []
     absolute_links = []
@@ -653,52 +778,360 @@ def extract_all_markdown_links(contents, **kwargs):
 
     for i, line in markdown_outside_fence(contents):
 
-        # Contains a valid markdown link?
-        if md_link_rule.match(line.strip()):
+        _extract_line_links(
+            i,
+            line,
+            all_links,
+            absolute_links,
+            relative_links,
+            image_links,
+        )
+
+    return all_links, absolute_links, relative_links, image_links
 
-            results = md_link_rule.extract_data(line.strip())
 
-            # can be multiple links in the line...
-            for r in results:
+def _extract_line_links(
+    i,
+    line,
+    all_links,
+    absolute_links,
+    relative_links,
+    image_links,
+    intern_urls=False,
+):
+    """
+    Classify the Markdown links on a single line and append them to the
+    appropriate lists. This is the per-line work shared by
+    `extract_all_markdown_links` and `scan_markdown`.
 
-                all_links.append((i, r))
+    # Parameters
 
-                url = r["url"]
+    i:int
+        - The line number (0 based) of the line.
 
-                # Is absolute url?
-                if absolute_url_rule.match(url):
+    line:str
+        - The line to examine.
 
-                    absolute_links.append((i, r))
+    all_links, absolute_links, relative_links, image_links:list
+        - The lists that the (line number, record) tuples are appended
+          to.
 
-                # Is relative URL?
-                elif relative_url_rule.match(url):
+    intern_urls:bool
+        - Intern the URL strings of the records (`sys.intern`).
+        - Default - False
 
-                    result = relative_url_rule.extract_data(url)
+    # Return
 
-                    # Result available keys
-                    # - full - Full match
-                    # - md_span - tuple - start and end position of the
-                    #   match
-                    # - md -       the markdown url,
-                    # - section_span -  tuple - start and end position
-                    #   of attribute anchor,
-                    # - section -  attribute anchor text,
+    True if the line could not contain a link or image link and was
+    skipped without applying any regex, False otherwise.
 
-                    r["md_span"] = result["md_span"]
-                    r["md"] = result["md"]
-                    r["section_span"] = result["section_span"]
-                    r["section"] = result["section"]
+    """
 
-                    relative_links.append((i, r))
+    # Most lines are prose. Every link and image link contains `](`, so
+    # the line can be skipped without applying any regex if it doesn't.
+    if "](" not in line:
+        return True
 
-        matches = extract_markdown_image_links(line)
+    line = line.strip()
 
-        if matches:
+    # Contains a valid markdown link?
+    if md_link_rule.match(line):
 
-            for m in matches:
-                image_links.append((i, m))
+        results = md_link_rule.extract_data(line)
 
-    return all_links, absolute_links, relative_links, image_links
+        # can be multiple links in the line...
+        for r in results:
+
+            url = r.url
+
+            # Is absolute url?
+            if absolute_url_rule.match(url):
+
+                if intern_urls:
+                    r = r.interned()
+
+                absolute_links.append((i, r))
+
+            # Is relative URL?
+            elif relative_url_rule.match(url):
+
+                result = relative_url_rule.extract_data(url)
+
+                # Result available keys
+                # - full - Full match
+                # - md_span - tuple - start and end position of the
+                #   match
+                # - md -       the markdown url,
+                # - section_span -  tuple - start and end position
+                #   of attribute anchor,
+                # - section -  attribute anchor text,
+
+                r = RelativeLink.from_link(r, result)
+
+                if intern_urls:
+                    r = r.interned()
+
+                relative_links.append((i, r))
+
+            elif intern_urls:
+                r = r.interned()
+
+            all_links.append((i, r))
+
+    # Contains a valid markdown image link?
+    if "![" in line and md_image_rule.match(line):
+
+        for m in md_image_rule.extract_data(line):
+
+            if intern_urls:
+                m = m.interned()
+
+            image_links.append((i, m))
+
+    return False
+
+
+def scan_markdown(contents, **kwargs):
+    """
+    Walk the `contents` of a Markdown file once and gather everything
+    the MarkdownDocument needs: the ATX headers, the links (all,
+    absolute, relative and image), the lines that make up the YAML
+    blocks and the extent of every code fence and YAML block.
+
+    Each line is classified against the code fence and YAML block rules
+    exactly once.
+
+    # Parameters
+
+    contents:list(str)
+        - A list of strings representing every line within a Markdown
+          file.
+
+    # Parameters (kwargs)
+
+    intern_urls:bool
+        - Intern the URL strings of the links (`sys.intern`). Across a
+          corpus, the same URLs are repeated many times.
+        - Default - False
+
+    # Return
+
+    A MarkdownScan named tuple:
+
+    - headers - list of `Header` records that unpack like the tuples
+      (line number, depth, text) returned by
+      `find_all_atx_headers(contents, include_line_numbers=True)`
+    - all_links, absolute_links, relative_links, image_links - the same
+      lists as `extract_all_markdown_links`
+    - yaml_lines - list of the line numbers within YAML blocks. The
+      starting and ending markers are not included. The same as
+      `extract_yaml(contents, include_block_locations=True)`
+    - fences - list of tuples (start, end, block) - The first and last
+      line number (inclusive) of each code fence or YAML block, `block`
+      is "code" or "yaml". A block that isn't closed ends on the last
+      line of the document.
+    - text_lines - The number of lines outside of code fences and YAML
+      blocks, i.e. the lines examined for headers and links.
+    - prefiltered - The number of text lines that could not contain a
+      link (no `](`) and skipped the link regex entirely.
+    - attribute_ids - list of tuples (line number, id) of the
+      identifiers defined with the attribute syntax, `{#id}`, on
+      headers, images, equations and tables (i.e. the pandoc-fignos,
+      eqnos and tablenos labels `{#fig:label}`).
+
+    # NOTE
+
+    All line numbers are 0 based and map directly to the `contents`
+    list.
+
+    """
+
+    intern_urls = kwargs.get("intern_urls", False)
+
+    headers = []
+    all_links = []
+    absolute_links = []
+    relative_links = []
+    image_links = []
+    yaml_lines = []
+    fences = []
+    text_lines = 0
+    prefiltered = 0
+    attribute_ids = []
+
+    if contents is None:
+        return MarkdownScan(
+            headers,
+            all_links,
+            absolute_links,
+            relative_links,
+            image_links,
+            yaml_lines,
+            fences,
+            text_lines,
+            prefiltered,
+            attribute_ids,
+        )
+
+    ignore_block = MDFence()
+
+    # (start line, block name) of the block we are in, if any
+    open_block = None
+
+    i = -1
+
+    for i, line in enumerate(contents):
+
+        previous = ignore_block.current_block
+
+        if ignore_block.in_block(line):
+
+            current = ignore_block.current_block
+
+            if previous is None:
+                # opening marker of a code fence or YAML block
+                open_block = (i, current)
+
+            elif previous == "yaml" and current == "yaml":
+                # the marker lines are not part of the YAML
+                yaml_lines.append(i)
+
+            if current is None:
+                # closing marker
+                fences.append((open_block[0], i, open_block[1]))
+                open_block = None
+
+            continue
+
+        text_lines += 1
+
+        result = find_atx_header(line)
+
+        if result:
+            headers.append(Header(i, *result))
+
+        if "{" in line and "#" in line and md_attribute_syntax_rule.match(line):
+
+            for r in md_attribute_syntax_rule.extract_data(line):
+                attribute_ids.append((i, r["id"]))
+
+        if _extract_line_links(
+            i,
+            line,
+            all_links,
+            absolute_links,
+            relative_links,
+            image_links,
+            intern_urls=intern_urls,
+        ):
+            prefiltered += 1
+
+    # The end of the document closes the block automatically
+    if open_block:
+        fences.append((open_block[0], i, open_block[1]))
+
+    return MarkdownScan(
+        headers,
+        all_links,
+        absolute_links,
+        relative_links,
+        image_links,
+        yaml_lines,
+        fences,
+        text_lines,
+        prefiltered,
+        attribute_ids,
+    )
+
+
+def stream_markdown(lines):
+    """
+    Walk the lines of a Markdown file, tracking the code fences and YAML
+    blocks, yielding each line with the block it belongs to. Nothing is
+    kept, `lines` can be an open file so a very large document is never
+    held in memory.
+
+    # Parameters
+
+    lines:iterable(str)
+        - The lines of the Markdown file, i.e. a file object.
+
+    # Return
+
+    A generator of tuples (line number, line, block_state):
+
+    - line number - 0 based
+    - line - the line as it was read
+    - block_state - "code" or "yaml" if the line is part of a code
+      fence or YAML block (including the markers), None otherwise
+
+    """
+
+    ignore_block = MDFence()
+
+    for i, line in enumerate(lines):
+
+        previous = ignore_block.current_block
+
+        if ignore_block.in_block(line):
+            # the closing marker ends the block, it still belongs to it
+            yield i, line, ignore_block.current_block or previous
+
+        else:
+            yield i, line, None
+
+
+def scan_to_json(scan):
+    """
+    Convert a MarkdownScan to a dictionary that can be serialized to
+    JSON. See `scan_from_json`.
+    """
+
+    data = scan._asdict()
+
+    data["headers"] = [tuple(h) for h in scan.headers]
+
+    for key in ("all_links", "absolute_links", "relative_links", "image_links"):
+        data[key] = [(i, dict(r)) for i, r in data[key]]
+
+    return data
+
+
+def scan_from_json(data, **kwargs):
+    """
+    Rebuild the MarkdownScan from the dictionary created by
+    `scan_to_json` after it has passed through JSON. JSON turns tuples
+    into lists, this restores them and the records.
+
+    # Parameters (kwargs)
+
+    intern_urls:bool
+        - Intern the URL strings of the links (`sys.intern`).
+        - Default - False
+
+    """
+
+    intern_urls = kwargs.get("intern_urls", False)
+
+    def link(item):
+        i, d = item
+
+        r = link_record(d)
+
+        return i, r.interned() if intern_urls else r
+
+    return MarkdownScan(
+        headers=[Header(*h) for h in data["headers"]],
+        all_links=[link(item) for item in data["all_links"]],
+        absolute_links=[link(item) for item in data["absolute_links"]],
+        relative_links=[link(item) for item in data["relative_links"]],
+        image_links=[link(item) for item in data["image_links"]],
+        yaml_lines=list(data["yaml_lines"]),
+        fences=[tuple(f) for f in data["fences"]],
+        text_lines=data["text_lines"],
+        prefiltered=data["prefiltered"],
+        attribute_ids=[tuple(a) for a in data["attribute_ids"]],
+    )
 
 
 def markdown_outside_fence(contents):
@@ -843,6 +1276,33 @@ def extract_yaml(md_lines=None, include_block_locations=False):
 
     yaml_strings = [(i, line) for i, line in markdown_inside_fence(md_lines)]
 
+    yaml_block = load_yaml_lines(line for _, line in yaml_strings)
+
+    if include_block_locations:
+        return yaml_block, [i for i, _ in yaml_strings]
+
+    else:
+        return yaml_block
+
+
+def load_yaml_lines(lines):
+    """
+    Combine the lines that make up the YAML block(s) of a Markdown
+    document and convert them to a Python object.
+
+    # Parameters
+
+    lines:iterable(str)
+        - The lines within the YAML blocks, the block markers are not
+          included.
+
+    # Return
+
+    A dictionary containing the contents of the YAML blocks or None if
+    there are no lines.
+
+    """
+
     # NOTE: We can simply combine all the YAML lines into one big string
     # because the process of rehydrating the strings from YAML to
     # Python objects will handle duplicates. Duplicates from early in
@@ -851,10 +1311,109 @@ def extract_yaml(md_lines=None, include_block_locations=False):
 
     # NOTE: The lines in the Markdown contents should have a linefeed `\n`
     # at the end otherwise we'd need to supply "\n" to the join operator.
-    yaml_block = yaml.safe_load("\n".join(line for _, line in yaml_strings))
+    return yaml.load("\n".join(lines), Loader=YAMLLoader)
 
-    if include_block_locations:
-        return yaml_block, [i for i, _ in yaml_strings]
 
-    else:
-        return yaml_block
+# Returned by `find_yaml_value` when the key scan can't answer the
+# question and the YAML has to be fully parsed.
+YAML_PARSE_REQUIRED = object()
+
+# A top-level `key: value` line
+yaml_key_regex = re.compile(r"^(?P<key>[A-Za-z_][\w\-]*)[ \t]*:(?:[ \t]+(?P<value>.*?))?[ \t]*$")
+
+yaml_resolver = yaml.resolver.Resolver()
+
+
+def find_yaml_value(lines, key, default=None):
+    """
+    Look up a top-level key in the YAML block lines without parsing
+    the YAML. This is meant for the common lookups, like `UUID` and
+    `title`, that only need a simple string value.
+
+    The lines are scanned for `key: value` entries at the start of a
+    line. The last entry wins, the same as parsing the YAML. The value
+    is returned if it is a plain, single line scalar that YAML would
+    load as a string.
+
+    # Parameters
+
+    lines:iterable(str)
+        - The lines within the YAML blocks, the block markers are not
+          included.
+
+    key:str
+        - The top-level key to look up.
+
+    default:object
+        - The value to return if the key isn't defined.
+        - Default - None
+
+    # Return
+
+    The string value of the key, `default` if the key isn't defined or
+    `YAML_PARSE_REQUIRED` if the value (or the structure of the YAML)
+    is more complicated than the scan can handle. In that case, parse
+    the YAML (`load_yaml_lines`) and look up the key.
+
+    # NOTE
+
+    The scan doesn't validate the YAML. Invalid YAML is only detected
+    when it is fully parsed.
+
+    """
+
+    lines = list(lines)
+
+    found = None
+
+    for i, line in enumerate(lines):
+
+        stripped = line.strip()
+
+        # blank lines, comments and indented (nested) lines
+        if not stripped or stripped.startswith("#") or line[0] in " \t":
+            continue
+
+        m = yaml_key_regex.match(line.rstrip("\r\n"))
+
+        if m is None:
+            # Quoted or complex keys, sequences, flow collections...
+            return YAML_PARSE_REQUIRED
+
+        if m.group("key") == key:
+            found = i, m.group("value")
+
+    if found is None:
+        return default
+
+    i, value = found
+
+    if value is None:
+        # null or a nested collection on the following lines
+        return YAML_PARSE_REQUIRED
+
+    # plain scalars end at a comment, `#` after any whitespace
+    value = re.split(r"\s#", value, 1)[0].rstrip()
+
+    if (
+        not value
+        or value[0] in "\"'[]{}|>&*!%@`,?-:#"
+        or ": " in value
+        or value.endswith(":")
+    ):
+        return YAML_PARSE_REQUIRED
+
+    # A plain scalar can continue on the following, indented, lines
+    following = next((l for l in lines[i + 1 :] if l.strip()), "")
+
+    if following[:1] in (" ", "\t"):
+        return YAML_PARSE_REQUIRED
+
+    # Would YAML load the value as a string, or is it a number, date,
+    # boolean, etc.?
+    tag = yaml_resolver.resolve(yaml.ScalarNode, value, (True, False))
+
+    if tag != "tag:yaml.org,2002:str":
+        return YAML_PARSE_REQUIRED
+
+    return value
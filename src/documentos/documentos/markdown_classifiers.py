@@ -21,10 +21,277 @@ a string representing a line in a markdown file.
 # System Modules - Included with Python
 
 import re
+import threading
 
 from abc import ABC, abstractmethod, abstractproperty
+from collections import OrderedDict, namedtuple
 
 # ------------
+# Custom Modules
+
+from .records import Link, ImageLink
+
+# ------------
+
+# The default number of results each rule will memoize
+DEFAULT_CACHE_SIZE = 4096
+
+CacheInfo = namedtuple(
+    "CacheInfo",
+    [
+        "hits",  # number of lookups answered from the cache
+        "misses",  # number of lookups that had to be calculated
+        "evictions",  # number of items dropped to stay within maxsize
+        "maxsize",  # the capacity of the cache, None is unbounded
+        "currsize",  # the number of items in the cache
+    ],
+)
+
+
+class LRUCache:
+    """
+    A size-bounded, least recently used (LRU) cache that keeps track of
+    the hits, misses and evictions so we can tell if memoization is
+    paying for itself.
+
+    # Usage
+
+    ```
+    cache = LRUCache(maxsize=2)
+
+    value = cache.lookup(key)
+
+    if value is LRUCache.missing:
+        value = expensive(key)
+        cache.store(key, value)
+
+    cache.info()
+    ```
+
+    """
+
+    # Sentinel returned by `lookup` when the key isn't in the cache. None
+    # is a valid cached value.
+    missing = object()
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        """
+
+        # Parameters
+
+        maxsize:int
+            - The maximum number of items to hold. The least recently
+              used item is evicted when the cache is full.
+            - None - the cache is unbounded
+            - 0 - nothing is cached
+            - Default - DEFAULT_CACHE_SIZE
+
+        """
+
+        if maxsize is not None and maxsize < 0:
+            raise ValueError(f"maxsize = {maxsize}. It has to be 0 or greater.")
+
+        self.maxsize = maxsize
+
+        self._data = OrderedDict()
+
+        # rules are shared between threads, see `RuleRegistry`
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def __getstate__(self):
+        # locks cannot be pickled (multiprocessing)
+        state = self.__dict__.copy()
+        del state["_lock"]
+
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def lookup(self, key):
+        """
+        Return the value stored against the key and mark it as the most
+        recently used. If the key isn't in the cache, `LRUCache.missing`
+        is returned.
+        """
+
+        with self._lock:
+
+            try:
+                value = self._data[key]
+
+            except KeyError:
+                self.misses += 1
+                return LRUCache.missing
+
+            self._data.move_to_end(key)
+            self.hits += 1
+
+            return value
+
+    def store(self, key, value):
+        """
+        Store the value against the key, evicting the least recently
+        used items if the cache is full.
+        """
+
+        if self.maxsize == 0:
+            return
+
+        with self._lock:
+
+            self._data[key] = value
+            self._data.move_to_end(key)
+
+            if self.maxsize is not None:
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+                    self.evictions += 1
+
+    def clear(self):
+        """
+        Remove all the items from the cache and reset the counters.
+        """
+
+        with self._lock:
+            self._data.clear()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def info(self):
+        """
+        Return a CacheInfo named tuple with the cache statistics.
+        """
+
+        return CacheInfo(
+            self.hits,
+            self.misses,
+            self.evictions,
+            self.maxsize,
+            len(self._data),
+        )
+
+
+class RuleRegistry:
+    """
+    A process-wide registry of shared rule instances. Building a rule
+    compiles its regex and starts an empty memoization cache, so rules
+    should be built once and reused rather than constructed on every
+    call.
+
+    The registry hands out one instance per rule class and keyword
+    arguments. The instances are safe to share between threads.
+
+    # Usage
+
+    ```
+    link_rule = shared_rule(MarkdownLinkRule)
+
+    if link_rule.match(line):
+        ...
+
+    # memoization statistics for every shared rule
+    rule_registry.cache_info()
+    ```
+
+    """
+
+    def __init__(self):
+        """ """
+
+        self._rules = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._rules)
+
+    def get(self, rule_class, **kwargs):
+        """
+        Return the shared instance of `rule_class` constructed with
+        `kwargs`, building it on first use.
+
+        # Parameters
+
+        rule_class:MatchRule
+            - The class of the rule to return.
+
+        # Parameters (kwargs)
+
+        Passed to the rule constructor. They must be hashable. Each
+        unique set of kwargs is a separate instance.
+
+        """
+
+        key = (rule_class, tuple(sorted(kwargs.items())))
+
+        rule = self._rules.get(key)
+
+        if rule is None:
+            with self._lock:
+
+                # another thread may have beaten us to it
+                rule = self._rules.get(key)
+
+                if rule is None:
+                    rule = rule_class(**kwargs)
+                    self._rules[key] = rule
+
+        return rule
+
+    def cache_info(self):
+        """
+        Return a dictionary mapping a description of each shared rule
+        to its CacheInfo. The description is the rule class name
+        followed by the keyword arguments, if any, i.e.
+        `MarkdownLinkRule` or `AnyATXHeaderRule(cache_size=0, key=...)`.
+        """
+
+        info = {}
+
+        for (rule_class, kwargs), rule in list(self._rules.items()):
+
+            name = rule_class.__name__
+
+            if kwargs:
+                name += "(" + ", ".join(f"{k}={v!r}" for k, v in kwargs) + ")"
+
+            info[name] = rule.cache_info()
+
+        return info
+
+    def clear(self):
+        """
+        Remove all the shared rules.
+        """
+
+        with self._lock:
+            self._rules.clear()
+
+
+# The registry shared by the whole process
+rule_registry = RuleRegistry()
+
+
+def shared_rule(rule_class, **kwargs):
+    """
+    Return the process-wide shared instance of `rule_class`. See
+    `RuleRegistry.get`.
+    """
+
+    return rule_registry.get(rule_class, **kwargs)
 
 
 class MatchRule(ABC):
@@ -51,6 +318,13 @@ class MatchRule(ABC):
 
         key: str
             - A reference key to identify this rule
+
+        cache_size: int
+            - The number of match results to memoize. The least recently
+              used results are evicted once the limit is reached.
+            - None - unbounded
+            - 0 - disable memoization
+            - Default - DEFAULT_CACHE_SIZE
         """
 
         self.kwargs = kwargs
@@ -61,7 +335,9 @@ class MatchRule(ABC):
         self.disabled = False
 
         # memoization - store the match results keyed by string
-        self.cache_results = {}
+        self.cache_results = LRUCache(
+            maxsize=kwargs.get("cache_size", DEFAULT_CACHE_SIZE)
+        )
 
         self.regex = None
 
@@ -88,17 +364,29 @@ class MatchRule(ABC):
 
         """
 
-        result = None
-
-        if line in self.cache_results:
-            result = self.cache_results[line]
+        result = self.cache_results.lookup(line)
 
-        else:
+        if result is LRUCache.missing:
             result = self._find_result(line)
-            self.cache_results[line] = result
+            self.cache_results.store(line, result)
 
         return result
 
+    def cache_info(self):
+        """
+        Return the memoization statistics for this rule as a CacheInfo
+        named tuple (hits, misses, evictions, maxsize, currsize).
+        """
+
+        return self.cache_results.info()
+
+    def cache_clear(self):
+        """
+        Empty the memoization cache and reset its statistics.
+        """
+
+        self.cache_results.clear()
+
     @abstractmethod
     def _build_regex(self):
         """
@@ -243,11 +531,7 @@ class MarkdownLinkRule(MatchRule):
         """ """
 
         result = [
-            {
-                "full": m.group(),
-                "text": m.group("text"),
-                "url": m.group("url"),
-            }
+            Link(m.group(), m.group("text"), m.group("url"))
             for m in self.regex.finditer(line)
         ]
 
@@ -556,11 +840,7 @@ class MarkdownImageRule(MatchRule):
         """ """
 
         result = [
-            {
-                "full": m.group(),
-                "caption": m.group("caption"),
-                "url": m.group("url"),
-            }
+            ImageLink(m.group(), m.group("caption"), m.group("url"))
             for m in self.regex.finditer(line)
         ]
 
@@ -789,6 +1069,89 @@ class ATXHeaderRule(MatchRule):
         return self._get_match_result(line)
 
 
+class AnyATXHeaderRule(MatchRule):
+    """
+    Examines the line to see if it is an ATX header of any level (1 to
+    6). Unlike ATXHeaderRule, which matches a single level, this rule
+    determines the level and the title with one regex match.
+
+    ```
+    # Section One           <- match (1, "Section One")
+    ### Section Three       <- match (3, "Section Three")
+    ## # Section Three      <- match (2, "# Section Three")
+       ###### six           <- match (6, "six")
+        # Four spaces       <- no match
+    ####### Seven           <- no match
+    Not a header            <- no match
+    ```
+
+    An ATX header has an octothorpe within its first four characters
+    (up to 3 leading spaces). Lines that fail that check are rejected
+    before the regex, or the cache, is consulted. Most lines in a
+    document are not headers.
+
+    # Reference
+
+    https://spec.commonmark.org/0.24/#atx-headings
+
+    """
+
+    def _build_regex(self):
+        """
+        Construct the regex that will match an ATX header of any level.
+        """
+
+        local_regex = r"^\s{0,3}(?P<level>\#{1,6})\s+(?P<title>.*)$"
+
+        self.regex = re.compile(local_regex)
+
+    @property
+    def is_full_match(self):
+        """
+        This rule doesn't match the full string, so other rules can be
+        applied to the same line of text.
+        """
+
+        return False
+
+    def _find_result(self, line):
+        """ """
+
+        result = self.regex.match(line)
+
+        if result:
+            return len(result.group("level")), result.group("title")
+
+        else:
+            return None
+
+    def match(self, line):
+        """
+        True is returned if the line is an ATX header.
+        """
+
+        return self.extract_data(line) is not None
+
+    def extract_data(self, line, **kwargs):
+        """
+        Attempts to extract the information from the line if there is a
+        match. If there is no match, None is returned.
+
+        # Return
+
+        A match will return a tuple containing the header level (1 to
+        6) and the title text.
+
+        If no match is found, None is returned
+
+        """
+
+        if "#" not in line[:4]:
+            return None
+
+        return self._get_match_result(line)
+
+
 class MarkdownAttributeSyntax(MatchRule):
     """
     Looks for any attribute syntax in the markdown line. We are
@@ -1024,14 +1387,29 @@ class MDFence:
 
     def __init__(self):
         """ """
-        self.code_rule = CodeFenceClassifier()
-        self.yaml_rule = YamlBlockClassifier()
+        self.code_rule = shared_rule(CodeFenceClassifier)
+        self.yaml_rule = shared_rule(YamlBlockClassifier)
 
         self.in_block_type = {
             "code": False,
             "yaml": False,
         }
 
+    @property
+    def current_block(self):
+        """
+        The name of the block we are currently in ("code" or "yaml") or
+        None if we are not in a block.
+        """
+
+        if self.in_block_type["code"]:
+            return "code"
+
+        if self.in_block_type["yaml"]:
+            return "yaml"
+
+        return None
+
     def in_block(self, line):
         """ """
 
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+
+# -----------
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2021 Troy Williams
+
+# uuid:   0d6f8c1a-fe9b-11eb-9a03-0242ac130003
+# author: Troy Williams
+# email:  troy.williams@bluebill.net
+# date:   2021-08-16
+# -----------
+
+"""
+Compact record types for the links and headers extracted from the
+Markdown documents.
+
+A large corpus holds hundreds of thousands of links. These records use
+`__slots__` instead of a dictionary per link. The link records behave
+like read-only dictionaries (`link["url"]`, `link.get("section")`,
+`dict(link)`) so the code and plugins that expect the original
+dictionaries continue to work.
+"""
+
+# ------------
+# System Modules - Included with Python
+
+import sys
+
+from collections.abc import Mapping
+
+# -------------
+
+
+class Record(Mapping):
+    """
+    The base class of the link records. The `_fields` are the keys of
+    the mapping and are stored in slots.
+
+    Records compare equal to dictionaries with the same keys and values.
+    """
+
+    __slots__ = ()
+
+    _fields = ()
+
+    def __init__(self, *args, **kwargs):
+
+        # Records are constructed for every link in the corpus, make the
+        # common case, all of the fields by position, fast.
+        if not kwargs and len(args) == len(self._fields):
+
+            for key, value in zip(self._fields, args):
+                object.__setattr__(self, key, value)
+
+            return
+
+        if len(args) > len(self._fields):
+            raise TypeError(
+                f"{type(self).__name__} takes at most {len(self._fields)} arguments"
+            )
+
+        values = dict(zip(self._fields, args))
+
+        for key, value in kwargs.items():
+
+            if key not in self._fields:
+                raise TypeError(f"{type(self).__name__} has no field `{key}`")
+
+            if key in values:
+                raise TypeError(f"{type(self).__name__} got multiple values for `{key}`")
+
+            values[key] = value
+
+        for key in self._fields:
+            object.__setattr__(self, key, values.get(key))
+
+    def __setattr__(self, key, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __getitem__(self, key):
+
+        if key in self._fields:
+            return getattr(self, key)
+
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __contains__(self, key):
+        return key in self._fields
+
+    def __repr__(self):
+
+        values = ", ".join(f"{k}={getattr(self, k)!r}" for k in self._fields)
+
+        return f"{type(self).__name__}({values})"
+
+    def __reduce__(self):
+        return (type(self), tuple(getattr(self, k) for k in self._fields))
+
+    # Merging with a dictionary, `record | d` or `d | record`, returns a
+    # new dictionary the same as it would for two dictionaries.
+
+    def __or__(self, other):
+
+        if isinstance(other, Mapping):
+            return dict(self) | dict(other)
+
+        return NotImplemented
+
+    def __ror__(self, other):
+
+        if isinstance(other, Mapping):
+            return dict(other) | dict(self)
+
+        return NotImplemented
+
+    def _replace(self, **kwargs):
+        """
+        Return a new record with the `kwargs` fields replaced.
+        """
+
+        values = {k: getattr(self, k) for k in self._fields}
+        values.update(kwargs)
+
+        return type(self)(**values)
+
+
+class Link(Record):
+    """
+    A Markdown link, `[text](url)`.
+
+    # Fields
+
+    - full - The full regex match - [text](url)
+    - text - The text portion of the markdown link
+    - url - The URL portion of the markdown link
+
+    """
+
+    __slots__ = ("full", "text", "url")
+
+    _fields = __slots__
+
+    def interned(self):
+        """
+        Return the record with the URL strings interned. Documents
+        often link to the same URLs (index pages, images, etc.), only
+        one copy of each is kept.
+        """
+
+        return Link(self.full, self.text, intern(self.url))
+
+
+class RelativeLink(Link):
+    """
+    A Markdown link to a relative URL, `[text](../file.md#section)`.
+
+    # Fields
+
+    The fields of `Link` and:
+
+    - md_span - tuple(start, end) of the file portion of the url
+    - md - The file portion of the url
+    - section_span - tuple(start, end) of the section anchor
+    - section - The section anchor, `#section` or None
+
+    """
+
+    __slots__ = ("md_span", "md", "section_span", "section")
+
+    _fields = Link._fields + __slots__
+
+    @classmethod
+    def from_link(cls, link, result):
+        """
+        Combine a `Link` and the `RelativeMarkdownURLRule` result for
+        its URL.
+        """
+
+        return cls(
+            link.full,
+            link.text,
+            link.url,
+            result["md_span"],
+            result["md"],
+            result["section_span"],
+            result["section"],
+        )
+
+    def interned(self):
+        """
+        Return the record with the URL strings interned.
+        """
+
+        return RelativeLink(
+            self.full,
+            self.text,
+            intern(self.url),
+            self.md_span,
+            intern(self.md),
+            self.section_span,
+            intern(self.section),
+        )
+
+
+class ImageLink(Record):
+    """
+    A Markdown image link, `![caption](url)`.
+
+    # Fields
+
+    - full - The full regex match - ![caption](url)
+    - caption - The caption of the image
+    - url - The URL of the image
+
+    """
+
+    __slots__ = ("full", "caption", "url")
+
+    _fields = __slots__
+
+    def interned(self):
+        """
+        Return the record with the URL strings interned.
+        """
+
+        return ImageLink(self.full, self.caption, intern(self.url))
+
+
+class Header:
+    """
+    An ATX header. It unpacks like the (line number, depth, text) tuple
+    it replaces:
+
+    ```
+    for line, depth, text in scan.headers:
+        ...
+    ```
+
+    """
+
+    __slots__ = ("line", "depth", "text")
+
+    def __init__(self, line, depth, text):
+        self.line = line
+        self.depth = depth
+        self.text = text
+
+    def __iter__(self):
+        yield self.line
+        yield self.depth
+        yield self.text
+
+    def __len__(self):
+        return 3
+
+    def __getitem__(self, index):
+        return (self.line, self.depth, self.text)[index]
+
+    def __eq__(self, other):
+
+        if isinstance(other, (Header, tuple)):
+            return tuple(self) == tuple(other)
+
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __repr__(self):
+        return f"Header(line={self.line!r}, depth={self.depth!r}, text={self.text!r})"
+
+    def __reduce__(self):
+        return (Header, (self.line, self.depth, self.text))
+
+
+def intern(s):
+    """
+    `sys.intern` that passes None through.
+    """
+
+    return None if s is None else sys.intern(s)
+
+
+def link_record(d):
+    """
+    Construct the appropriate record from a link dictionary, i.e. one
+    that has been through JSON.
+    """
+
+    if "md" in d:
+        d = dict(d)
+
+        for key in ("md_span", "section_span"):
+            d[key] = tuple(d[key])
+
+        return RelativeLink(**d)
+
+    if "caption" in d:
+        return ImageLink(**d)
+
+    return Link(**d)
@@ -18,7 +18,10 @@ This module contains common validation routines.
 # ------------
 # System Modules - Included with Python
 
+import os
+
 from collections import namedtuple
+from pathlib import Path
 
 
 # ------------
@@ -36,6 +39,7 @@ console = Console()
 from .markdown_classifiers import (
     AbsoluteURLRule,
     RelativeMarkdownURLRule,
+    shared_rule,
 )
 
 # -------------
@@ -72,7 +76,7 @@ def validate_absolute_url(url):
 
     """
 
-    absolute_url_rule = AbsoluteURLRule()
+    absolute_url_rule = shared_rule(AbsoluteURLRule)
 
     # Is URL Absolute?
     if absolute_url_rule.match(url):
@@ -107,13 +111,15 @@ def validate_absolute_url(url):
     return None
 
 
-def validate_relative_url(url, document=None):
+def validate_relative_url(url, document=None, **kwargs):
     """
     Given a relative URL, check to see if it is valid They should be of
     the form:
 
     - ../../documents/help.md
     - ../assets/excel.csv
+    - ../../documents/help.md#section
+    - #section
 
     # Parameters
 
@@ -123,13 +129,21 @@ def validate_relative_url(url, document=None):
     document:pathlib.Path
         - The path to the document containing the URL.
 
+    # Parameters (kwargs)
+
+    anchors:AnchorIndex
+        - If provided, the `#section` portion of the URL is checked
+          against the anchors of the target document. Documents that
+          aren't in the index are not checked.
+        - Default - None
+
     # Return
 
     If there is a problem, a string indicating the problem is returned.
     Otherwise, None is returned.
     """
 
-    relative_url_rule = RelativeMarkdownURLRule()
+    relative_url_rule = shared_rule(RelativeMarkdownURLRule)
 
     if relative_url_rule.match(url):
 
@@ -138,12 +152,27 @@ def validate_relative_url(url, document=None):
         if results["md"] is None and results["section"] is None:
             return "Empty - Relative Link"
 
-        elif results["md"]:
-            file = document.parent.joinpath(results["md"]).resolve()
+        file = document
+
+        if results["md"]:
+            # normalized the same way as the AnchorIndex keys, resolving
+            # symlinks would miss the index
+            file = Path(
+                os.path.normpath(
+                    os.path.abspath(document.parent.joinpath(results["md"]))
+                )
+            )
 
             if not file.exists():
                 return "Broken - Relative Link!"
 
+        anchors = kwargs.get("anchors", None)
+
+        if anchors is not None and results["section"]:
+
+            if anchors.has_anchor(file, results["section"][1:]) is False:
+                return "Broken - Section Anchor!"
+
     else:
         return "Not a valid relative URL!"
 
@@ -171,7 +200,7 @@ def validate_image_url(url, document=None, **kwargs):
 
     """
 
-    absolute_url_rule = AbsoluteURLRule()
+    absolute_url_rule = shared_rule(AbsoluteURLRule)
 
     if absolute_url_rule.match(url):
 
@@ -123,3 +123,56 @@ class JSONMinimum(JSONDocumentPlugin):
             )
 
         return json.dumps(docs)
+
+    def update(self, previous, documents=None, changed=None, root=None, ignore=None):
+        """
+        Update the JSON document of a previous build. The entries of the
+        `changed` documents, and of documents that aren't in `previous`,
+        are generated, the rest are taken from `previous`. The contents
+        of the unchanged documents are not read.
+
+        # Parameters
+
+        See `JSONDocumentPlugin.update`.
+
+        # Return
+
+        A valid JSON string representing the contents of the documents.
+
+        """
+
+        try:
+            entries = {entry["file"]: entry for entry in json.loads(previous)}
+
+        except (ValueError, TypeError, KeyError):
+            return self(documents=documents, root=root, ignore=ignore)
+
+        changed = set(changed or ())
+
+        stale = [
+            md
+            for md in documents
+            if md in changed or str(md.filename.relative_to(root)) not in entries
+        ]
+
+        generated = {
+            entry["file"]: entry
+            for entry in json.loads(self(documents=stale, root=root, ignore=ignore))
+        }
+
+        stale = set(stale)
+
+        # Keep the order of the documents, documents that are no longer
+        # part of the build (or are ignored) are dropped
+        docs = []
+
+        for md in documents:
+
+            file = str(md.filename.relative_to(root))
+
+            entry = generated.get(file) if md in stale else entries.get(file)
+
+            if entry is not None:
+                docs.append(entry)
+
+        return json.dumps(docs)
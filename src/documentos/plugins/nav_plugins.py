@@ -57,6 +57,11 @@ class BasicCSV(NavigationPlugin):
 
     """
 
+    # The name of the file written to the output folder
+    filename = 'url_map.csv'
+
+    headers = ['uuid', 'title', 'path']
+
     def __call__(
         self,
         document_root=None,
@@ -91,38 +96,90 @@ class BasicCSV(NavigationPlugin):
 
         """
 
-        csv_file = output / 'url_map.csv'
+        self._write(output, [self._row(md, document_root) for md in documents])
 
-        headers = ['uuid', 'title', 'path']
+    def update(
+        self,
+        document_root=None,
+        output=None,
+        documents=None,
+        changed=None,
+        **kwargs,
+    ):
+        """
+        Update the CSV file of a previous build. The rows of the
+        `changed` documents, and of documents that aren't in the file,
+        are generated, the rest are taken from the file.
 
-        with csv_file.open("w", encoding="utf-8") as fo:
-            writer = csv.DictWriter(fo, fieldnames=headers)
-            writer.writeheader()
+        # Parameters
+
+        See `NavigationPlugin.update`.
+
+        """
+
+        csv_file = output / self.filename
+
+        try:
+            with csv_file.open("r", encoding="utf-8", newline="") as fin:
+                rows = {row["path"]: row for row in csv.DictReader(fin)}
 
-            for md in documents:
+        except (OSError, KeyError, csv.Error):
+            return self(document_root=document_root, output=output, documents=documents, **kwargs)
 
-                uuid = ''
-                title = ''
+        changed = set(changed or ())
 
-                if md.yaml_block is None:
-                    console.print(f'YAML Block MISSING - Skipping - {md.filename}')
+        results = []
 
-                elif 'UUID' not in md.yaml_block:
-                    console.print(f'YAML Block KEY MISSING - UUID - Skipping - {md.filename}')
+        for md in documents:
 
-                else:
+            row = rows.get(str(self._path(md, document_root)))
 
-                    uuid = md.yaml_block.get('UUID', '')
-                    title = md.yaml_block.get('title', '')
+            if md in changed or row is None:
+                row = self._row(md, document_root)
 
-                row = {
-                    "uuid":uuid,
-                    'title':title,
-                    'path':relative_path(md.filename.parent, document_root) / f'{md.filename.stem}.html',
-                }
+            results.append(row)
 
-                # log.debug(f"Writing: {md.filename}")
+        self._write(output, results)
+
+    @staticmethod
+    def _path(md, document_root):
+        return relative_path(md.filename.parent, document_root) / f'{md.filename.stem}.html'
+
+    def _row(self, md, document_root):
+        """
+        Construct the CSV row of the document.
+        """
+
+        uuid = ''
+        title = ''
+
+        if not md.scan.yaml_lines:
+            console.print(f'YAML Block MISSING - Skipping - {md.filename}')
+
+        elif md.yaml_value('UUID') is None:
+            console.print(f'YAML Block KEY MISSING - UUID - Skipping - {md.filename}')
+
+        else:
+
+            uuid = md.yaml_value('UUID', '')
+            title = md.yaml_value('title', '')
+
+        return {
+            "uuid":uuid,
+            'title':title,
+            'path':self._path(md, document_root),
+        }
+
+    def _write(self, output, rows):
+
+        csv_file = output / self.filename
+
+        with csv_file.open("w", encoding="utf-8") as fo:
+            writer = csv.DictWriter(fo, fieldnames=self.headers)
+            writer.writeheader()
+
+            for row in rows:
+                # log.debug(f"Writing: {row['path']}")
                 writer.writerow(row)
 
         # log.debug("BasicCSV - Completed.")
-
@@ -31,12 +31,7 @@ console = Console()
 
 from ..documentos.common import relative_path
 
-from ..documentos.document import MarkdownDocument
-
-from ..documentos.markdown import (
-    section_to_anchor,
-    clean_atx_header_text,
-)
+from ..documentos.markdown import section_anchors
 
 from ..tools.plugins import TOCPlugin, register
 
@@ -106,7 +101,7 @@ class BasicTableOfContents(TOCPlugin):
             if path in ignore:
                 continue
 
-            md = MarkdownDocument(path)
+            md = lst.store.get(path)
 
             md_relative = relative_path(lst.filename.parent, path.parent)
             url = Path(md_relative).joinpath(path.name)
@@ -127,27 +122,36 @@ class BasicTableOfContents(TOCPlugin):
 
             try:
 
-                yb = md.yaml_block
+                title = md.yaml_value("title")
 
             except Exception as e:
                 raise Exception(f'YAML Block Error - {md.filename}').with_traceback(e.__traceback__)
 
-            if yb and "title" in yb:
-                sanitized_file_name = yb["title"]
+            if title is not None:
+                sanitized_file_name = title
 
             toc.append(f"- [{sanitized_file_name}]({url})" + "{.toc-file}")
 
+            # The anchors have to be de-duplicated in document order, key
+            # them by line number
+            anchors = dict(
+                zip(
+                    (line for line, _, _ in md.scan.headers),
+                    section_anchors(text for _, _, text in md.scan.headers),
+                )
+            )
+
             for atx_depth in md.headers:
 
                 # do we skip the ATX header level?
                 if atx_depth > depth:
                     continue
 
-                for _, text in md.headers[atx_depth]:
+                for line, _ in md.headers[atx_depth]:
 
-                    anchor = section_to_anchor(text)
+                    anchor, text = anchors[line]
 
-                    text = clean_atx_header_text(text).title()
+                    text = text.title()
 
                     # if the first header matches the file name, we'll skip it
                     if text == sanitized_file_name:
@@ -32,6 +32,8 @@ from pathlib import Path
 import click
 import toml
 
+from appdirs import AppDirs
+
 from rich.traceback import install
 install(show_locals=False)
 
@@ -42,6 +44,10 @@ console = Console()
 # Custom Modules
 
 from ..documentos.common import find_folder_on_path
+from ..documentos.document import LSTResolver, DocumentStore
+from ..documentos.discovery import default_ignore
+from ..documentos.cache import ManifestCache, LinkIndexCache
+from ..documentos.build_manifest import OutputCache
 
 from .html import html
 from .pdf import pdf
@@ -50,6 +56,12 @@ from .plugins import load_module
 
 # -------------
 
+# The same application information as `docs` so the cache folder is
+# shared
+
+__appname__ = "docs"
+__company__ = "bluebill.net"
+
 
 def setup(cfg):
     """
@@ -106,6 +118,62 @@ def setup(cfg):
 
         config["ignore_toc"] = set()
 
+    # The folders that are never searched for documents
+    config["ignore_folders"] = default_ignore(config)
+
+    dirs = AppDirs()
+
+    config["cache_folder"] = (
+        Path(dirs.user_cache_dir).joinpath(__company__).joinpath(__appname__)
+    )
+
+    config["manifest_cache"] = ManifestCache(config["cache_folder"])
+
+    # The link index shared with `docs links`, a partial build uses it
+    # to find the pages linking to documents that were moved
+    config["link_cache"] = LinkIndexCache(config["cache_folder"])
+
+    # The opt-in cache of the pandoc outputs, shared by every checkout
+    # of the documents
+    config["pandoc_output_cache"] = None
+
+    output_cache = config.get("output_cache", {})
+
+    if output_cache.get("enabled", False):
+
+        folder = config["cache_folder"]
+
+        if output_cache.get("folder"):
+            folder = config["root"].joinpath(Path(output_cache["folder"]).expanduser())
+
+        max_size = output_cache.get("max_size", None)
+
+        config["pandoc_output_cache"] = OutputCache(
+            folder,
+            max_size=None if max_size is None else int(max_size * 2**20),
+            link=output_cache.get("link", True),
+        )
+
+    # The documents are piped to pandoc unless a staging folder is
+    # configured
+    if config.get("staging_folder"):
+        config["staging_folder"] = config["root"].joinpath(
+            Path(config["staging_folder"]).expanduser()
+        )
+
+    else:
+        config["staging_folder"] = None
+
+    # One resolver for the run so the LST files are only read once
+    config["lst_resolver"] = LSTResolver(cache=config["manifest_cache"])
+
+    # One MarkdownDocument per file for the run, shared by the build
+    # stages and the plugins
+    config["document_store"] = DocumentStore(
+        memory_map=config["documents"].get("memory_map", False),
+        streaming=config["documents"].get("streaming", False),
+    )
+
     return config
 
 
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+
+# -----------
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2021 Troy Williams
+
+# uuid  : 9a6d1c44-fd1c-11eb-9a03-0242ac130003
+# author: Troy Williams
+# email : troy.williams@bluebill.net
+# date  : 2021-08-14
+# -----------
+
+"""
+The `cache` command manages the persistent cache used by the `docs`
+commands.
+"""
+
+# ------------
+# System Modules - Included with Python
+
+import json
+
+from pathlib import Path
+
+# ------------
+# 3rd Party - From pip
+
+import click
+
+from rich.console import Console
+console = Console()
+
+# ------------
+# Custom Modules
+
+from ..documentos.document import LSTDocument
+from ..documentos.cache import manifest_to_json
+
+# -------------
+
+
+@click.group("cache")
+@click.pass_context
+def cache(*args, **kwargs):
+    """
+    \b
+    Manage the cache of parsed Markdown metadata (headers, links, YAML
+    and code fence locations) that the `validate`, `repair` and `graph`
+    commands use to avoid re-reading unchanged files, the cache of
+    resolved LST manifests, the link index and the pandoc outputs cached
+    by `build`.
+
+    # Usage
+
+    $ docs --config=./en/config.common.toml cache stats
+
+    $ docs --config=./en/config.common.toml cache clear
+
+    $ docs --config=./en/config.common.toml cache manifest ./en/documents/sites.lst
+
+    """
+
+    pass
+
+
+@cache.command("stats")
+@click.pass_context
+def stats(*args, **kwargs):
+    """
+    \b
+    Display the location, number of entries and size of the cache.
+
+    # Usage
+
+    $ docs --config=./en/config.common.toml cache stats
+
+    """
+
+    config = args[0].obj["cfg"]
+
+    for name in ("parse_cache", "manifest_cache", "link_cache", "pandoc_output_cache"):
+
+        info = config[name].stats()
+
+        console.print(f'Folder:  {info["folder"]}')
+        console.print(f'Entries: {info["entries"]:>10,}')
+        console.print(f'Stale:   {info["stale"]:>10,}')
+        console.print(f'Size:    {info["size"] / 1024:>10,.1f} KiB')
+        console.print("")
+
+
+@cache.command("clear")
+@click.pass_context
+def clear(*args, **kwargs):
+    """
+    \b
+    Remove all of the entries from the cache.
+
+    # Usage
+
+    $ docs --config=./en/config.common.toml cache clear
+
+    """
+
+    config = args[0].obj["cfg"]
+
+    for name in ("parse_cache", "manifest_cache", "link_cache", "pandoc_output_cache"):
+
+        info = config[name].stats()
+
+        config[name].clear()
+
+        console.print(f'Removed {info["entries"]:,} entries from {info["folder"]}...')
+
+
+@cache.command("manifest")
+@click.pass_context
+@click.argument(
+    "lst",
+    type=click.Path(exists=True, dir_okay=False, readable=True, resolve_path=True),
+)
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(dir_okay=False, writable=True),
+    help="Write the manifest to this file instead of the console.",
+)
+def manifest(*args, **kwargs):
+    """
+    \b
+    Display the resolved manifest of the LST file as JSON, the ordered
+    list of Markdown files and the LST files it depends on. The paths
+    are relative to the documents folder so the manifests from two
+    commits can be compared with diff.
+
+    # Usage
+
+    $ docs --config=./en/config.common.toml cache manifest ./en/documents/sites.lst
+
+    $ docs --config=./en/config.common.toml cache manifest ./en/documents/sites.lst -o all.json
+
+    """
+
+    config = args[0].obj["cfg"]
+
+    lst = LSTDocument(Path(kwargs["lst"]), resolver=config["lst_resolver"])
+
+    data = manifest_to_json(lst.filename, lst.manifest, root=config["documents.path"])
+
+    text = json.dumps(data, indent=2) + "\n"
+
+    if kwargs["output"]:
+        Path(kwargs["output"]).write_text(text, encoding="utf-8")
+
+    else:
+        # plain output, the console would add markup and wrapping
+        click.echo(text, nl=False)
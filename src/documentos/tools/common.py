@@ -19,12 +19,18 @@ Methods shared among the various tools.
 # ------------
 # System Modules - Included with Python
 
+# ------------
+# Custom Modules
+
+from ..documentos.discovery import discover, DEFAULT_IGNORE
+
 # ------------
 
 
 def search(
     path=None,
     extensions=None,
+    ignore=DEFAULT_IGNORE,
 ):
     """
 
@@ -38,21 +44,18 @@ def search(
         - Default - None
         - Note: it has to be dotted i.e. .md and not md
 
+    ignore:iterable(str)
+        - The folders that are not searched, see `discovery.discover`.
+        - Default - DEFAULT_IGNORE (`.git` and `.venv`)
+
     # Return
 
-    A dictionary keyed by extension containing a list of Path objects
+    A dictionary keyed by file name containing a list of Path objects
     discovered.
 
     """
 
-    files = {}
-
-    for f in path.rglob("*.*"):
-
-        if f.suffix.lower() in extensions:
-            files.setdefault(f.name, []).append(f)
-
-    return files
+    return discover(path, extensions=extensions, ignore=ignore).names()
 
 
 # def get_basic_logger(level=logging.INFO):
@@ -39,10 +39,16 @@ console = Console()
 # Custom Modules
 
 from ..documentos.common import find_folder_on_path
+from ..documentos.cache import ParseCache, ManifestCache, LinkIndexCache
+from ..documentos.build_manifest import OutputCache
+from ..documentos.document import LSTResolver, DocumentStore
+from ..documentos.discovery import default_ignore
 
 from .stats import stats
 from .graph import graph
 from .validate import validate
+from .cache import cache
+from .links import links
 
 from .repair import repair
 
@@ -97,12 +103,30 @@ def setup(cfg):
 
     config["documents.path"] = config["root"].joinpath(config["documents"]["path"])
 
+    # The folders that are never searched for documents
+    config["ignore_folders"] = default_ignore(config)
+
     dirs = AppDirs()
 
     config["cache_folder"] = (
         Path(dirs.user_cache_dir).joinpath(__company__).joinpath(__appname__)
     )
 
+    config["parse_cache"] = ParseCache(config["cache_folder"])
+
+    config["manifest_cache"] = ManifestCache(config["cache_folder"])
+
+    config["link_cache"] = LinkIndexCache(config["cache_folder"])
+
+    # The pandoc outputs cached by `build` (in the default location)
+    config["pandoc_output_cache"] = OutputCache(config["cache_folder"])
+
+    # One MarkdownDocument per file for the run
+    config["document_store"] = DocumentStore(cache=config["parse_cache"])
+
+    # One resolver for the run so the LST files are only read once
+    config["lst_resolver"] = LSTResolver(cache=config["manifest_cache"])
+
     return config
 
 
@@ -155,6 +179,18 @@ def main(*args, **kwargs):
     $ docs --config=./en/config.common.toml repair headers --list
 
     $ docs --config=./en/config.common.toml repair headers
+
+    $ docs --config=./en/config.common.toml cache stats
+
+    $ docs --config=./en/config.common.toml cache clear
+
+    $ docs --config=./en/config.common.toml cache manifest ./en/documents/sites.lst
+
+    $ docs --config=./en/config.common.toml links incoming ./en/documents/index.md
+
+    $ docs --config=./en/config.common.toml links outgoing ./en/documents/index.md
+
+    $ docs --config=./en/config.common.toml links move ./en/documents/chapter_1
     """
 
     # Initialize the shared context object to a dictionary and configure
@@ -180,3 +216,5 @@ main.add_command(graph)
 main.add_command(validate)
 # main.add_command(yaml_blocks)
 main.add_command(repair)
+main.add_command(cache)
+main.add_command(links)
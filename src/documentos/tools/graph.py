@@ -35,12 +35,9 @@ console = Console()
 # ------------
 # Custom Modules
 
-from ..documentos.document import (
-    MarkdownDocument,
-    LSTDocument,
-    reverse_relative_links,
-    search,
-)
+from ..documentos.document import LSTDocument
+
+from .links import load_link_index
 
 # -------------
 
@@ -65,25 +62,18 @@ def create_sub_graph(G, incoming_limit=1, outgoing_limit=0):
     return sub_graph
 
 
-def construct_edges(lst_contents, md_links, root=None):
+def construct_edges(lst_contents, index):
     """
     Given the list of Markdown files referenced by the LST file, find
-    all links between them.
+    all links from them in the LinkIndex. The nodes are the paths
+    relative to the root of the index.
     """
 
     edges = []
 
-    for md in lst_contents:
-
-        key = md.filename
-
-        if root:
-            key = key.relative_to(root)
-
-        if key in md_links:
-
-            for rl in md_links[key]:
-                edges.append((key, str(rl)))
+    for f in lst_contents:
+        for e in index.outgoing(f):
+            edges.append((e.source, e.target))
 
     return edges
 
@@ -108,25 +98,26 @@ def graph(*args, **kwargs):
     # the LST file could be passed in as a relative path. We resolve it
     # to an absolute path.
 
-    lst = LSTDocument(Path(kwargs["lst"]).resolve())
+    lst = LSTDocument(
+        Path(kwargs["lst"]).resolve(),
+        resolver=config["lst_resolver"],
+    )
 
-    console.print("Searching for Markdown files...")
+    console.print("Indexing Markdown files...")
 
-    md_files = search(root=config["documents.path"])
+    index = load_link_index(config)
 
-    console.print(f"{len(md_files)} markdown files were found...")
+    console.print(f"{len(index)} markdown files were found...")
 
     # Gather all Markdown files from the LST and de-duplicate the list
-    lst_contents = list({[MarkdownDocument(f) for f in lst.links]})
+    lst_contents = list(dict.fromkeys(lst.links))
 
     console.print(f"{len(lst_contents)} markdown files were in {lst.filename}...")
 
     # To construct the graph, we only need the relative paths to the
-    # Markdown files stored in an efficient structure
-
-    md_links = reverse_relative_links(lst_contents, root=config["documents.path"])
+    # Markdown files, the link index has them
 
-    edges = construct_edges(lst_contents, md_links, root=config["documents.path"])
+    edges = construct_edges(lst_contents, index)
 
     # At this point we have edges, we can construct the graph
     console.print("Constructing DAG...")
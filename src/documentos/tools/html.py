@@ -19,15 +19,14 @@ The build process transforming the Markdown files to HTML.
 # ------------
 # System Modules - Included with Python
 
-import shutil
-import tempfile
+import os
 
+from fnmatch import fnmatch
+from functools import partial
 from zoneinfo import ZoneInfo
 from datetime import datetime
 from pathlib import Path
 
-from multiprocessing import Pool
-
 # ------------
 # 3rd Party - From pip
 
@@ -40,16 +39,28 @@ console = Console()
 # Custom Modules
 
 from ..documentos.common import (
-    run_cmd,
     path_to_root,
+    build_date,
+    md_to_html_links,
+    staging_area,
+    copy_file,
+    copy_tree,
 )
 
 from ..documentos.document import (
     MarkdownDocument,
     LSTDocument,
+    load_corpus,
 )
 
-from .plugins import registered_pluggins
+from ..documentos.build_manifest import BuildManifest, DigestWriter
+
+from ..documentos.executor import JobResult, run_process, run_jobs
+
+from ..documentos.discovery import discover
+
+from .plugins import registered_pluggins, JSONDocumentPlugin
+from .links import load_link_index
 
 # -------------
 
@@ -59,15 +70,26 @@ def construct_pandoc_command(
     input_file=None,
     output_file=None,
     config=None,
+    **kwargs,
 ):
     """
     Construct the required switches to run PANDOC.
 
     # Parameters
 
+    input_file:pathlib.Path
+    - The staged Markdown file or None if it is piped to STDIN.
+
     config:dict
     - A dictionary containing the key paths of the system.
 
+    # Parameters (kwargs)
+
+    resource_path:list(pathlib.Path)
+    - The folders pandoc searches for images and other resources, i.e.
+      the folder of the source document.
+    - Default - None - the current folder
+
     # Return
 
     A list of CLI elements that will be used by subprocess.
@@ -108,12 +130,25 @@ def construct_pandoc_command(
 
     pandoc.append(f"--variable=RELATIVE:{str(relative_offset)}")
     pandoc.append(
-        f'--variable=build_date:{datetime.now().replace(tzinfo=ZoneInfo(config["default_timezone"])).strftime("%Y-%m-%dT%H%M%z")}'
+        f"--variable=build_date:{build_date(config)}"
     )
 
     # NOTE: Can add other things here like software version numbers and
     # release dates. These could be added to the HTML footer template.
 
+    # ----------
+    # Resources
+
+    # pandoc doesn't read the document from its source folder (it is
+    # piped or staged), tell it where to find the images.
+
+    resource_path = kwargs.get("resource_path", None)
+
+    if resource_path:
+        pandoc.append(
+            f"--resource-path={os.pathsep.join(str(p) for p in resource_path)}"
+        )
+
     # --------
     # Add CSS
 
@@ -155,21 +190,173 @@ def construct_pandoc_command(
     # Add Transformation Options
 
     pandoc.extend(("-o", output_file))  # Output file path
-    pandoc.append(input_file)  # Input File path
+
+    if input_file is not None:
+        pandoc.append(input_file)  # Input File path, otherwise STDIN
 
     return pandoc
 
 
 def process_pandoc(job):
     """
-    A simple method for the multiprocessing module to work with.
+    Transform a document, called from the worker threads of `run_jobs`.
+
+    # Parameters
+
+    job:tuple
+        - name - The document being transformed
+        - cmd - The pandoc command
+        - size - The size of the input, the largest are run first
+        - stdin - Writes the document to pandoc's STDIN or None if it
+          was staged
+        - output_file - The file pandoc writes
+        - cache - The OutputCache or None
+        - key - The key of the output in the cache
+
+    # Return
+
+    A JobResult. The status is "cached" if the output was taken from
+    the cache, "built" if pandoc was run and "failed" if pandoc failed.
+
+    """
+
+    name, cmd, _, stdin, output_file, cache, key = job
+
+    if cache is not None and cache.fetch(key, output_file):
+        console.print(f"Pandoc - {name} (cached)")
+        return JobResult(name, "cached", None, "", 0.0)
+
+    # the output may be linked to a cache entry (by this build or an
+    # earlier one), it must not be written in place
+    if output_file.exists():
+        output_file.unlink()
+
+    result = run_process(cmd, stdin=stdin)
+
+    if result.returncode != 0:
+        console.print(f"[red]Pandoc - {name} failed ({result.returncode})[/red]")
+        return JobResult(name, "failed", result.returncode, result.stderr, result.elapsed)
+
+    console.print(f"Pandoc - {name} ({result.elapsed:.2f}s)")
+
+    if cache is not None and output_file.exists():
+        cache.store(key, output_file)
+
+    return JobResult(name, "built", result.returncode, result.stderr, result.elapsed)
+
+
+def select_documents(documents, patterns, root):
+    """
+    Return the filenames of the documents matching the paths or globs
+    of a partial build.
+
+    # Parameters
+
+    documents:list(MarkdownDocument)
+        - The documents of the build.
+
+    patterns:iterable(str)
+        - The paths or globs. A path (relative to the current folder or
+          absolute) selects the document or the documents within the
+          folder. A glob, i.e. `chapter_1/*.md`, is matched against the
+          paths relative to the `root` and the full paths.
+
+    root:pathlib.Path
+        - The documents folder.
+
+    # Return
+
+    A set of pathlib.Path, the resolved filenames.
+
+    """
+
+    selected = set()
+
+    for pattern in patterns:
+
+        path = Path(pattern).expanduser().resolve()
+
+        for md in documents:
+
+            relative = md.filename.relative_to(root).as_posix()
+
+            if (
+                md.filename == path
+                or path in md.filename.parents
+                or fnmatch(relative, pattern)
+                or fnmatch(str(md.filename), pattern)
+            ):
+                selected.add(md.filename)
+
+    return selected
+
+
+def moved_link_dependents(config):
+    """
+    Return the documents that link to documents that were moved,
+    renamed, added or removed since the link index was last refreshed
+    (by `docs links` or a partial build). The link index is refreshed.
+
+    # Parameters
+
+    config:dict
+        - The configuration dictionary. `documents.path`,
+          `ignore_folders`, `link_cache` and `document_store` are used.
+
+    # Return
+
+    A set of pathlib.Path, the resolved filenames of the documents
+    linking to the moved documents.
+
+    # NOTE
+
+    The first time the index is built there is nothing to compare
+    with, no documents are returned.
+
+    """
+
+    root = config["documents.path"]
+
+    index = config["link_cache"].load(root)
+
+    if index is None:
+        load_link_index(config)
+        return set()
+
+    before = set(index.sources())
+
+    counts = index.refresh(
+        discover(root, extensions=(".md",), ignore=config["ignore_folders"]),
+        store=config["document_store"],
+    )
+
+    if counts["added"] or counts["updated"] or counts["removed"]:
+        config["link_cache"].store(index)
+
+    moved = before.symmetric_difference(index.sources())
+
+    return {
+        index.root.joinpath(e.source).resolve()
+        for target in moved
+        for e in index.incoming(target)
+        if e.source not in moved
+    }
+
+
+def print_failures(results):
+    """
+    Display the jobs that failed and their STDERR.
     """
 
-    msg, cmd = job
+    failed = [r for r in results if r.status == "failed"]
+
+    console.print(f"[red]{len(failed):,} of {len(results):,} transforms failed:[/red]")
 
-    console.print(msg)
+    for r in failed:
+        console.print(f"[red]{r.name} - exit code {r.returncode}[/red]")
 
-    run_cmd(cmd)
+        for line in r.stderr.strip().splitlines():
+            console.print(f"\t{line}", markup=False, highlight=False)
 
 
 @click.command("html")
@@ -178,6 +365,23 @@ def process_pandoc(job):
     is_flag=True,
     help="Generate a single HTML file by combining all the markdown files.",
 )
+@click.option(
+    "--force",
+    is_flag=True,
+    help="Transform every document, even if the build manifest shows it hasn't changed.",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=None,
+    help="The number of pandoc processes to run at the same time. Defaults to the number of CPUs.",
+)
+@click.option(
+    "--only",
+    multiple=True,
+    help="Only build the documents matching the path or glob (relative to the documents folder) and the pages that depend on them. Can be used more than once.",
+)
 @click.pass_context
 def html(*args, **kwargs):
     """
@@ -198,6 +402,42 @@ def html(*args, **kwargs):
         --config=en/config.html.yaml \
         html --single
 
+    $ build \
+        --config=en/config.common.yaml \
+        --config=en/config.ignore.yaml \
+        --config=en/config.html.yaml \
+        html --force
+
+    $ build \
+        --config=en/config.common.yaml \
+        --config=en/config.ignore.yaml \
+        --config=en/config.html.yaml \
+        html --jobs=4
+
+    $ build \
+        --config=en/config.common.yaml \
+        --config=en/config.ignore.yaml \
+        --config=en/config.html.yaml \
+        html --only=en/documents/chapter_1/intro.md --only="chapter_2/*.md"
+
+    # NOTE
+
+    The build manifest in the output folder records the fingerprint
+    of every transformed document (the staged Markdown, the pandoc
+    arguments, the files they reference and the pandoc version). A
+    document is only transformed again if its fingerprint changed or
+    its output is missing. Use `--force` to transform everything.
+
+    The build fails, after the other documents are transformed, if
+    pandoc fails for any document. The failed documents are transformed
+    again on the next build.
+
+    A partial build, `--only`, transforms the selected documents and
+    the pages that depend on them: the generated TOC pages whose LST
+    includes them and the pages linking to documents that were moved
+    or renamed (see `docs links`). The JSON document and navigation
+    plugins update their previous output for these documents.
+
     """
 
     # Extract the configuration file from the click context
@@ -211,15 +451,50 @@ def html(*args, **kwargs):
 
     console.print(f'Extracting files from {config["documents"]["lst"]}...')
 
+    store = config["document_store"]
+
     lst = LSTDocument(
-        config["documents.path"].joinpath(config["documents"]["lst"]).resolve()
+        config["documents.path"].joinpath(config["documents"]["lst"]).resolve(),
+        resolver=config["lst_resolver"],
+        store=store,
     )
 
-    # Gather all Markdown files from the LST and de-duplicate the list
-    lst_contents = list(set([MarkdownDocument(f) for f in lst.links]))
+    # Gather all Markdown files from the LST, de-duplicate the list and
+    # read and scan them in parallel
+    lst_contents = load_corpus(dict.fromkeys(lst.links), store=store)
 
     console.print(f"Found {len(lst_contents)} markdown files...")
 
+    # ----------
+    # Partial Build
+
+    # The filenames of the documents to build, None builds everything
+    affected = None
+
+    if kwargs["only"]:
+
+        if kwargs["single"]:
+            console.print("[red]--only can't be used with --single![/red]")
+            raise click.Abort()
+
+        affected = select_documents(lst_contents, kwargs["only"], config["documents.path"])
+
+        if not affected:
+            console.print(f"[red]No documents match {', '.join(kwargs['only'])}![/red]")
+            raise click.Abort()
+
+        console.print(f"Selected {len(affected)} markdown files...")
+
+        # The pages linking to moved documents have to be rebuilt, the
+        # link is fixed, or broken, by the move
+        documents = {md.filename for md in lst_contents}
+
+        dependents = (moved_link_dependents(config) & documents) - affected
+
+        if dependents:
+            console.print(f"Adding {len(dependents)} pages linking to moved documents...")
+            affected |= dependents
+
     # ----------
     # Table of Contents (TOC) - Plugin
 
@@ -230,7 +505,11 @@ def html(*args, **kwargs):
 
         for item in tocs_items:
 
-            idx = LSTDocument(config["documents.path"].joinpath(item["lst"]).resolve())
+            idx = LSTDocument(
+                config["documents.path"].joinpath(item["lst"]).resolve(),
+                resolver=config["lst_resolver"],
+                store=store,
+            )
 
             # Which TOC creator?
             plugin = item["toc_plugin"] if "toc_plugin" in item else "TOC"
@@ -252,6 +531,10 @@ def html(*args, **kwargs):
 
             new_path = config["documents.path"].joinpath(item["index"]).resolve()
 
+            # The TOC page depends on the documents in its LST
+            if affected is not None and not affected.isdisjoint(idx.links):
+                affected.add(new_path)
+
             # It is possible to have a markdown file already in the
             # system with the same name. This means we should append
             # the content to the existing file. It will automatically
@@ -261,6 +544,9 @@ def html(*args, **kwargs):
             for f in lst_contents:
                 if f.filename == new_path:
                     f.contents.extend([''] + contents)
+
+                    # the TOC links have to be adjusted with the rest
+                    f.invalidate()
                     does_file_exist = True
                     break
 
@@ -270,9 +556,7 @@ def html(*args, **kwargs):
             if not does_file_exist:
                 # Create a new file
 
-                new_md = MarkdownDocument(
-                    config["documents.path"].joinpath(item["index"]).resolve(),
-                )
+                new_md = store.get(new_path)
 
                 new_md.contents = contents
                 lst_contents.insert(0, new_md)
@@ -287,13 +571,19 @@ def html(*args, **kwargs):
     # NOTE: We are not applying any checks or validation at this point.
     # You need to run validation methods for this.
 
+    # The links are adjusted as the documents are written to the
+    # staging folder so the contents of a document never have to be
+    # loaded, they are streamed from the file.
+
     console.print("Adjusting markdown links...")
+
+    link_lines = {}
+
     for md in lst_contents:
 
         # remove duplicate line numbers as string replace will deal with
         # them
-        for line in {item[0] for item in md.relative_links()}:
-            md.contents[line] = md.contents[line].replace(".md", ".html")
+        link_lines[md] = {item[0] for item in md.relative_links()}
 
     # ----------
     # Merge
@@ -311,38 +601,75 @@ def html(*args, **kwargs):
         single_md.contents = []
 
         for md in lst_contents:
-            single_md.contents.extend(md.contents)
+            single_md.contents.extend(
+                md_to_html_links(line) if i in link_lines[md] else line
+                for i, line, _ in md.stream()
+            )
+
+        # the links were adjusted during the merge
+        link_lines = {single_md: set()}
 
         lst_contents = [single_md]
 
     # ----------
-    # Copy Files to TMP
+    # Stage
 
-    with tempfile.TemporaryDirectory(dir=config["root"]) as tmp:
+    # The documents, with the adjusted links, are piped to pandoc. If a
+    # staging folder is configured they are written to it instead.
 
-        tmp_path = Path(tmp)
+    if affected is None:
+        build_contents = lst_contents
 
-        for md in lst_contents:
+    else:
+        build_contents = [md for md in lst_contents if md.filename in affected]
 
-            relative_path = md.filename.relative_to(config["documents.path"])
+        console.print(
+            f"Partial build: {len(build_contents)} of {len(lst_contents)} markdown files..."
+        )
 
-            tmp_md = tmp_path.joinpath(relative_path)
-            tmp_md.parent.mkdir(parents=True, exist_ok=True)
+    with staging_area(config) as tmp_path:
+
+        stages = {}
+
+        for md in build_contents:
+
+            write = partial(md.write, transform=md_to_html_links, lines=link_lines[md])
 
+            if tmp_path is None:
+                stages[md] = (None, write)
+                continue
+
+            tmp_md = tmp_path.joinpath(md.filename.relative_to(config["documents.path"]))
+            tmp_md.parent.mkdir(parents=True, exist_ok=True)
 
             with tmp_md.open("w", encoding="utf-8") as fo:
+                write(fo)
 
-                for line in md.contents:
-                    fo.write(line)
+            stages[md] = (tmp_md, None)
 
         # ----------
         # Transform Markdown to HTML
 
         config["output.path"] = config["root"].joinpath(config["output"])
 
+        config["css.path"] = config["root"].joinpath(config["css"]["path"])
+
+        # the CSS files can be embedded in the output, i.e. with
+        # --embed-resources
+        css_files = [
+            config["css.path"].joinpath(css)
+            for css in config["css"].get("css_files", [])
+        ]
+
+        manifest = BuildManifest(config["output.path"])
+
+        cache = config.get("pandoc_output_cache")
+
         pandoc_cmds = []
+        fingerprints = []
+        skipped = 0
 
-        for md in lst_contents:
+        for md in build_contents:
 
             relative_path = md.filename.relative_to(config["documents.path"])
 
@@ -353,26 +680,98 @@ def html(*args, **kwargs):
             )
             of.parent.mkdir(parents=True, exist_ok=True)
 
-            msg = f"Pandoc - Transform `{relative_path}` to `{of.relative_to(config['output.path'])}`"
+            name = f"Transform `{relative_path}` to `{of.relative_to(config['output.path'])}`"
+
+            input_file, stdin = stages[md]
 
             pandoc = construct_pandoc_command(
-                input_file=tmp_path.joinpath(relative_path),
+                input_file=input_file,
                 output_file=of,
                 config=config,
+                resource_path=[md.filename.parent, "."],
+            )
+
+            if stdin is None:
+                digest = None
+                size = input_file.stat().st_size
+
+            else:
+                # hash the document as it would be piped to pandoc
+                writer = DigestWriter()
+                stdin(writer)
+
+                digest = writer.hexdigest()
+                size = writer.size
+
+            fingerprint = manifest.fingerprint(
+                pandoc,
+                input_file=input_file,
+                output_file=of,
+                dependencies=css_files,
+                input_digest=digest,
             )
 
-            pandoc_cmds.append((msg, pandoc))
+            if not kwargs["force"] and manifest.is_current(of, fingerprint):
+                skipped += 1
+                continue
+
+            key = cache.key(fingerprint, pandoc) if cache is not None else None
+
+            pandoc_cmds.append((name, pandoc, size, stdin, of, cache, key))
+            fingerprints.append((of, fingerprint))
 
         # -----------
-        # Multi-Processing
+        # Transform
 
-        # https://docs.python.org/3/library/multiprocessing.html
+        # pandoc does the work, the threads only wait on it. The largest
+        # documents are started first so they don't hold up the end of
+        # the build.
 
-        # Use max cores - default
-        with Pool(processes=None) as p:
-            p.map(process_pandoc, pandoc_cmds)
+        results = run_jobs(
+            pandoc_cmds,
+            process_pandoc,
+            workers=kwargs["jobs"],
+            size=lambda job: job[2],
+        )
+
+        # Only record the outputs that were written, a failed transform
+        # is retried on the next build
+        for (of, fingerprint), result in zip(fingerprints, results):
+            if result.status == "cached" or (result.status == "built" and of.exists()):
+                manifest.record(of, fingerprint)
+
+        # a partial build keeps the entries of the documents it didn't
+        # build
+        manifest.save(prune=affected is None)
+
+        cached = sum(1 for r in results if r.status == "cached")
+        failed = sum(1 for r in results if r.status == "failed")
+
+        if cache is not None:
+            removed, freed = cache.evict()
+
+            if removed:
+                console.print(f"Evicted {removed:,} outputs ({freed / 2**20:,.1f} MiB) from the cache...")
+
+        if failed:
+            print_failures(results)
+            raise click.Abort()
 
         console.print("Transformation to HTML complete...")
+        console.print(
+            f"Rebuilt: {len(pandoc_cmds) - cached:,} - From cache: {cached:,} - "
+            f"Skipped (unchanged): {skipped:,}"
+        )
+
+        built = [r for r in results if r.status == "built"]
+
+        if built:
+            slowest = max(built, key=lambda r: r.elapsed)
+
+            console.print(
+                f"Pandoc: {sum(r.elapsed for r in built):,.2f}s total - "
+                f"slowest {slowest.elapsed:,.2f}s ({slowest.name})"
+            )
 
     # -------
     # JSON Document
@@ -385,25 +784,53 @@ def html(*args, **kwargs):
         if json_document_method:
             console.print(f"Creating JSON document using plugin: `{json_plugin}`.")
 
-            document = json_document_method(
-                documents=lst_contents,
-                root=config["documents.path"],
-                ignore=config["ignore_toc"],
+            json_output = config["output.path"] / json_document_method.filename
+
+            # A partial build updates the JSON document of the previous
+            # build. A plugin that doesn't implement `update` needs all
+            # of the documents.
+            incremental = (
+                affected is not None
+                and json_output.exists()
+                and type(json_document_method).update is not JSONDocumentPlugin.update
             )
 
-            json_output = config["output.path"] / json_document_method.filename
+            changed = build_contents if incremental else lst_contents
+
+            # The JSON document holds the contents with the adjusted
+            # links
+            for md in changed:
+                for line in link_lines[md]:
+                    md.contents[line] = md_to_html_links(md.contents[line])
+
+            if incremental:
+                document = json_document_method.update(
+                    json_output.read_text(),
+                    documents=lst_contents,
+                    changed=set(changed),
+                    root=config["documents.path"],
+                    ignore=config["ignore_toc"],
+                )
+
+            else:
+                document = json_document_method(
+                    documents=lst_contents,
+                    root=config["documents.path"],
+                    ignore=config["ignore_toc"],
+                )
 
             json_output.write_text(document)
 
-    else:
-        console.print(f"[red]{json_plugin} does not exist as a plugin! Skipping.[/red]")
+        else:
+            console.print(f"[red]{json_plugin} does not exist as a plugin! Skipping.[/red]")
 
     # -------------
     # Copy CSS
 
     # Copy the selected CSS files to the root of the output folder. All
     # files that require it should have a relative path set to find it
-    # there.
+    # there. Only the files that changed since the last build are
+    # copied.
 
     config["css.path"] = config["root"].joinpath(config["css"]["path"])
 
@@ -411,9 +838,8 @@ def html(*args, **kwargs):
 
         cssp = config["css.path"].joinpath(css)
 
-        console.print(f"Copying {cssp.name}...")
-
-        shutil.copy(cssp, config["output.path"].joinpath(cssp.name))
+        if copy_file(cssp, config["output.path"].joinpath(cssp.name)):
+            console.print(f"Copying {cssp.name}...")
 
     # ----------
     # Copy Assets
@@ -429,12 +855,13 @@ def html(*args, **kwargs):
 
         console.print(f"Copying {config['assets.path']}...")
 
-        shutil.copytree(
+        copied, unchanged = copy_tree(
             config["assets.path"],
             config["output.path"].joinpath(config["assets.path"].name),
-            dirs_exist_ok=True,
         )
 
+        console.print(f"Copied: {copied:,} - Unchanged: {unchanged:,}")
+
     # -----
     # Navigation Map - Plugin
 
@@ -447,18 +874,36 @@ def html(*args, **kwargs):
         if nav_method:
             console.print(f"Creating navigation map for {lst.filename}. Using plugin: `{nav_plugin}`.")
 
-            nav_method(
-                document_root=config["documents.path"],
-                output=config["output.path"],
-                documents=lst_contents,
-                **kwargs,
-            )
+            if affected is not None:
+                nav_method.update(
+                    document_root=config["documents.path"],
+                    output=config["output.path"],
+                    documents=lst_contents,
+                    changed=set(build_contents),
+                    **kwargs,
+                )
+
+            else:
+                nav_method(
+                    document_root=config["documents.path"],
+                    output=config["output.path"],
+                    documents=lst_contents,
+                    **kwargs,
+                )
 
         else:
             console.print(f"[red]{nav_plugin} does not exist as a plugin! Skipping.[/red]")
 
     build_end_time = datetime.now().replace(tzinfo=ZoneInfo(config["default_timezone"]))
 
+    info = store.stats()
+
+    console.print("")
+    console.print(
+        f'Documents: {info["documents"]:,} - saved {info["saved_reads"]:,} reads '
+        f'and {info["saved_parses"]:,} parses'
+    )
+
     console.print("")
     console.print(f"Started  - {build_start_time}")
     console.print(f"Finished - {build_end_time}")
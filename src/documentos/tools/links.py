@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+
+# -----------
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2021 Troy Williams
+
+# uuid:   7d2a9f4e-0b17-11ec-9a03-0242ac130003
+# author: Troy Williams
+# email:  troy.williams@bluebill.net
+# date:   2021-08-27
+# -----------
+
+"""
+The `links` command answers questions about the relative links between
+the Markdown documents using the persistent link index.
+"""
+
+# ------------
+# System Modules - Included with Python
+
+from pathlib import Path
+
+# ------------
+# 3rd Party - From pip
+
+import click
+
+from rich.console import Console
+console = Console()
+
+# ------------
+# Custom Modules
+
+from ..documentos.discovery import discover
+from ..documentos.link_index import LinkIndex
+
+# -------------
+
+
+def load_link_index(config):
+    """
+    Return the LinkIndex of the documents folder, brought up to date
+    with the Markdown files on disk. The index is loaded from, and
+    stored back to, the link index cache so only the documents that
+    changed since the last run are scanned.
+
+    # Parameters
+
+    config:dict
+        - The configuration dictionary. `documents.path`,
+          `ignore_folders`, `link_cache` and `document_store` are used.
+
+    """
+
+    root = config["documents.path"]
+
+    index = config["link_cache"].load(root) or LinkIndex(root)
+
+    counts = index.refresh(
+        discover(root, extensions=(".md",), ignore=config["ignore_folders"]),
+        store=config["document_store"],
+    )
+
+    if counts["added"] or counts["updated"] or counts["removed"]:
+        config["link_cache"].store(index)
+
+    return index
+
+
+def print_edges(edges):
+    """
+    Display the edges, one per line, `source:line -> target#anchor`.
+    """
+
+    for e in edges:
+
+        anchor = f"#{e.anchor}" if e.anchor else ""
+
+        console.print(f"\t{e.source}:{e.line} -> {e.target}{anchor}")
+
+
+@click.group("links")
+@click.pass_context
+def links(*args, **kwargs):
+    """
+    \b
+    Query the relative links between the Markdown documents. The paths
+    can be relative to the current folder or absolute.
+
+    # Usage
+
+    $ docs --config=./en/config.common.toml links incoming ./en/documents/index.md
+
+    $ docs --config=./en/config.common.toml links outgoing ./en/documents/index.md
+
+    $ docs --config=./en/config.common.toml links move ./en/documents/chapter_1
+
+    """
+
+    config = args[0].obj["cfg"]
+
+    config["link_index"] = load_link_index(config)
+
+    args[0].obj["cfg"] = config
+
+
+@links.command("incoming")
+@click.pass_context
+@click.argument("path", type=click.Path(resolve_path=True))
+def incoming(*args, **kwargs):
+    """
+    \b
+    Display the documents that link to the document.
+
+    # Usage
+
+    $ docs --config=./en/config.common.toml links incoming ./en/documents/index.md
+
+    """
+
+    config = args[0].obj["cfg"]
+
+    edges = config["link_index"].incoming(Path(kwargs["path"]))
+
+    console.print(f"{len(edges)} links to {kwargs['path']}:")
+    print_edges(edges)
+
+
+@links.command("outgoing")
+@click.pass_context
+@click.argument("path", type=click.Path(resolve_path=True))
+def outgoing(*args, **kwargs):
+    """
+    \b
+    Display the documents the document links to.
+
+    # Usage
+
+    $ docs --config=./en/config.common.toml links outgoing ./en/documents/index.md
+
+    """
+
+    config = args[0].obj["cfg"]
+
+    edges = config["link_index"].outgoing(Path(kwargs["path"]))
+
+    console.print(f"{len(edges)} links from {kwargs['path']}:")
+    print_edges(edges)
+
+
+@links.command("move")
+@click.pass_context
+@click.argument("path", type=click.Path(resolve_path=True))
+def move(*args, **kwargs):
+    """
+    \b
+    Display the links that would break if the file or folder was moved,
+    the links into it from outside and the links from it to the outside.
+
+    # Usage
+
+    $ docs --config=./en/config.common.toml links move ./en/documents/chapter_1
+
+    """
+
+    config = args[0].obj["cfg"]
+
+    incoming, outgoing = config["link_index"].affected_by_move(Path(kwargs["path"]))
+
+    console.print(f"{len(incoming)} links into {kwargs['path']}:")
+    print_edges(incoming)
+
+    console.print("")
+    console.print(f"{len(outgoing)} links out of {kwargs['path']}:")
+    print_edges(outgoing)
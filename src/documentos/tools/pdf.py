@@ -19,11 +19,10 @@ The build process transforming the Markdown files to PDF.
 # ------------
 # System Modules - Included with Python
 
-import tempfile
+import os
 
 from zoneinfo import ZoneInfo
 from datetime import datetime
-from pathlib import Path
 
 # ------------
 # 3rd Party Modules
@@ -37,15 +36,20 @@ console = Console()
 # Custom Modules
 
 from ..documentos.common import (
-    run_cmd,
     path_to_root,
+    build_date,
+    md_to_html_links,
+    staging_area,
 )
 
 from ..documentos.document import (
     MarkdownDocument,
     LSTDocument,
+    load_corpus,
 )
 
+from ..documentos.executor import run_process
+
 # -------------
 
 
@@ -60,9 +64,19 @@ def construct_pandoc_command(
 
     # Parameters
 
+    input_file:pathlib.Path
+    - The staged Markdown file or None if it is piped to STDIN.
+
     config:dict
     - A dictionary containing the key paths of the system.
 
+    # Parameters (kwargs)
+
+    resource_path:list(pathlib.Path)
+    - The folders pandoc searches for images and other resources, i.e.
+      the folders of the source documents.
+    - Default - None - the current folder
+
     # Return
 
     A list of CLI elements that will be used by subprocess.
@@ -104,13 +118,26 @@ def construct_pandoc_command(
 
     pandoc.append(f"--variable=RELATIVE:{str(relative_offset)}")
     pandoc.append(
-        f'--variable=build_date:{datetime.now().replace(tzinfo=ZoneInfo(config["default_timezone"])).strftime("%Y-%m-%dT%H%M%z")}'
+        f"--variable=build_date:{build_date(config)}"
     )
 
     # NOTE: variables can be added to the main YAML configuration file
     # stored in the templates. They won't be as flexible as adding them
     # here, but could prove useful in some circumstances.
 
+    # ----------
+    # Resources
+
+    # The merged document isn't read from the source folders (it is
+    # piped or staged), tell pandoc where to find the images.
+
+    resource_path = kwargs.get("resource_path", None)
+
+    if resource_path:
+        pandoc.append(
+            f"--resource-path={os.pathsep.join(str(p) for p in resource_path)}"
+        )
+
     # --------
     # Add Metadata
 
@@ -140,7 +167,9 @@ def construct_pandoc_command(
         )  # use xelatex to support Unicode characters in markdown.
 
     pandoc.extend(("-o", output_file))  # Output file path
-    pandoc.append(input_file)  # Input File path
+
+    if input_file is not None:
+        pandoc.append(input_file)  # Input File path, otherwise STDIN
 
     return pandoc
 
@@ -181,11 +210,17 @@ def pdf(*args, **kwargs):
     console.print(f'Extracting files from {config["documents"]["lst"]}...')
 
     lst = LSTDocument(
-        config["documents.path"].joinpath(config["documents"]["lst"]).resolve()
+        config["documents.path"].joinpath(config["documents"]["lst"]).resolve(),
+        resolver=config["lst_resolver"],
+        store=config["document_store"],
     )
 
-    # Gather all Markdown files from the LST and de-duplicate the list
-    lst_contents = list({[MarkdownDocument(f) for f in lst.links]})
+    # Gather all Markdown files from the LST, de-duplicate the list and
+    # read and scan them in parallel
+    lst_contents = load_corpus(
+        dict.fromkeys(lst.links),
+        store=config["document_store"],
+    )
 
     # ----------
     # Adjust .MD Links
@@ -197,46 +232,51 @@ def pdf(*args, **kwargs):
     # NOTE: We are not applying any checks or validation at this point.
     # You need to run validation methods for this.
 
+    # The links are adjusted as the documents are merged into the
+    # staging file, the documents are streamed from their files rather
+    # than loaded into memory.
+
     console.print("Adjusting markdown links...")
+
+    link_lines = {}
+
     for md in lst_contents:
 
         # remove duplicate line numbers as string replace will deal with
         # them
-        for line in {item[0] for item in md.relative_links()}:
-            md.contents[line] = md.contents[line].replace(".md", ".html")
+        link_lines[md] = {item[0] for item in md.relative_links()}
 
     # ----------
     # Merge
 
-    # we will end up with md_files containing one item and the config
-    # ["md_file_contents"] only having one entry. We do this so nothing
-    # downstream in this method changes...
+    # The documents are piped, one after the other, to pandoc. If a
+    # staging folder is configured they are written to a single staging
+    # file instead.
 
     single_md = MarkdownDocument(
         config["documents.path"].joinpath("single.md").resolve(),
     )
 
-    single_md.contents = []
-
-    for md in lst_contents:
-        single_md.contents.extend(md.contents)
+    def write(fo):
+        for md in lst_contents:
+            md.write(fo, transform=md_to_html_links, lines=link_lines[md])
 
     # ----------
-    # Copy Files to TMP
+    # Stage
 
-    with tempfile.TemporaryDirectory(dir=config["root"]) as tmp:
-
-        tmp_path = Path(tmp)
+    with staging_area(config) as tmp_path:
 
         relative_path = single_md.filename.relative_to(config["documents.path"])
 
-        tmp_md = tmp_path.joinpath(relative_path)
-        tmp_md.parent.mkdir(parents=True, exist_ok=True)
+        tmp_md = None
+
+        if tmp_path is not None:
 
-        with tmp_md.open("w", encoding="utf-8") as fo:
+            tmp_md = tmp_path.joinpath(relative_path)
+            tmp_md.parent.mkdir(parents=True, exist_ok=True)
 
-            for line in single_md.contents:
-                fo.write(line)
+            with tmp_md.open("w", encoding="utf-8") as fo:
+                write(fo)
 
         # ----------
         # Transform Markdown to PDF
@@ -262,19 +302,30 @@ def pdf(*args, **kwargs):
 
         msg = f"Pandoc - Transform {single_md.filename} to {of.relative_to(config['output.path'])}"
 
+        # the images are relative to the documents that reference them
+        resource_path = list(dict.fromkeys(md.filename.parent for md in lst_contents))
+        resource_path.append(".")
+
         pandoc = construct_pandoc_command(
-            input_file=tmp_path.joinpath(relative_path),
+            input_file=tmp_md,
             output_file=of,
             config=config,
             title=single_md.filename.name,
+            resource_path=resource_path,
             **kwargs,
         )
 
         console.print(msg)
 
-        run_cmd(pandoc)
+        result = run_process(pandoc, stdin=write if tmp_md is None else None)
+
+        if result.returncode != 0:
+            console.print(f"[red]Pandoc failed - exit code {result.returncode}:[/red]")
+            console.print(result.stderr.strip(), markup=False, highlight=False)
+
+            raise click.Abort()
 
-        console.print("Transformation to PDF complete...")
+        console.print(f"Transformation to PDF complete ({result.elapsed:.2f}s)...")
 
     build_end_time = datetime.now().replace(tzinfo=ZoneInfo(config["default_timezone"]))
 
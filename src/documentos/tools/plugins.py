@@ -104,6 +104,41 @@ class JSONDocumentPlugin(ABC):
 
         pass
 
+    def update(self, previous, documents=None, changed=None, root=None, ignore=None):
+        """
+        Update the JSON document of a previous build for a partial build
+        (`build html --only`). Only the `changed` documents have to be
+        read, the other entries can be taken from `previous`.
+
+        By default the JSON document is generated from scratch, override
+        this to update it incrementally.
+
+        # Parameters
+
+        previous:str
+            - The JSON document written by the previous build.
+
+        documents:list(MarkdownDocuments)
+            - All of the documents, see `__call__`.
+
+        changed:set(MarkdownDocument)
+            - The documents that were rebuilt.
+
+        root:Path
+            - The path to the root folder of the documents.
+
+        ignore:set(Path)
+            - The files that are not added to the JSON document, see
+              `__call__`.
+
+        # Return
+
+        A valid JSON string is returned.
+
+        """
+
+        return self(documents=documents, root=root, ignore=ignore)
+
 
 
 class TOCPlugin(ABC):
@@ -242,6 +277,46 @@ class NavigationPlugin(ABC):
 
         pass
 
+    def update(
+        self,
+        document_root=None,
+        output=None,
+        documents=None,
+        changed=None,
+        **kwargs,
+    ):
+        """
+        Update the navigation document of a previous build for a partial
+        build (`build html --only`). Only the `changed` documents have to
+        be read, the navigation document written by the previous build
+        is in the `output` folder.
+
+        By default the navigation document is generated from scratch,
+        override this to update it incrementally.
+
+        # Parameters
+
+        document_root:Path
+            - The valid path to the root of the MarkdownDocument folder
+
+        output:Path
+            - The folder the navigation document is written to.
+
+        documents:iterable(MarkdownDocument)
+            - All of the MarkdownDocument objects.
+
+        changed:set(MarkdownDocument)
+            - The documents that were rebuilt.
+
+        # Return
+
+        None - The file will be written by the plugin to the root
+        folder.
+
+        """
+
+        self(document_root=document_root, output=output, documents=documents, **kwargs)
+
 
 def register(name):
     """
@@ -54,11 +54,16 @@ from ..documentos.common import (
 
 from ..documentos.document import (
     MarkdownDocument,
-    search as md_search,
     document_lookup,
+    load_corpus,
 )
 
-from ..documentos.markdown_classifiers import MarkdownAttributeSyntax
+from ..documentos.discovery import discover
+
+from ..documentos.markdown_classifiers import (
+    MarkdownAttributeSyntax,
+    shared_rule,
+)
 
 # -------------
 
@@ -296,9 +301,14 @@ def write_corrected_url(
         console.print("------DRY-RUN------")
 
     else:
+        # Read every line before the file is truncated, the contents
+        # may be memory mapped
+        lines = list(md.contents)
+        md.close()
+
         with md.filename.open("w", encoding="utf-8") as fo:
 
-            for line in md.contents:
+            for line in lines:
                 fo.write(line)
 
             console.print("Changes written...")
@@ -395,7 +405,7 @@ def find_missing_header_attributes(
 
     """
 
-    md_attribute_syntax_rule = MarkdownAttributeSyntax()
+    md_attribute_syntax_rule = shared_rule(MarkdownAttributeSyntax)
 
     problems = {}
 
@@ -492,9 +502,14 @@ def repair_header_issues(
         console.print("------DRY-RUN------")
 
     else:
+        # Read every line before the file is truncated, the contents
+        # may be memory mapped
+        lines = list(md.contents)
+        md.close()
+
         with md.filename.open("w", encoding="utf-8") as fo:
 
-            for line in md.contents:
+            for line in lines:
                 fo.write(line)
 
             console.print("Changes written...")
@@ -537,7 +552,14 @@ def repair(*args, **kwargs):
 
     console.print("Searching for Markdown files...")
 
-    config["md_files"] = md_search(root=config["documents.path"])
+    md_files = discover(
+        config["documents.path"],
+        extensions=(".md",),
+        ignore=config["ignore_folders"],
+    )
+
+    # Read and scan the documents in parallel
+    config["md_files"] = load_corpus(md_files, store=config["document_store"])
 
     console.print(f'{len(config["md_files"])} Markdown files were found...')
     console.print("")
@@ -638,6 +660,7 @@ def images(*args, **kwargs):
         search(
             root=config["documents.path"],
             extensions=(".png", ".gif", ".jpg", ".jpeg"),
+            ignore=config["ignore_folders"],
         )
     )
 
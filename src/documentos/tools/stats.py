@@ -36,6 +36,7 @@ console = Console()
 # Custom Modules
 
 from ..documentos.common import run_cmd
+from ..documentos.discovery import discover
 
 # -------------
 
@@ -155,8 +156,15 @@ def stats(*args, **kwargs):
     Total Documents:      735
     Total Words:      182,584
     Estimated Pages:    365.2
+
+    Text Lines:        48,211
+    Link Prefiltered:   81.3%
     ```
 
+    `Link Prefiltered` is the fraction of the lines (outside of code
+    fences and YAML blocks) that could not contain a link and skipped
+    the link and image regex entirely.
+
     # Usage
 
     $ docs --config=./en/config.common.yaml stats
@@ -189,9 +197,15 @@ def stats(*args, **kwargs):
 
     # https://docs.python.org/3/library/multiprocessing.html
 
+    md_files = discover(
+        config["documents.path"],
+        extensions=(".md",),
+        ignore=config["ignore_folders"],
+    )
+
     # Use max cores - default
     with Pool(processes=None) as p:
-        word_counts = p.map(fp, config["documents.path"].rglob("*.md"))
+        word_counts = p.map(fp, md_files)
 
     # NOTE: The above works because the kwarg in fp, md is in the first
     # position. It could have been defined using positional arguments
@@ -217,3 +231,19 @@ def stats(*args, **kwargs):
     console.print(f"Total Documents: {len(word_counts):>8,}")
     console.print(f"Total Words:     {total_words:>8,}")
     console.print(f"Estimated Pages: {words_per_page:>8,.1f}")
+
+    # -----------
+    # Link Prefilter
+
+    text_lines = 0
+    prefiltered = 0
+
+    for md in map(config["document_store"].get, md_files):
+        text_lines += md.scan.text_lines
+        prefiltered += md.scan.prefiltered
+
+    console.print("")
+    console.print(f"Text Lines:      {text_lines:>8,}")
+
+    if text_lines > 0:
+        console.print(f"Link Prefiltered: {prefiltered / text_lines:>7.1%}")
@@ -19,6 +19,7 @@ system for issues. The `repair` command can fix some of the issues.
 # ------------
 # System Modules - Included with Python
 
+from collections import namedtuple
 from datetime import datetime
 from multiprocessing import Pool
 from functools import partial
@@ -36,10 +37,15 @@ console = Console()
 
 
 from ..documentos.document import (
+    MarkdownDocument,
     LSTDocument,
-    search,
+    LSTCycleError,
+    AnchorIndex,
+    load_corpus,
 )
 
+from ..documentos.discovery import discover
+
 from ..documentos.document_validation import (
     validate_urls,
     validate_images,
@@ -69,13 +75,23 @@ def validate(*args, **kwargs):
 
     console.print("Searching for markdown and LST files...")
 
-    config["md_file_contents"] = search(root=config["documents.path"])
-    config["lst_file_contents"] = search(
-        root=config["documents.path"],
-        extension=".lst",
-        document=LSTDocument,
+    # Walk the documents folder once for both
+    config["snapshot"] = discover(
+        config["documents.path"],
+        extensions=(".md", ".lst"),
+        ignore=config["ignore_folders"],
     )
 
+    config["md_file_contents"] = [
+        config["document_store"].get(f)
+        for f in config["snapshot"].with_extension(".md")
+    ]
+
+    config["lst_file_contents"] = [
+        LSTDocument(f, resolver=config["lst_resolver"])
+        for f in config["snapshot"].with_extension(".lst")
+    ]
+
     console.print(f'{len(config["md_file_contents"])} Markdown files were found...')
     console.print(f'{len(config["lst_file_contents"])} LST files were found...')
     console.print("")
@@ -83,51 +99,127 @@ def validate(*args, **kwargs):
     args[0].obj["cfg"] = config
 
 
-def multiprocessing_wrapper(root, md):
+# The result of validating a Markdown file. This is what the worker
+# processes send back, not the document, so the contents and the scan
+# of the file are not pickled.
+ValidationResult = namedtuple(
+    "ValidationResult",
+    [
+        "filename",  # pathlib.Path
+        "url_messages",  # list of str
+        "image_messages",  # list of str
+        "yaml_block",  # bool - does the document have a YAML block?
+        "uuid",  # str or None
+        "text_lines",  # number of lines outside of code fences and YAML blocks
+        "links",  # number of links (including images) that were checked
+    ],
+)
+
+
+# The AnchorIndex of the corpus. It is set once per worker process by
+# `init_worker` instead of being sent with every file.
+_anchors = None
+
+
+def init_worker(anchors):
+    """
+    The initializer of the worker processes.
+
+    # Parameters
+
+    anchors:AnchorIndex
+        - The anchors of the corpus used to check the `#section` of the
+          relative links.
+
     """
-    Simple wrapper to make multiprocessing easier.
 
-    Returns a tuple containing the file name/key and the defects or it
-    returns None.
+    global _anchors
+    _anchors = anchors
+
+
+def multiprocessing_wrapper(root, document_kwargs, filename):
+    """
+    Simple wrapper to make multiprocessing easier. The document is
+    read, scanned and validated in the worker process.
+
+    # Parameters
+
+    root:pathlib.Path
+        - The root folder so that we can display a shorter path name
+          for the document.
+
+    document_kwargs:dict
+        - The kwargs used to construct the MarkdownDocument, i.e. the
+          ParseCache.
+
+    filename:pathlib.Path
+        - The Markdown file to validate.
+
+    # Return
+
+    A ValidationResult.
 
     NOTE: This methods arguments are defined this way to make use of
     functools.partial
 
     """
 
-    url_messages = validate_urls(md, root=root)
-    p = md.filename.relative_to(root)
+    md = MarkdownDocument(filename, **document_kwargs)
+
+    return ValidationResult(
+        filename,
+        validate_urls(md, root=root, anchors=_anchors),
+        validate_images(md, root=root),
+        bool(md.scan.yaml_lines),
+        md.yaml_value("UUID"),
+        md.scan.text_lines,
+        len(md.scan.all_links) + len(md.scan.image_links),
+    )
+
+
+def print_result(result, root):
+    """
+    Display the issues found in the document.
+
+    # Parameters
+
+    result:ValidationResult
+        - The result of validating the document.
+
+    root:pathlib.Path
+        - The root folder so that we can display a shorter path name
+          for the document.
+
+    """
+
+    p = result.filename.relative_to(root)
 
-    if url_messages:
+    if result.url_messages:
         console.print("")
         console.print(f"URL Issues in `{p}`:")
 
-        for msg in url_messages:
+        for msg in result.url_messages:
             console.print(f"\t{msg}")
 
-    image_messages = validate_images(md, root=root)
-
-    if image_messages:
+    if result.image_messages:
         console.print("")
         console.print(f"Image Issues in `{p}`:")
 
-        for msg in image_messages:
+        for msg in result.image_messages:
             console.print(f"\t{msg}")
 
-    if not md.yaml_block:
+    if not result.yaml_block:
         console.print("")
         console.print(f"Missing YAML Block: `{p}`:")
 
-    elif "UUID" not in md.yaml_block:
+    elif result.uuid is None:
         console.print("")
         console.print(f"Missing UUID in YAML Block: `{p}`:")
 
-    elif len(md.yaml_block["UUID"]) == 0:
+    elif len(result.uuid) == 0:
         console.print("")
         console.print(f"Empty UUID in YAML Block: `{p}`:")
 
-    return md
-
 
 @validate.command("markdown")
 @click.pass_context
@@ -152,6 +244,7 @@ def markdown(*args, **kwargs):
 
     # - absolute URL check
     # - relative URL check
+    # - section anchor check
     # - image URL check
 
     console.print("Validating Markdown Files...")
@@ -163,19 +256,41 @@ def markdown(*args, **kwargs):
     # Pre-fill the bits that don't change during iteration so we can use
     # the multiprocessing pool effectively
 
-    fp = partial(multiprocessing_wrapper, config["documents.path"])
+    # Only the paths are sent to the workers and only the results come
+    # back, the documents are never pickled.
 
-    with Pool(processes=None) as p:
-        md_files = p.map(fp, config["md_file_contents"])
+    root = config["documents.path"]
+
+    # The anchors of every document, built once, so the section of
+    # every relative link can be checked with a lookup
+    anchors = AnchorIndex.build(
+        load_corpus(
+            [md.filename for md in config["md_file_contents"]],
+            store=config["document_store"],
+        )
+    )
+
+    fp = partial(
+        multiprocessing_wrapper,
+        root,
+        config["document_store"].document_kwargs,
+    )
+
+    with Pool(processes=None, initializer=init_worker, initargs=(anchors,)) as p:
+        results = p.map(fp, [md.filename for md in config["md_file_contents"]])
+
+    for result in results:
+        print_result(result, root)
 
     # check for duplicate UUID values and UUID values that are not 36 characters
     # UUID = xxxxxxxx-yyyy-zzzz-wwww-mmmmmmmmmmmm -> 36 characters
 
     uuid_map = {}
-    for md in md_files:
-        if md.yaml_block and "UUID" in md.yaml_block:
+    for result in results:
+
+        if result.uuid is not None:
 
-            uuid_map.setdefault(md.yaml_block["UUID"], []).append(md)
+            uuid_map.setdefault(result.uuid, []).append(result)
 
     for uuid, files in uuid_map.items():
 
@@ -202,6 +317,9 @@ def markdown(*args, **kwargs):
 
     console.print("")
     console.print("-----")
+    console.print(f"Files:       {len(results):>8,}")
+    console.print(f"Text Lines:  {sum(r.text_lines for r in results):>8,}")
+    console.print(f"Links:       {sum(r.links for r in results):>8,}")
     console.print(f"Started  - {build_start_time}")
     console.print(f"Finished - {build_end_time}")
     console.print(f"Elapsed:   {build_end_time - build_start_time}")
@@ -232,21 +350,34 @@ def lst(*args, **kwargs):
     console.print("Validating LST Files...")
     console.print("")
 
+    lst_files = set()
+
     for lst in config["lst_file_contents"]:
 
         key = lst.filename.relative_to(config["documents.path"])
 
         console.print(f"{key}")
 
-        for f in lst.links:
+        try:
+
+            links = lst.links
+
+        except LSTCycleError as e:
+            console.print(f"{e} in: {key}")
+            continue
 
-            if not f.exists():
+        for f in links:
+
+            # LST files can reference files outside of the documents
+            # folder, those aren't in the snapshot
+            if not (config["snapshot"].exists(f) or f.exists()):
                 console.print(f"{f} does not exist in: {key}")
 
+        lst_files.update(str(f) for f in links)
+
     # ------
     # Display any files that are not included in any of the lst files
 
-    lst_files = {str(f) for lst in config["lst_file_contents"] for f in lst.links}
     md_files = {str(f.filename) for f in config["md_file_contents"]}
 
     console.print("Check - Are all markdown files accounted for in the LST files....")
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+
+"""
+-----------
+SPDX-License-Identifier: MIT
+Copyright (c) 2021 Troy Williams
+
+uuid       = 0e6b3c52-7f4a-4d1b-8c2e-5a9d7e1f3b64
+author     = Troy Williams
+email      = troy.williams@bluebill.net
+date       = 2021-08-14
+-----------
+
+The tests marked `benchmark` compare wall times and memory, they depend
+on the machine and its load and are skipped unless `--run-benchmarks`
+is passed.
+
+"""
+
+import pytest
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--run-benchmarks",
+        action="store_true",
+        default=False,
+        help="Run the tests marked benchmark.",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "benchmark: compares the performance of two approaches, skipped by default",
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+
+    if config.getoption("--run-benchmarks"):
+        return
+
+    skip = pytest.mark.skip(reason="needs --run-benchmarks")
+
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+
+"""
+-----------
+SPDX-License-Identifier: MIT
+Copyright (c) 2021 Troy Williams
+
+uuid       = 6c0f3d1e-2d4b-4f3e-9a55-1f7b9f0a8c21
+author     = Troy Williams
+email      = troy.williams@bluebill.net
+date       = 2021-08-14
+-----------
+
+Micro-benchmarks comparing the current implementations against the
+approaches they replaced. The tests check that both approaches produce
+identical results. The tests marked `benchmark` check that the current
+one is faster, they are skipped unless `--run-benchmarks` is passed. Run
+with `-s` to see the timings.
+
+"""
+
+import gc
+import time
+import tracemalloc
+
+import pytest
+
+from pathlib import Path
+
+from documentos.documentos.markdown import (
+    find_atx_header,
+    markdown_outside_fence,
+    extract_relative_markdown_links,
+    scan_markdown,
+    md_link_rule,
+    relative_url_rule,
+)
+
+from documentos.documentos.markdown_classifiers import (
+    ATXHeaderRule,
+    MarkdownLinkRule,
+    RelativeMarkdownURLRule,
+)
+
+# -----------
+# Corpus
+
+documents = Path(__file__).parent.parent.joinpath("en/documents")
+
+
+def scaled_corpus(line_count=100_000):
+    """
+    Repeat the lines of the sample documents until we have `line_count`
+    lines.
+    """
+
+    lines = []
+    for md in sorted(documents.glob("*.md")):
+        lines.extend(md.read_text(encoding="utf-8").splitlines(keepends=True))
+
+    repeat = line_count // len(lines) + 1
+
+    return (lines * repeat)[:line_count]
+
+
+def best_of(function, repeat=3):
+    """
+    Return the best wall time, in seconds, of `repeat` calls to
+    `function` along with the result of the last call.
+    """
+
+    best = None
+    result = None
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best, result
+
+
+def report(name, old, new, count):
+    print(
+        f"\n{name}: old {count / old:,.0f}/s, new {count / new:,.0f}/s "
+        f"({old / new:.1f}x)"
+    )
+
+
+# -----------
+# ATX Headers
+
+
+def atx_header_approaches(lines):
+    """
+    Return the legacy and current functions that find the ATX headers
+    in `lines`.
+    """
+
+    text_lines = [line for _, line in markdown_outside_fence(lines)]
+
+    # The corpus repeats, disable memoization so both approaches do the
+    # matching work on every line.
+    legacy_rules = [ATXHeaderRule(count=count, cache_size=0) for count in range(1, 7)]
+
+    def legacy():
+        headers = []
+
+        for line in text_lines:
+            for rule in legacy_rules:
+                if rule.match(line):
+                    headers.append((rule.atx_count, rule.extract_data(line)))
+                    break
+
+        return headers
+
+    def current():
+        headers = []
+
+        for line in text_lines:
+            result = find_atx_header(line)
+
+            if result:
+                headers.append(result)
+
+        return headers
+
+    return legacy, current
+
+
+def test_atx_headers():
+
+    legacy, current = atx_header_approaches(scaled_corpus(20_000))
+
+    assert current() == legacy()
+
+
+@pytest.mark.benchmark
+def test_benchmark_atx_headers():
+
+    lines = scaled_corpus()
+    legacy, current = atx_header_approaches(lines)
+
+    old_time, old_headers = best_of(legacy)
+    new_time, new_headers = best_of(current)
+
+    report("ATX headers", old_time, new_time, len(lines))
+
+    assert new_headers == old_headers
+    assert new_time < old_time
+
+
+# -----------
+# Shared rules vs per-call rule construction
+
+# The repair and validate commands call the per-line/per-link helpers
+# once for every link in the corpus. These are the helpers as they were
+# when every call constructed its own rules.
+
+
+def legacy_extract_relative_markdown_links(line):
+
+    link_rule = MarkdownLinkRule()
+    relative_rule = RelativeMarkdownURLRule()
+
+    matches = []
+
+    if link_rule.match(line.strip()):
+        for r in link_rule.extract_data(line.strip()):
+            if relative_rule.match(r["url"]):
+                matches.append(relative_rule.extract_data(r["url"]))
+
+    return matches
+
+
+def link_lines():
+    return [line for line in scaled_corpus(20_000) if "](" in line]
+
+
+def test_shared_rules():
+
+    lines = link_lines()
+
+    assert [extract_relative_markdown_links(line) for line in lines] == [
+        legacy_extract_relative_markdown_links(line) for line in lines
+    ]
+
+
+@pytest.mark.benchmark
+def test_benchmark_shared_rules():
+
+    lines = link_lines()
+
+    old_time, old_links = best_of(
+        lambda: [legacy_extract_relative_markdown_links(line) for line in lines]
+    )
+    new_time, new_links = best_of(
+        lambda: [extract_relative_markdown_links(line) for line in lines]
+    )
+
+    report("Relative links (per line)", old_time, new_time, len(lines))
+
+    assert new_links == old_links
+    assert new_time < old_time
+
+
+# -----------
+# Link records vs dictionaries
+
+
+def link_corpus(link_count=50_000):
+    """
+    Synthetic corpus, one link per line. The link text is unique, but
+    the URLs come from a small set of files and sections, like a real
+    corpus.
+    """
+
+    return [
+        f"See [topic {n}](../chapter_{n % 50}/part_{n % 7}.md#section-{n % 20}) for more.\n"
+        for n in range(link_count)
+    ]
+
+
+def measure(function):
+    """
+    Return the memory, in bytes, retained by the result of `function`
+    along with the result.
+    """
+
+    gc.collect()
+    tracemalloc.start()
+
+    try:
+        result = function()
+        gc.collect()
+        size, _ = tracemalloc.get_traced_memory()
+
+    finally:
+        tracemalloc.stop()
+
+    return size, result
+
+
+def legacy_relative_links(lines):
+    """
+    Build the links the way they were stored before the records, a copy
+    of each link dictionary with the relative URL keys added.
+    """
+
+    relative_links = []
+
+    for i, line in enumerate(lines):
+        for r in md_link_rule.extract_data(line.strip()):
+
+            r = dict(r)
+            result = relative_url_rule.extract_data(r["url"])
+
+            r["md_span"] = result["md_span"]
+            r["md"] = result["md"]
+            r["section_span"] = result["section_span"]
+            r["section"] = result["section"]
+
+            relative_links.append((i, r))
+
+    return relative_links
+
+
+def test_link_records():
+
+    lines = link_corpus(5_000)
+
+    scan = scan_markdown(lines, intern_urls=True)
+
+    assert scan.relative_links == legacy_relative_links(lines)
+
+
+@pytest.mark.benchmark
+def test_benchmark_link_records_memory():
+
+    lines = link_corpus()
+
+    # start with empty caches so neither approach is charged for them
+    md_link_rule.cache_clear()
+    relative_url_rule.cache_clear()
+    old_size, old_links = measure(lambda: legacy_relative_links(lines))
+
+    md_link_rule.cache_clear()
+    relative_url_rule.cache_clear()
+    new_size, scan = measure(lambda: scan_markdown(lines, intern_urls=True))
+
+    print(
+        f"\nRelative links ({len(lines):,}): dict {old_size / 2**20:,.1f} MiB, "
+        f"records {new_size / 2**20:,.1f} MiB ({old_size / new_size:.1f}x)"
+    )
+
+    assert scan.relative_links == old_links
+    assert new_size < old_size
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+
+"""
+-----------
+SPDX-License-Identifier: MIT
+Copyright (c) 2021 Troy Williams
+
+uuid       = 1f6a3c8e-0c53-11ec-9a03-0242ac130003
+author     = Troy Williams
+email      = troy.williams@bluebill.net
+date       = 2021-08-29
+-----------
+"""
+
+import os
+
+from documentos.documentos.build_manifest import (
+    BuildManifest,
+    DigestWriter,
+    OutputCache,
+    defaults_files,
+)
+
+# -----------
+# BuildManifest
+
+
+def make_build(folder):
+
+    templates = folder / "templates"
+    templates.mkdir()
+
+    (templates / "template.html").write_text("$body$\n", encoding="utf-8")
+    (templates / "header.html").write_text("<meta>\n", encoding="utf-8")
+
+    defaults = templates / "html.yaml"
+    defaults.write_text(
+        "template: ${.}/template.html\n"
+        "standalone: true\n"
+        "include-in-header:\n"
+        "  - header.html\n",
+        encoding="utf-8",
+    )
+
+    staged = folder / "staged.md"
+    staged.write_text("# A\n", encoding="utf-8")
+
+    output = folder / "output"
+    output.mkdir()
+
+    return defaults, staged, output
+
+
+def command(defaults, staged, of, build_date="2021-08-29T1200-0400"):
+    return [
+        "pandoc",
+        "--defaults",
+        str(defaults),
+        "--variable=RELATIVE:.",
+        f"--variable=build_date:{build_date}",
+        "-o",
+        of,
+        staged,
+    ]
+
+
+def test_defaults_files(tmp_path):
+
+    defaults, _, _ = make_build(tmp_path)
+
+    assert [f.name for f in defaults_files(defaults)] == ["header.html", "template.html"]
+
+
+def test_build_manifest(tmp_path):
+
+    defaults, staged, output = make_build(tmp_path)
+
+    of = output / "a.html"
+
+    manifest = BuildManifest(output, pandoc="pandoc-does-not-exist")
+
+    fingerprint = manifest.fingerprint(
+        command(defaults, staged, of), input_file=staged, output_file=of
+    )
+
+    assert fingerprint["pandoc"] is None
+    assert fingerprint["command"][-3:] == ["-o", "<output>", "<input>"]
+    assert fingerprint["command"][2].startswith("sha256:")
+    assert not any("build_date" in arg for arg in fingerprint["command"])
+    assert len(fingerprint["files"]) == 2
+
+    # the output doesn't exist
+    assert not manifest.is_current(of, fingerprint)
+
+    of.write_text("<html>\n", encoding="utf-8")
+    manifest.record(of, fingerprint)
+    manifest.save()
+
+    manifest = BuildManifest(output, pandoc="pandoc-does-not-exist")
+
+    # a different build date and staging folder is the same build
+    moved = tmp_path / "other.md"
+    moved.write_text("# A\n", encoding="utf-8")
+
+    same = manifest.fingerprint(
+        command(defaults, moved, of, build_date="2022-01-01T0000-0500"),
+        input_file=moved,
+        output_file=of,
+    )
+
+    assert manifest.is_current(of, same)
+
+    # a change to a file referenced by the defaults file is not
+    (tmp_path / "templates" / "header.html").write_text("<meta x>\n", encoding="utf-8")
+
+    manifest = BuildManifest(output, pandoc="pandoc-does-not-exist")
+
+    changed = manifest.fingerprint(
+        command(defaults, staged, of), input_file=staged, output_file=of
+    )
+
+    assert not manifest.is_current(of, changed)
+
+    # the output was removed
+    manifest = BuildManifest(output, pandoc="pandoc-does-not-exist")
+    of.unlink()
+
+    assert not manifest.is_current(of, fingerprint)
+
+
+def test_build_manifest_piped_input(tmp_path):
+
+    defaults, staged, output = make_build(tmp_path)
+
+    of = output / "a.html"
+
+    manifest = BuildManifest(output, pandoc="pandoc-does-not-exist")
+
+    digest = DigestWriter()
+    digest.write("# A\n")
+
+    assert digest.size == len("# A\n")
+
+    # the input is piped to pandoc, there is no input file in the command
+    piped = manifest.fingerprint(
+        command(defaults, staged, of)[:-1],
+        output_file=of,
+        input_digest=digest.hexdigest(),
+    )
+
+    staged_fingerprint = manifest.fingerprint(
+        command(defaults, staged, of), input_file=staged, output_file=of
+    )
+
+    # the same document, piped or staged, has the same hash
+    assert piped["input"] == staged_fingerprint["input"]
+    assert "<input>" not in piped["command"]
+
+
+def test_build_manifest_partial_save(tmp_path):
+
+    output = tmp_path / "output"
+
+    manifest = BuildManifest(output, pandoc="pandoc-does-not-exist")
+    manifest.record(output / "a.html", {"input": "a"})
+    manifest.record(output / "b.html", {"input": "b"})
+    manifest.save()
+
+    # a partial build only records the documents it built
+    manifest = BuildManifest(output, pandoc="pandoc-does-not-exist")
+    manifest.record(output / "b.html", {"input": "c"})
+    manifest.save(prune=False)
+
+    manifest = BuildManifest(output, pandoc="pandoc-does-not-exist")
+
+    assert manifest.entries == {"a.html": {"input": "a"}, "b.html": {"input": "c"}}
+
+    manifest.save()
+
+    assert BuildManifest(output, pandoc="pandoc-does-not-exist").entries == {}
+
+
+# -----------
+# OutputCache
+
+
+def test_output_cache(tmp_path):
+
+    defaults, staged, output = make_build(tmp_path)
+
+    of = output / "a.html"
+
+    manifest = BuildManifest(output, pandoc="pandoc-does-not-exist")
+
+    cmd = command(defaults, staged, of)
+    fingerprint = manifest.fingerprint(cmd, input_file=staged, output_file=of)
+
+    key = OutputCache.key(fingerprint, cmd)
+
+    # the build date is part of the key
+    assert key != OutputCache.key(
+        fingerprint, command(defaults, staged, of, build_date="2022-01-01T0000-0500")
+    )
+
+    cache = OutputCache(tmp_path / "cache")
+
+    assert not cache.fetch(key, of)
+
+    of.write_text("<html>\n", encoding="utf-8")
+    cache.store(key, of)
+
+    of.unlink()
+
+    assert cache.fetch(key, of)
+    assert of.read_text(encoding="utf-8") == "<html>\n"
+
+    stats = cache.stats()
+
+    assert stats["entries"] == 1
+    assert stats["size"] == len("<html>\n")
+
+    cache.clear()
+
+    assert cache.stats()["entries"] == 0
+
+
+def test_output_cache_evict(tmp_path):
+
+    cache = OutputCache(tmp_path / "cache", max_size=10, link=False)
+
+    of = tmp_path / "a.html"
+
+    for i, key in enumerate(["aa01", "bb02", "cc03"]):
+        of.write_text("x" * 4, encoding="utf-8")
+        cache.store(key, of)
+        os.utime(cache._entry(key), ns=(i * 10**9, i * 10**9))
+
+    # the least recently used entry is removed first
+    assert cache.evict() == (1, 4)
+    assert not cache.fetch("aa01", of)
+    assert cache.fetch("bb02", of)
+
+
+def test_output_cache_linked_recency(tmp_path):
+
+    cache = OutputCache(tmp_path / "cache", max_size=10, link=True)
+
+    for i, key in enumerate(["aa01", "bb02", "cc03"]):
+        of = tmp_path / f"{key}.html"
+        of.write_text("x" * 4, encoding="utf-8")
+        cache.store(key, of)
+        os.utime(cache._entry(key), ns=(i * 10**9, i * 10**9))
+
+    of = tmp_path / "a.html"
+
+    # the oldest entry is used, its linked output keeps its time
+    assert cache.fetch("aa01", of)
+    assert of.stat().st_mtime_ns == 0
+
+    # the entry used last is kept
+    assert cache.evict() == (1, 4)
+    assert cache.fetch("aa01", of)
+    assert not cache.fetch("bb02", of)
+    assert cache.stats()["entries"] == 2
+
+
+def test_output_cache_key_location(tmp_path):
+
+    fingerprint = {
+        "input": "abc",
+        "command": ["--resource-path=/a/docs:.", "-o", "<output>"],
+        "files": {"/a/templates/header.html": "123"},
+        "pandoc": "3.1.1",
+    }
+
+    moved = {
+        "input": "abc",
+        "command": ["--resource-path=/b/docs:.", "-o", "<output>"],
+        "files": {"/b/templates/header.html": "123"},
+        "pandoc": "3.1.1",
+    }
+
+    # the same build in another checkout has the same key
+    assert OutputCache.key(fingerprint, []) == OutputCache.key(moved, [])
+
+    assert OutputCache.key(fingerprint, []) != OutputCache.key(
+        moved | {"files": {"/b/templates/header.html": "456"}}, []
+    )
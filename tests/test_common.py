@@ -19,7 +19,7 @@ import pytest
 
 from pathlib import Path
 
-from documentos.documentos.common import relative_path
+from documentos.documentos.common import relative_path, build_date, copy_file, copy_tree
 
 # ---------
 # relative_path
@@ -85,3 +85,49 @@ def test_find_atx_header(data):
     result = relative_path(data["left"], data["right"])
 
     assert data["result"] == result
+
+
+# ---------
+# build_date
+
+
+def test_build_date(monkeypatch):
+
+    config = {"default_timezone": "Canada/Eastern"}
+
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", "1630252800")
+
+    assert build_date(config) == "2021-08-29T1200-0400"
+
+    # a pinned date takes precedence
+    assert build_date(config | {"build_date": "2021-06-01T0900-0400"}) == "2021-06-01T0900-0400"
+
+    monkeypatch.delenv("SOURCE_DATE_EPOCH")
+
+    assert len(build_date(config)) == len("2021-08-29T1200-0400")
+
+
+# ---------
+# copy_file / copy_tree
+
+
+def test_copy_tree(tmp_path):
+
+    source = tmp_path / "assets"
+    (source / "images").mkdir(parents=True)
+
+    (source / "style.css").write_text("body {}\n", encoding="utf-8")
+    (source / "images" / "a.png").write_bytes(b"png")
+
+    target = tmp_path / "output" / "assets"
+
+    assert copy_tree(source, target) == (2, 0)
+    assert (target / "images" / "a.png").read_bytes() == b"png"
+
+    # nothing changed
+    assert copy_tree(source, target) == (0, 2)
+
+    (source / "style.css").write_text("body { color: red; }\n", encoding="utf-8")
+
+    assert copy_file(source / "style.css", target / "style.css")
+    assert not copy_file(source / "style.css", target / "style.css")
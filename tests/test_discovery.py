@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+
+"""
+-----------
+SPDX-License-Identifier: MIT
+Copyright (c) 2021 Troy Williams
+
+uuid       = 9e4f1a2c-ff5f-11eb-9a03-0242ac130003
+author     = Troy Williams
+email      = troy.williams@bluebill.net
+date       = 2021-08-17
+-----------
+"""
+
+import pytest
+
+from documentos.documentos.discovery import discover, default_ignore
+from documentos.documentos.common import search
+
+# -----------
+# Tree
+
+files = [
+    "index.md",
+    "notes.txt",
+    "sites.lst",
+    "a/one.md",
+    "a/b/two.md",
+    "a/b/index.md",
+    "a/assets/image.PNG",
+    "c/three.md",
+    "c/drafts/draft.md",
+    ".git/HEAD.md",
+    ".venv/lib/readme.md",
+    "output/html/index.md",
+]
+
+
+@pytest.fixture
+def tree(tmp_path):
+
+    for f in files:
+        p = tmp_path.joinpath(f)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_text(f, encoding="utf-8")
+
+    return tmp_path
+
+
+data = []
+
+md_files = [
+    "a/b/index.md",
+    "a/b/two.md",
+    "a/one.md",
+    "c/drafts/draft.md",
+    "c/three.md",
+    "index.md",
+    "output/html/index.md",
+]
+
+data.append(((".md",), 1, md_files))
+data.append(((".md", ".lst"), None, md_files + ["sites.lst"]))
+data.append(((".png",), None, ["a/assets/image.PNG"]))
+
+
+@pytest.mark.parametrize("data", data)
+def test_discover(tree, data):
+
+    extensions, workers, result = data
+
+    snapshot = discover(tree, extensions=extensions, workers=workers)
+
+    assert [f.relative_to(tree).as_posix() for f in snapshot] == result
+
+    # the same as walking with rglob, less the ignored folders
+    expected = sorted(
+        f
+        for f in tree.rglob("*")
+        if f.is_file()
+        and f.suffix.lower() in extensions
+        and f.relative_to(tree).parts[0] not in (".git", ".venv")
+    )
+
+    assert list(snapshot) == expected
+
+
+def test_discover_ignore(tree):
+
+    config = {"root": tree, "output": "output/html", "ignore_folders": ["c/drafts"]}
+
+    snapshot = discover(tree, extensions=(".md",), ignore=default_ignore(config))
+
+    names = [f.relative_to(tree).as_posix() for f in snapshot]
+
+    assert names == ["a/b/index.md", "a/b/two.md", "a/one.md", "c/three.md", "index.md"]
+
+    # folder names match at any depth, the defaults are replaced
+    snapshot = discover(tree, extensions=(".md",), ignore=["b", "c"])
+
+    names = [f.relative_to(tree).as_posix() for f in snapshot]
+
+    assert names == [
+        ".git/HEAD.md",
+        ".venv/lib/readme.md",
+        "a/one.md",
+        "index.md",
+        "output/html/index.md",
+    ]
+
+
+def test_discover_snapshot(tree):
+
+    snapshot = discover(tree, extensions=(".md", ".lst"))
+
+    assert snapshot.exists(tree / "a" / "b" / ".." / "one.md")
+    assert snapshot.exists("a/b/two.md")
+    assert not snapshot.exists("a/missing.md")
+    assert not snapshot.exists("notes.txt")
+
+    assert snapshot.by_name("index.md") == [
+        tree / "a/b/index.md",
+        tree / "index.md",
+        tree / "output/html/index.md",
+    ]
+    assert snapshot.with_extension(".lst") == [tree / "sites.lst"]
+    assert snapshot.names()["two.md"] == [tree / "a/b/two.md"]
+
+
+def test_search_not_recursive(tree):
+
+    assert list(search(root=tree, extensions=[".md", ".lst"], recursive=False)) == [
+        tree / "index.md",
+        tree / "sites.lst",
+    ]
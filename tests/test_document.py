@@ -0,0 +1,790 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+
+"""
+-----------
+SPDX-License-Identifier: MIT
+Copyright (c) 2021 Troy Williams
+
+uuid       = 0d3e8b4a-5a7e-4c0b-8f4e-3c2a9d1e7b65
+author     = Troy Williams
+email      = troy.williams@bluebill.net
+date       = 2021-08-14
+-----------
+
+
+"""
+
+import os
+import pickle
+
+import pytest
+
+from documentos.documentos.document import (
+    MappedLines,
+    MarkdownDocument,
+    LSTDocument,
+    LSTResolver,
+    LSTCycleError,
+    DocumentStore,
+    load_corpus,
+    AnchorIndex,
+)
+
+from documentos.documentos.validation import validate_relative_url
+
+from documentos.documentos.markdown import scan_markdown, YAML_PARSE_REQUIRED
+
+from documentos.documentos import document as document_module
+from documentos.documentos import cache as cache_module
+
+from documentos.documentos.cache import (
+    ParseCache,
+    ManifestCache,
+    manifest_to_json,
+)
+
+# -----------
+# MappedLines
+
+data = []
+data.append("")
+data.append("one line without a line feed")
+data.append("# Header\n\nSome text [link](./a.md)\n")
+data.append("windows\r\nline\r\nendings\r\n")
+data.append("unicode: Maître d'hôtel\nlast line")
+data.append("# A\rB\r\nC\n")
+data.append("old\rmac\rendings")
+
+
+@pytest.mark.parametrize("data", data)
+def test_mapped_lines_match_readlines(tmp_path, data):
+
+    f = tmp_path / "test.md"
+    f.write_bytes(data.encode("utf-8"))
+
+    with f.open("r", encoding="utf-8") as fin:
+        expected = fin.readlines()
+
+    lines = MappedLines(f)
+
+    assert len(lines) == len(expected)
+    assert list(lines) == expected
+    assert [lines[i] for i in range(len(lines))] == expected
+    assert lines[:] == expected
+
+    if expected:
+        assert lines[-1] == expected[-1]
+
+
+def test_mapped_lines_changes(tmp_path):
+
+    f = tmp_path / "test.md"
+    f.write_text("a\nb\nc\n", encoding="utf-8")
+
+    lines = MappedLines(f)
+
+    lines[1] = "B\n"
+    lines.extend(["", "d\n"])
+
+    assert list(lines) == ["a\n", "B\n", "c\n", "", "d\n"]
+    assert lines == ["a\n", "B\n", "c\n", "", "d\n"]
+
+    # inserting in the middle converts to a regular list
+    lines.insert(0, "start\n")
+    del lines[-1]
+
+    assert list(lines) == ["start\n", "a\n", "B\n", "c\n", ""]
+
+    with pytest.raises(IndexError):
+        lines[10]
+
+    assert pickle.loads(pickle.dumps(lines)) == list(lines)
+
+
+def test_mapped_lines_open_files(tmp_path):
+
+    resource = pytest.importorskip("resource")
+
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (256, hard))
+
+    try:
+        store = DocumentStore(memory_map=True)
+
+        documents = []
+
+        for i in range(400):
+            f = tmp_path / f"{i}.md"
+            f.write_text(f"# Document {i}\n\ntext\n", encoding="utf-8")
+
+            md = store.get(f)
+            assert md.contents[0] == f"# Document {i}\n"
+
+            documents.append(md)
+
+        # the maps that were closed are mapped again
+        assert [md.contents[2] for md in documents] == ["text\n"] * 400
+
+    finally:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
+
+
+def test_mapped_lines_changed_file(tmp_path):
+
+    f = tmp_path / "test.md"
+    f.write_text("a\nb\nc\n", encoding="utf-8")
+
+    md = MarkdownDocument(f, memory_map=True)
+
+    lines = md.contents
+    assert lines[0] == "a\n"
+
+    # the map is closed before the file is written
+    md.close()
+    f.write_text("a\n", encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        lines[2]
+
+    # the document reads the new contents
+    assert list(md.contents) == ["a\n"]
+
+
+def test_markdown_document_memory_map(tmp_path):
+
+    f = tmp_path / "test.md"
+    f.write_text(
+        "---\nUUID: 1234\n...\n\n# Header\n\nA [link](./other.md#section)\n",
+        encoding="utf-8",
+    )
+
+    regular = MarkdownDocument(f)
+    mapped = MarkdownDocument(f, memory_map=True)
+
+    assert isinstance(mapped.contents, MappedLines)
+    assert mapped.scan == regular.scan
+    assert mapped.yaml_block == regular.yaml_block == {"UUID": 1234}
+
+
+# -----------
+# ParseCache
+
+sample = """---
+UUID: 1234
+...
+
+# Header {#sec:header}
+
+A [link](./other.md#section) and ![image](./assets/image.png)
+
+```
+# not a header
+```
+"""
+
+
+def test_parse_cache_round_trip(tmp_path):
+
+    f = tmp_path / "test.md"
+    f.write_text(sample, encoding="utf-8")
+
+    cache = ParseCache(tmp_path / "cache")
+
+    first = MarkdownDocument(f, cache=cache)
+    expected = first.scan
+
+    assert cache.misses == 1
+
+    second = MarkdownDocument(f, cache=cache)
+
+    assert second.scan == expected
+    assert second.headers == first.headers
+    assert "contents" not in second.__dict__
+    assert cache.hits == 1
+
+    info = cache.stats()
+    assert info["entries"] == 1
+    assert info["stale"] == 0
+
+    cache.clear()
+    assert cache.stats()["entries"] == 0
+
+
+def test_parse_cache_invalidation(tmp_path):
+
+    f = tmp_path / "test.md"
+    f.write_text(sample, encoding="utf-8")
+
+    cache = ParseCache(tmp_path / "cache")
+    cache.store(f, MarkdownDocument(f).scan)
+
+    # touched, but the contents are the same
+    st = f.stat()
+    os.utime(f, ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000_000))
+
+    assert cache.load(f) is not None
+
+    # changed contents
+    f.write_text(sample + "\n## Another Header\n", encoding="utf-8")
+
+    assert cache.load(f) is None
+
+    md = MarkdownDocument(f, cache=cache)
+    assert md.headers[2] == [(12, "Another Header")]
+    assert cache.load(f) == md.scan
+
+
+@pytest.mark.parametrize("memory_map", [False, True])
+@pytest.mark.parametrize("streaming", [False, True])
+def test_parse_cache_yaml(tmp_path, monkeypatch, memory_map, streaming):
+
+    f = tmp_path / "test.md"
+    f.write_bytes(sample.replace("\n", "\r\n").encode("utf-8"))
+
+    cache = ParseCache(tmp_path / "cache")
+
+    def no_digest(filename):
+        raise AssertionError("the file was read again to hash it")
+
+    # the file is hashed as it is scanned
+    monkeypatch.setattr(cache_module, "file_digest", no_digest)
+
+    kwargs = {"cache": cache, "memory_map": memory_map, "streaming": streaming}
+
+    first = MarkdownDocument(f, **kwargs)
+    assert first.scan.headers
+
+    monkeypatch.undo()
+
+    entry = cache.fetch(f)
+    assert entry.scan == first.scan
+    assert entry.yaml == {"UUID": 1234}
+
+    # the hash is of the bytes in the file, a touched file is a hit
+    st = f.stat()
+    os.utime(f, ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000_000))
+
+    second = MarkdownDocument(f, **kwargs)
+
+    assert second.yaml_value("UUID") == 1234
+    assert second.yaml_block == {"UUID": 1234}
+    assert "contents" not in second.__dict__
+    assert cache.hits == 2
+
+
+def test_parse_cache_yaml_not_cached(tmp_path):
+
+    f = tmp_path / "test.md"
+    f.write_text("---\ndate: 2021-08-14\n...\n\n# Header\n", encoding="utf-8")
+
+    cache = ParseCache(tmp_path / "cache")
+
+    first = MarkdownDocument(f, cache=cache)
+    assert first.yaml_block["date"].year == 2021
+
+    # the date doesn't survive JSON, it is parsed from the file
+    entry = cache.fetch(f)
+    assert entry.yaml is YAML_PARSE_REQUIRED
+
+    second = MarkdownDocument(f, cache=cache)
+    assert second.yaml_block == first.yaml_block
+
+    # no YAML blocks
+    f.write_text("# Header\n", encoding="utf-8")
+    MarkdownDocument(f, cache=cache).scan
+
+    assert cache.fetch(f).yaml is None
+
+
+def test_load_corpus_parse_cache(tmp_path, monkeypatch):
+
+    files = []
+
+    for name in ("a.md", "b.md"):
+        f = tmp_path / name
+        f.write_text(f"---\ntitle: {name}\n...\n\n# {name}\n", encoding="utf-8")
+        files.append(f)
+
+    cache = ParseCache(tmp_path / "cache")
+
+    monkeypatch.setattr(cache_module, "file_digest", None)
+
+    load_corpus(files, workers=1, store=DocumentStore(cache=cache))
+
+    monkeypatch.undo()
+
+    documents = load_corpus(files, workers=1, store=DocumentStore(cache=cache))
+
+    assert cache.hits == 2
+    assert [md.yaml_value("title") for md in documents] == ["a.md", "b.md"]
+    assert all("contents" not in md.__dict__ for md in documents)
+
+
+# -----------
+# MarkdownDocument.yaml_value
+
+
+def test_markdown_document_yaml_value(tmp_path):
+
+    f = tmp_path / "test.md"
+    f.write_text(
+        "---\ntitle: A Title\nversion: 2\n---\n\n# Header\n", encoding="utf-8"
+    )
+
+    md = MarkdownDocument(f)
+
+    # simple string values don't need the YAML parsed
+    assert md.yaml_value("title") == "A Title"
+    assert md.yaml_value("UUID", "") == ""
+    assert "yaml_block" not in md.__dict__
+
+    # anything else falls back to the full parse
+    assert md.yaml_value("version") == 2
+    assert "yaml_block" in md.__dict__
+
+    f.write_text("# No YAML\n", encoding="utf-8")
+
+    md = MarkdownDocument(f)
+    assert md.yaml_value("title", "default") == "default"
+
+
+# -----------
+# LSTResolver
+
+
+def write_lst(folder, name, lines):
+
+    f = folder / name
+    f.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    return f.resolve()
+
+
+def test_lst_resolver_nested(tmp_path):
+
+    shared = write_lst(tmp_path, "shared.lst", ["# shared", "c.md"])
+    child = write_lst(tmp_path, "child.lst", ["b.md", "shared.lst"])
+    root = write_lst(tmp_path, "root.lst", ["a.md", "child.lst", "", "shared.lst # again"])
+
+    resolver = LSTResolver()
+    manifest = resolver.resolve(root)
+
+    names = [f.name for f in manifest.links]
+
+    assert names == ["a.md", "b.md", "c.md", "c.md"]
+    assert manifest.dependencies == {root, child, shared}
+
+    # shared.lst is included twice but only read once
+    assert resolver.reads == 3
+
+    # documents sharing the resolver don't read the files again
+    lst = LSTDocument(child, resolver=resolver)
+
+    assert [f.name for f in lst.links] == ["b.md", "c.md"]
+    assert lst.dependencies == {child, shared}
+    assert resolver.reads == 3
+
+
+def test_lst_resolver_cycle(tmp_path):
+
+    a = write_lst(tmp_path, "a.lst", ["a.md", "b.lst"])
+    b = write_lst(tmp_path, "b.lst", ["c.lst"])
+    c = write_lst(tmp_path, "c.lst", ["b.lst"])
+
+    with pytest.raises(LSTCycleError) as e:
+        LSTDocument(a).links
+
+    assert e.value.chain == [b, c, b]
+    assert "b.lst -> " in str(e.value)
+
+
+def test_lst_manifest_cache(tmp_path):
+
+    child = write_lst(tmp_path, "child.lst", ["b.md"])
+    root = write_lst(tmp_path, "root.lst", ["a.md", "child.lst"])
+
+    cache = ManifestCache(tmp_path / "cache")
+
+    manifest = LSTResolver(cache=cache).resolve(root)
+    assert cache.misses == 1
+
+    # a new run is served from the cache without reading the LST files
+    resolver = LSTResolver(cache=cache)
+
+    assert resolver.resolve(root) == manifest
+    assert resolver.reads == 0
+    assert cache.hits == 1
+
+    assert manifest_to_json(root, manifest, root=tmp_path) == {
+        "lst": "root.lst",
+        "links": ["a.md", "b.md"],
+        "dependencies": ["child.lst", "root.lst"],
+    }
+
+    # changing a nested LST file invalidates the manifest
+    st = child.stat()
+    write_lst(tmp_path, "child.lst", ["b.md", "c.md"])
+    os.utime(child, ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000_000))
+
+    resolver = LSTResolver(cache=cache)
+
+    assert [f.name for f in resolver.resolve(root).links] == ["a.md", "b.md", "c.md"]
+    assert resolver.reads == 2
+    assert cache.stats()["entries"] == 1
+
+
+# -----------
+# DocumentStore
+
+
+def test_document_store(tmp_path):
+
+    a = tmp_path / "a.md"
+    a.write_text("# A\n\n[b](./b.md#b)\n", encoding="utf-8")
+
+    b = tmp_path / "b.md"
+    b.write_text("# B\n", encoding="utf-8")
+
+    root = write_lst(tmp_path, "root.lst", ["a.md", "b.md", "a.md"])
+
+    store = DocumentStore()
+
+    lst = LSTDocument(root, store=store)
+    documents = lst.documents
+
+    assert documents[0] is documents[2]
+    assert store.get(tmp_path / "sub" / ".." / "a.md") is documents[0]
+    assert a in store
+    assert len(store) == 2
+
+    for md in documents:
+        md.headers
+
+    info = store.stats()
+
+    assert info["documents"] == 2
+    assert info["requests"] == 4
+    assert info["reads"] == 2
+    assert info["parses"] == 2
+    assert info["saved_reads"] == 2
+    assert info["saved_parses"] == 2
+
+
+# -----------
+# load_corpus
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_load_corpus(tmp_path, monkeypatch, workers):
+
+    # use the process pool for the small corpus
+    monkeypatch.setattr(document_module, "POOL_MIN_FILES", 2)
+
+    paths = []
+
+    for i in range(5):
+        f = tmp_path / f"{i}.md"
+        f.write_text(
+            f"# Document {i}\n\n[next](./{i + 1}.md#document-{i + 1})\n"
+            f"![image](./assets/{i}.png)\n",
+            encoding="utf-8",
+        )
+        paths.append(f)
+
+    cache = ParseCache(tmp_path / "cache")
+    store = DocumentStore(cache=cache)
+
+    documents = load_corpus(paths + paths[:1], workers=workers, store=store)
+
+    assert len(documents) == 6
+    assert documents[0] is documents[5]
+    assert all(md is store.get(f) for md, f in zip(documents, paths))
+
+    for md, f in zip(documents, paths):
+        assert "scan" in md.__dict__
+        assert "contents" not in md.__dict__
+        assert md.scan == scan_markdown(f.read_text(encoding="utf-8").splitlines())
+
+    assert store.stats()["reads"] == 0
+    assert cache.stats()["entries"] == 5
+
+    # A second load is served by the cache
+    documents = load_corpus(paths, workers=workers, store=DocumentStore(cache=cache))
+    assert documents[1].headers == {1: [(0, "Document 1")]}
+
+
+def test_load_corpus_pool_size(tmp_path, monkeypatch):
+
+    started = []
+
+    class FakePool:
+        def __init__(self, processes):
+            started.append(processes)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *args):
+            pass
+
+        def map(self, fn, items, chunksize=1):
+            return [fn(item) for item in items]
+
+    monkeypatch.setattr(document_module, "Pool", FakePool)
+
+    paths = []
+
+    for i in range(40):
+        f = tmp_path / f"{i}.md"
+        f.write_text(f"# Document {i}\n", encoding="utf-8")
+        paths.append(f)
+
+    # a few files are scanned in the current process
+    load_corpus(paths[:3], workers=8)
+    assert started == []
+
+    # the pool isn't larger than the number of files
+    monkeypatch.setattr(document_module, "POOL_MIN_FILES", 2)
+
+    documents = load_corpus(paths[:3], workers=8)
+    assert started == [3]
+    assert documents[2].headers == {1: [(0, "Document 2")]}
+
+    load_corpus(paths, workers=8)
+    assert started == [3, 8]
+
+
+def test_markdown_document_invalidate(tmp_path):
+
+    f = tmp_path / "index.md"
+    f.write_text("# Index\n", encoding="utf-8")
+
+    md = load_corpus([f], workers=1)[0]
+    assert md.links[0] == []
+
+    md.contents.extend(["", "[a](./a.md)"])
+    md.invalidate()
+
+    assert len(md.links[0]) == 1
+    assert md.headers == {1: [(0, "Index")]}
+
+
+# -----------
+# AnchorIndex
+
+
+def test_anchor_index(tmp_path):
+
+    a = tmp_path / "a.md"
+    a.write_text(
+        "# A\n\n## Figures {#sec:figures}\n![x](./x.png){#fig:x}\n",
+        encoding="utf-8",
+    )
+
+    b = tmp_path / "b.md"
+    b.write_text("# B\n", encoding="utf-8")
+
+    anchors = AnchorIndex.build(load_corpus([a, b], workers=1))
+
+    assert anchors.get(a) == {"a", "sec:figures", "fig:x"}
+    assert anchors.has_anchor(tmp_path / "x" / ".." / "b.md", "b")
+    assert anchors.has_anchor(b, "a") is False
+    assert anchors.has_anchor(tmp_path / "c.md", "c") is None
+
+    # the index is sent to the worker processes
+    assert pickle.loads(pickle.dumps(anchors)).get(a) == anchors.get(a)
+
+    assert validate_relative_url("./a.md#fig:x", document=b, anchors=anchors) is None
+    assert validate_relative_url("#b", document=b, anchors=anchors) is None
+
+    assert (
+        validate_relative_url("./a.md#missing", document=b, anchors=anchors)
+        == "Broken - Section Anchor!"
+    )
+
+    assert validate_relative_url("#a", document=b, anchors=anchors) == (
+        "Broken - Section Anchor!"
+    )
+
+    # without the index, only the file is checked
+    assert validate_relative_url("./a.md#missing", document=b) is None
+
+
+def test_anchor_index_symlink(tmp_path):
+
+    documents = tmp_path / "documents"
+    documents.mkdir()
+
+    (documents / "a.md").write_text("# A\n", encoding="utf-8")
+    (documents / "b.md").write_text("# B\n", encoding="utf-8")
+
+    link = tmp_path / "link"
+    link.symlink_to(documents, target_is_directory=True)
+
+    a = link / "a.md"
+    b = link / "b.md"
+
+    # the documents keep the paths through the symlinked folder
+    anchors = AnchorIndex.build([MarkdownDocument(a), MarkdownDocument(b)])
+
+    assert validate_relative_url("./a.md#a", document=b, anchors=anchors) is None
+
+    # the target is found in the index through the symlinked folder
+    assert (
+        validate_relative_url("./a.md#missing", document=b, anchors=anchors)
+        == "Broken - Section Anchor!"
+    )
+
+
+# -----------
+# Streaming
+
+
+def test_markdown_document_stream(tmp_path):
+
+    f = tmp_path / "large.md"
+    f.write_text(
+        "---\n"
+        "title: Large\n"
+        "---\n"
+        "# Header\n"
+        "```\n"
+        "[not a link](./a.md)\n"
+        "```\n"
+        "[a](./a.md) and [b](./b.md#b)\n",
+        encoding="utf-8",
+    )
+
+    md = MarkdownDocument(f, streaming=True)
+
+    assert [state for _, _, state in md.stream()] == [
+        "yaml",
+        "yaml",
+        "yaml",
+        None,
+        "code",
+        "code",
+        "code",
+        None,
+    ]
+
+    reference = MarkdownDocument(f)
+
+    assert md.scan == reference.scan
+    assert md.yaml_value("title") == "Large"
+    assert md.yaml_block == {"title": "Large"}
+
+    # the contents were never loaded
+    assert "contents" not in md.__dict__
+
+    out = tmp_path / "staged.md"
+
+    with out.open("w", encoding="utf-8") as fo:
+        md.write(
+            fo,
+            transform=lambda line: line.replace(".md", ".html"),
+            lines={i for i, _ in md.relative_links()},
+        )
+
+    staged = out.read_text(encoding="utf-8").splitlines()
+
+    assert staged[5] == "[not a link](./a.md)"
+    assert staged[7] == "[a](./a.html) and [b](./b.html#b)"
+    assert "contents" not in md.__dict__
+
+    # changed contents are streamed instead of the file
+    md.contents[3] = "# Changed\n"
+
+    assert next(line for i, line, _ in md.stream() if i == 3) == "# Changed\n"
+
+
+# -----------
+# refresh
+
+
+def touch(f, text):
+    """
+    Write the file and make sure the modification time moves forward,
+    some file systems have a coarse resolution.
+    """
+
+    st = f.stat()
+    f.write_text(text, encoding="utf-8")
+    os.utime(f, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+
+@pytest.mark.parametrize("memory_map", [False, True])
+def test_markdown_document_refresh(tmp_path, memory_map):
+
+    f = tmp_path / "a.md"
+    f.write_text("# A\n", encoding="utf-8")
+
+    md = MarkdownDocument(f, memory_map=memory_map)
+
+    # nothing has been read
+    assert md.stamp is None
+    assert not md.refresh()
+
+    assert md.headers == {1: [(0, "A")]}
+    assert md.stamp is not None
+    assert not md.refresh()
+    assert "scan" in md.__dict__
+
+    touch(f, "# B\n\n[c](./c.md)\n")
+
+    assert md.refresh()
+    assert "contents" not in md.__dict__
+    assert "scan" not in md.__dict__
+
+    assert md.headers == {1: [(0, "B")]}
+    assert len(md.contents) == 3
+    assert not md.refresh()
+
+
+@pytest.mark.parametrize("memory_map", [False, True])
+def test_markdown_document_refresh_line_look_up(tmp_path, memory_map):
+
+    f = tmp_path / "a.md"
+    f.write_text("# A\n[x](b.md)\n", encoding="utf-8")
+
+    md = MarkdownDocument(f, memory_map=memory_map)
+
+    assert md.line_look_up == {"# A\n": [0], "[x](b.md)\n": [1]}
+
+    touch(f, "# A\n\ntext\n[x](b.md)\n[y](c.md)\n")
+
+    assert md.refresh()
+
+    assert [line for line, _ in md.relative_links()] == [3, 4]
+    assert md.line_look_up["[x](b.md)\n"] == [3]
+    assert md.line_look_up["[y](c.md)\n"] == [4]
+
+
+def test_document_store_refresh(tmp_path):
+
+    files = []
+
+    for name in ("a.md", "b.md", "c.md"):
+        f = tmp_path / name
+        f.write_text(f"# {name}\n", encoding="utf-8")
+        files.append(f)
+
+    cache = ParseCache(tmp_path / "cache")
+    store = DocumentStore(cache=cache)
+
+    documents = load_corpus(files, workers=1, store=store)
+
+    assert all(md.stamp is not None for md in documents)
+
+    assert store.refresh() == {"checked": 3, "changed": 0, "removed": 0}
+
+    touch(files[1], "# Changed\n")
+    files[2].unlink()
+
+    assert store.refresh() == {"checked": 3, "changed": 1, "removed": 1}
+
+    assert len(store) == 2
+    assert files[2] not in store
+    assert documents[1].headers == {1: [(0, "Changed")]}
+    assert documents[0].headers == {1: [(0, "a.md")]}
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+
+"""
+-----------
+SPDX-License-Identifier: MIT
+Copyright (c) 2021 Troy Williams
+
+uuid       = 9a5c7f12-0d1c-11ec-9a03-0242ac130003
+author     = Troy Williams
+email      = troy.williams@bluebill.net
+date       = 2021-08-30
+-----------
+"""
+
+import sys
+
+import pytest
+
+from documentos.documentos.executor import run_process, run_jobs
+
+# -----------
+# run_process
+
+
+def test_run_process():
+
+    result = run_process(
+        [
+            sys.executable,
+            "-c",
+            "import sys; print('out'); print('err', file=sys.stderr); sys.exit(3)",
+        ]
+    )
+
+    assert result.returncode == 3
+    assert result.stdout == "out\n"
+    assert result.stderr == "err\n"
+    assert result.elapsed > 0
+
+
+def test_run_process_stdin():
+
+    def write(fo):
+        for line in ["é\n"] * 100000:
+            fo.write(line)
+
+    # the process writes more than a pipe buffer to STDERR before it reads
+    result = run_process(
+        [
+            sys.executable,
+            "-c",
+            "import sys; sys.stderr.write('x' * 200000); "
+            "data = sys.stdin.buffer.read(); print(len(data))",
+        ],
+        stdin=write,
+    )
+
+    assert result.returncode == 0
+    assert result.stdout.strip() == str(len("é\n".encode("utf-8")) * 100000)
+    assert len(result.stderr) == 200000
+
+
+def test_run_process_missing_command():
+
+    result = run_process(["documentos-command-does-not-exist"])
+
+    assert result.returncode == 127
+    assert result.stderr
+
+
+# -----------
+# run_jobs
+
+
+def test_run_jobs():
+
+    started = []
+
+    def fn(job):
+        started.append(job)
+        return job * 10
+
+    jobs = [2, 5, 1, 4]
+
+    # the results are in the order of the jobs
+    assert run_jobs(jobs, fn, workers=1, size=lambda job: job) == [20, 50, 10, 40]
+
+    # the largest jobs are started first
+    assert started == [5, 4, 2, 1]
+
+    assert run_jobs([], fn) == []
+
+
+def test_run_jobs_exception():
+
+    def fn(job):
+        if job == 2:
+            raise ValueError(job)
+
+        return job
+
+    with pytest.raises(ValueError):
+        run_jobs([1, 2, 3], fn, workers=2)
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+
+"""
+-----------
+SPDX-License-Identifier: MIT
+Copyright (c) 2021 Troy Williams
+
+uuid       = 4e7b1d38-0de2-11ec-9a03-0242ac130003
+author     = Troy Williams
+email      = troy.williams@bluebill.net
+date       = 2021-08-31
+-----------
+"""
+
+import json
+import sys
+
+from documentos.documentos.document import DocumentStore
+from documentos.documentos.build_manifest import OutputCache
+
+from documentos.tools.html import select_documents, process_pandoc
+
+import documentos.plugins.json_plugins  # noqa: F401 - registers the plugins
+import documentos.plugins.nav_plugins  # noqa: F401
+
+from documentos.tools.plugins import registered_pluggins
+
+
+def make_documents(tmp_path):
+
+    root = tmp_path / "docs"
+    (root / "chapter_1").mkdir(parents=True)
+    (root / "chapter_2").mkdir()
+
+    files = {
+        "index.md": "---\nUUID: 1\ntitle: Index\n---\n# Index\n",
+        "chapter_1/intro.md": "---\nUUID: 2\ntitle: Intro\n---\n# Intro\n",
+        "chapter_2/a.md": "---\nUUID: 3\ntitle: A\n---\n# A\n",
+        "chapter_2/b.md": "---\nUUID: 4\ntitle: B\n---\n# B\n",
+    }
+
+    for name, text in files.items():
+        (root / name).write_text(text, encoding="utf-8")
+
+    store = DocumentStore()
+
+    return root, [store.get(root.joinpath(name).resolve()) for name in files]
+
+
+# -----------
+# select_documents
+
+
+def test_select_documents(tmp_path, monkeypatch):
+
+    root, documents = make_documents(tmp_path)
+
+    root = root.resolve()
+
+    def names(selected):
+        return sorted(f.relative_to(root).as_posix() for f in selected)
+
+    monkeypatch.chdir(tmp_path)
+
+    # a path relative to the current folder
+    assert names(select_documents(documents, ["docs/index.md"], root)) == ["index.md"]
+
+    # a folder
+    assert names(select_documents(documents, ["docs/chapter_2"], root)) == [
+        "chapter_2/a.md",
+        "chapter_2/b.md",
+    ]
+
+    # globs relative to the documents folder
+    assert names(select_documents(documents, ["chapter_*/*.md", "index.md"], root)) == [
+        "chapter_1/intro.md",
+        "chapter_2/a.md",
+        "chapter_2/b.md",
+        "index.md",
+    ]
+
+    assert select_documents(documents, ["missing.md"], root) == set()
+
+
+# -----------
+# process_pandoc
+
+
+def test_process_pandoc_linked_output(tmp_path):
+
+    of = tmp_path / "a.html"
+    of.write_text("cached\n", encoding="utf-8")
+
+    cache = OutputCache(tmp_path / "cache", link=True)
+    cache.store("aa01", of)
+
+    # writes the output in place, the same as `pandoc -o`
+    cmd = [
+        sys.executable,
+        "-c",
+        f"open({str(of)!r}, 'w').write('built\\n')",
+    ]
+
+    # a build with the cache disabled
+    result = process_pandoc(("a.md", cmd, 0, None, of, None, None))
+
+    assert result.status == "built"
+    assert of.read_text(encoding="utf-8") == "built\n"
+
+    # the linked cache entry is untouched
+    assert cache._entry("aa01").read_text(encoding="utf-8") == "cached\n"
+
+
+# -----------
+# Plugins - incremental update
+
+
+def test_json_minimum_update(tmp_path):
+
+    root, documents = make_documents(tmp_path)
+
+    root = root.resolve()
+
+    plugin = registered_pluggins["json document"]["JSON Minimum"]
+
+    previous = plugin(documents=documents, root=root)
+
+    # the previous document has stale contents for the unchanged documents,
+    # they are kept as is
+    data = json.loads(previous)
+    data[0]["contents"] = "stale"
+    data[1]["contents"] = "stale"
+
+    # chapter_2/b.md is no longer part of the build
+    updated = json.loads(
+        plugin.update(
+            json.dumps(data),
+            documents=documents[:3],
+            changed={documents[1]},
+            root=root,
+        )
+    )
+
+    assert [d["file"] for d in updated] == ["index.md", "chapter_1/intro.md", "chapter_2/a.md"]
+    assert updated[0]["contents"] == "stale"
+    assert "Intro" in updated[1]["contents"]
+    assert updated[2] == data[2]
+
+
+def test_csv_navigation_update(tmp_path):
+
+    root, documents = make_documents(tmp_path)
+
+    root = root.resolve()
+
+    output = tmp_path / "output"
+    output.mkdir()
+
+    plugin = registered_pluggins["navigation"]["CSV Navigation"]
+
+    # no previous file, everything is generated
+    plugin.update(document_root=root, output=output, documents=documents, changed=set())
+
+    full = (output / "url_map.csv").read_text(encoding="utf-8")
+
+    assert full.count("\n") == 5
+
+    (root / "index.md").write_text("---\nUUID: 1\ntitle: Home\n---\n# Index\n", encoding="utf-8")
+
+    store = DocumentStore()
+    documents = [store.get(md.filename) for md in documents]
+
+    # only the changed documents are read
+    plugin.update(document_root=root, output=output, documents=documents, changed=set())
+
+    assert (output / "url_map.csv").read_text(encoding="utf-8") == full
+
+    plugin.update(
+        document_root=root, output=output, documents=documents, changed={documents[0]}
+    )
+
+    assert "Home" in (output / "url_map.csv").read_text(encoding="utf-8")
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+
+"""
+-----------
+SPDX-License-Identifier: MIT
+Copyright (c) 2021 Troy Williams
+
+uuid       = 9a4c7e12-0b17-11ec-9a03-0242ac130003
+author     = Troy Williams
+email      = troy.williams@bluebill.net
+date       = 2021-08-27
+-----------
+"""
+
+import os
+
+import pytest
+
+from documentos.documentos.discovery import discover
+from documentos.documentos.cache import LinkIndexCache
+
+from documentos.documentos.link_index import (
+    Edge,
+    LinkIndex,
+    link_target,
+)
+
+# -----------
+# link_target
+
+data = []
+data.append(("index.md", "./a.md", "a.md"))
+data.append(("index.md", "", "index.md"))
+data.append(("en/ch1/index.md", "../ch2/./b.md", "en/ch2/b.md"))
+data.append(("en/ch1/index.md", "sub/../c.md", "en/ch1/c.md"))
+data.append(("index.md", "../outside.md", "../outside.md"))
+
+
+@pytest.mark.parametrize("data", data)
+def test_link_target(data):
+
+    source, md, result = data
+
+    assert link_target(source, md) == result
+
+
+# -----------
+# LinkIndex
+
+
+def write_corpus(root):
+
+    (root / "ch1").mkdir()
+    (root / "ch2").mkdir()
+
+    (root / "index.md").write_text(
+        "# Index\n\n[one](./ch1/a.md#a) [two](ch2/b.md)\n", encoding="utf-8"
+    )
+
+    (root / "ch1" / "a.md").write_text(
+        "# A\n\n[b](./b.md)\n[two](../ch2/b.md#b)\n[top](#a)\n", encoding="utf-8"
+    )
+
+    (root / "ch1" / "b.md").write_text("# B\n\n[index](../index.md)\n", encoding="utf-8")
+
+    (root / "ch2" / "b.md").write_text("# B\n", encoding="utf-8")
+
+
+def test_link_index(tmp_path):
+
+    write_corpus(tmp_path)
+
+    index = LinkIndex(tmp_path)
+
+    counts = index.refresh(discover(tmp_path, extensions=[".md"]))
+
+    assert counts == {"added": 4, "updated": 0, "removed": 0, "unchanged": 0}
+
+    assert index.incoming("ch2/b.md") == [
+        Edge("ch1/a.md", "ch2/b.md", 3, "b"),
+        Edge("index.md", "ch2/b.md", 2, None),
+    ]
+
+    # absolute paths and un-normalized keys are the same document
+    assert index.incoming(tmp_path / "ch1" / "a.md") == index.incoming("ch2/../ch1/a.md")
+
+    assert [e.target for e in index.outgoing("ch1/a.md")] == [
+        "ch1/b.md",
+        "ch2/b.md",
+        "ch1/a.md",
+    ]
+
+    incoming, outgoing = index.affected_by_move("ch1")
+
+    assert [(e.source, e.target) for e in incoming] == [("index.md", "ch1/a.md")]
+
+    assert [(e.source, e.target) for e in outgoing] == [
+        ("ch1/a.md", "ch2/b.md"),
+        ("ch1/b.md", "index.md"),
+    ]
+
+
+def test_link_index_refresh(tmp_path):
+
+    write_corpus(tmp_path)
+
+    index = LinkIndex(tmp_path)
+    index.refresh(discover(tmp_path, extensions=[".md"]))
+
+    b = tmp_path / "ch2" / "b.md"
+    b.write_text("# B\n\n[a](../ch1/a.md)\n", encoding="utf-8")
+
+    st = b.stat()
+    os.utime(b, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+    (tmp_path / "ch1" / "b.md").unlink()
+
+    counts = index.refresh(discover(tmp_path, extensions=[".md"]))
+
+    assert counts == {"added": 0, "updated": 1, "removed": 1, "unchanged": 2}
+
+    assert "ch1/b.md" not in index
+    assert [e.source for e in index.incoming("index.md")] == []
+    assert [e.source for e in index.incoming("ch1/a.md")] == ["ch1/a.md", "ch2/b.md", "index.md"]
+
+    # the broken link from ch1/a.md is still indexed
+    assert [e.source for e in index.incoming("ch1/b.md")] == ["ch1/a.md"]
+
+
+def test_link_index_cache(tmp_path):
+
+    root = tmp_path / "docs"
+    root.mkdir()
+
+    write_corpus(root)
+
+    cache = LinkIndexCache(tmp_path / "cache")
+
+    assert cache.load(root) is None
+
+    index = LinkIndex(root)
+    index.refresh(discover(root, extensions=[".md"]))
+
+    cache.store(index)
+
+    loaded = cache.load(root)
+
+    assert loaded.to_json() == index.to_json()
+    assert loaded.incoming("ch2/b.md") == index.incoming("ch2/b.md")
+
+    counts = loaded.refresh(discover(root, extensions=[".md"]))
+
+    assert counts["unchanged"] == 4
@@ -17,8 +17,16 @@ date       = 2020-12-01
 
 import pytest
 
+from pathlib import Path
+
 from documentos.documentos.markdown import section_to_anchor, find_atx_header
 
+from documentos.documentos.markdown import (
+    section_anchors,
+    corpus_section_anchors,
+    clean_atx_header_text,
+)
+
 from documentos.documentos.markdown import (
     extract_markdown_links,
     extract_relative_markdown_links,
@@ -26,6 +34,17 @@ from documentos.documentos.markdown import (
     extract_relative_markdown_image_links,
 )
 
+from documentos.documentos.markdown import (
+    scan_markdown,
+    scan_anchors,
+    find_all_atx_headers,
+    extract_all_markdown_links,
+    extract_yaml,
+    load_yaml_lines,
+    find_yaml_value,
+    YAML_PARSE_REQUIRED,
+)
+
 # -----------
 # Test find_atx_header
 
@@ -416,3 +435,233 @@ def test_extract_relative_markdown_image_links(data):
         assert r["full"] == o["full"]
         assert r["caption"] == o["caption"]
         assert r["url"] == o["url"]
+
+
+# ----------
+# scan_markdown
+
+sample_documents = sorted(
+    Path(__file__).parent.parent.joinpath("en/documents").glob("*.md")
+)
+
+
+@pytest.mark.parametrize("path", sample_documents, ids=lambda p: p.name)
+def test_scan_markdown_matches_individual_passes(path):
+
+    contents = path.read_text(encoding="utf-8").splitlines(keepends=True)
+
+    scan = scan_markdown(contents)
+
+    assert scan.headers == find_all_atx_headers(contents, include_line_numbers=True)
+
+    assert (
+        scan.all_links,
+        scan.absolute_links,
+        scan.relative_links,
+        scan.image_links,
+    ) == extract_all_markdown_links(contents)
+
+    _, yaml_lines = extract_yaml(contents, include_block_locations=True)
+    assert scan.yaml_lines == yaml_lines
+
+
+def test_scan_markdown_fences():
+
+    contents = [
+        "---\n",
+        "title: Test\n",
+        "...\n",
+        "\n",
+        "# Header [link](./a.md#b)\n",
+        "```python\n",
+        "# not a header\n",
+        "```\n",
+        "## Second ![img](./x.png)\n",
+        "~~~\n",
+        "# unclosed\n",
+    ]
+
+    scan = scan_markdown(contents)
+
+    assert scan.fences == [(0, 2, "yaml"), (5, 7, "code"), (9, 10, "code")]
+    assert scan.yaml_lines == [1]
+    assert scan.headers == [(4, 1, "Header [link](./a.md#b)"), (8, 2, "Second ![img](./x.png)")]
+    assert [i for i, _ in scan.relative_links] == [4]
+    assert [i for i, _ in scan.image_links] == [8]
+
+
+def test_scan_markdown_empty():
+
+    scan = scan_markdown(None)
+
+    assert scan.headers == []
+    assert scan.all_links == []
+    assert scan.fences == []
+    assert scan.text_lines == 0
+    assert scan.prefiltered == 0
+
+
+def test_scan_markdown_prefilter():
+
+    contents = [
+        "Plain prose without any links.\n",
+        "```\n",
+        "[code](./not-scanned.md)\n",
+        "```\n",
+        "A [link](./a.md) and ![image](./b.png)\n",
+        "Brackets [but] (no link)\n",
+        "# Header\n",
+    ]
+
+    scan = scan_markdown(contents)
+
+    assert scan.text_lines == 4
+    assert scan.prefiltered == 3
+    assert [i for i, _ in scan.all_links] == [4]
+    assert [i for i, _ in scan.image_links] == [4]
+
+
+def test_scan_anchors():
+
+    contents = [
+        "# Overview\n",
+        "# Overview\n",
+        "## Equations {#sec:equations}\n",
+        "![A figure](./a.png){#fig:a width=50%}\n",
+        "$$ y = mx + b $$ {#eq:line}\n",
+        "Table: The caption. {#tbl:values}\n",
+        "```\n",
+        "![not a figure](./b.png){#fig:b}\n",
+        "```\n",
+        "[a link](#overview) with {braces} but no id\n",
+    ]
+
+    scan = scan_markdown(contents)
+
+    assert scan.attribute_ids == [
+        (2, "sec:equations"),
+        (3, "fig:a"),
+        (4, "eq:line"),
+        (5, "tbl:values"),
+    ]
+
+    assert scan_anchors(scan) == {
+        "overview",
+        "overview-1",
+        "sec:equations",
+        "fig:a",
+        "eq:line",
+        "tbl:values",
+    }
+
+
+# -----------
+# Test find_yaml_value
+
+yaml_lines = [
+    "title: A Simple Title\n",
+    "UUID: 0a1b2c3d-341d-11eb-bf3c-ab85e03a1801 # a comment\n",
+    "version: 1.2\n",
+    "tags:\n",
+    "  - one\n",
+    "  - two\n",
+    "summary: starts on this line\n",
+    "  and continues on this one\n",
+    "quoted: 'a quoted string'\n",
+    "author: Troy Williams\t# a comment after a tab\n",
+    "title: The Last Title Wins\n",
+]
+
+data = []
+
+data.append(("title", "The Last Title Wins"))
+data.append(("UUID", "0a1b2c3d-341d-11eb-bf3c-ab85e03a1801"))
+data.append(("missing", None))
+data.append(("version", YAML_PARSE_REQUIRED))
+data.append(("tags", YAML_PARSE_REQUIRED))
+data.append(("summary", YAML_PARSE_REQUIRED))
+data.append(("quoted", YAML_PARSE_REQUIRED))
+data.append(("author", "Troy Williams"))
+
+
+@pytest.mark.parametrize("data", data)
+def test_find_yaml_value(data):
+
+    key, result = data
+
+    value = find_yaml_value(yaml_lines, key)
+
+    assert value is result or value == result
+
+    # anything the scan answers must agree with the full parse
+    if value is not YAML_PARSE_REQUIRED:
+        assert value == load_yaml_lines(yaml_lines).get(key)
+
+
+def test_find_yaml_value_complex_keys():
+
+    lines = [
+        "title: A Title\n",
+        "? complex key\n",
+        ": value\n",
+    ]
+
+    assert find_yaml_value(lines, "title") is YAML_PARSE_REQUIRED
+    assert find_yaml_value([], "title", default="") == ""
+
+
+# -----------
+# Test section_anchors
+
+data = []
+
+data.append(
+    (
+        ["Overview", "Parameters", "Overview", "Overview"],
+        ["overview", "parameters", "overview-1", "overview-2"],
+    )
+)
+
+# explicit identifiers aren't renamed and auto identifiers avoid them
+data.append(
+    (
+        ["Overview {#overview-1}", "Overview", "Overview"],
+        ["overview-1", "overview", "overview-2"],
+    )
+)
+
+data.append(
+    (
+        ["[Links](./a.md) Are Removed", "Links Are Removed"],
+        ["links-are-removed", "links-are-removed-1"],
+    )
+)
+
+
+@pytest.mark.parametrize("data", data)
+def test_section_anchors(data):
+
+    texts, anchors = data
+
+    results = section_anchors(texts)
+
+    assert [r.anchor for r in results] == anchors
+    assert [r.title for r in results] == [clean_atx_header_text(t) for t in texts]
+
+
+def test_corpus_section_anchors():
+
+    corpus = {
+        "a.md": ["Overview", "Overview"],
+        "b.md": ["Overview"],
+    }
+
+    results = corpus_section_anchors(corpus)
+
+    # de-duplication is per document
+    assert [r.anchor for r in results["a.md"]] == ["overview", "overview-1"]
+    assert [r.anchor for r in results["b.md"]] == ["overview"]
+
+    # repeated headers are memoized
+    info = section_to_anchor.cache_info()
+    assert info.hits > 0
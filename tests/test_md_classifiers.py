@@ -22,9 +22,13 @@ from documentos.documentos.markdown_classifiers import (
     RelativeMarkdownURLRule,
     MarkdownImageRule,
     ATXHeaderRule,
+    AnyATXHeaderRule,
     CodeFenceClassifier,
     HTMLImageRule,
     YamlBlockClassifier,
+    LRUCache,
+    RuleRegistry,
+    shared_rule,
 )
 
 # -------------
@@ -742,6 +746,51 @@ def test_atxheader_rule_1_data(data):
     assert rule.is_full_match == False
 
 
+# -----------
+# Test - AnyATXHeaderRule - Extract Data
+
+data = []
+data.append(("# Test", (1, "Test")))
+data.append(("## Hello World", (2, "Hello World")))
+data.append(("   ###### six", (6, "six")))
+data.append(("## # Header Level 3", (2, "# Header Level 3")))
+data.append(("# #Admin - Test", (1, "#Admin - Test")))
+data.append(("#\n", (1, "")))
+
+data.append(("    # Test     ", None))
+data.append(("####### Seven", None))
+data.append(("##Test", None))
+data.append(("Hello # Test", None))
+data.append(("", None))
+
+
+@pytest.mark.parametrize("data", data)
+def test_any_atxheader_rule_data(data):
+
+    value, result = data
+    rule = AnyATXHeaderRule(key="any")
+
+    assert rule.extract_data(value) == result
+    assert rule.extract_data(value) == result  # test memoization
+    assert rule.match(value) == (result is not None)
+
+
+@pytest.mark.parametrize("data", data)
+def test_any_atxheader_rule_matches_level_rules(data):
+
+    value, _ = data
+
+    expected = None
+    for count in range(1, 7):
+        rule = ATXHeaderRule(count=count)
+
+        if rule.match(value):
+            expected = (count, rule.extract_data(value))
+            break
+
+    assert AnyATXHeaderRule().extract_data(value) == expected
+
+
 # ----------------
 # Test - CodeFenceClassifier
 
@@ -925,3 +974,111 @@ def test_yamlblockclassifier(data):
     assert rule.match(value) == result  # test memoization
 
     assert rule.is_full_match == True
+
+
+# -------------
+# Test - LRUCache and the rule memoization
+
+
+def test_lru_cache_eviction():
+
+    cache = LRUCache(maxsize=2)
+
+    cache.store("a", 1)
+    cache.store("b", None)
+
+    assert cache.lookup("a") == 1  # "a" is now the most recently used
+    assert cache.lookup("b") is None  # None is a valid cached value
+
+    cache.store("c", 3)  # evicts "a"
+
+    assert "a" not in cache
+    assert cache.lookup("a") is LRUCache.missing
+    assert cache.lookup("c") == 3
+
+    info = cache.info()
+
+    assert info.hits == 3
+    assert info.misses == 1
+    assert info.evictions == 1
+    assert info.maxsize == 2
+    assert info.currsize == 2
+
+
+def test_lru_cache_disabled():
+
+    cache = LRUCache(maxsize=0)
+
+    cache.store("a", 1)
+
+    assert len(cache) == 0
+    assert cache.lookup("a") is LRUCache.missing
+
+
+def test_lru_cache_invalid_size():
+
+    with pytest.raises(ValueError):
+        LRUCache(maxsize=-1)
+
+
+def test_rule_cache_info():
+
+    rule = MarkdownLinkRule(cache_size=2)
+
+    for line in ["[a](b)", "[a](b)", "no link", "[c](d)", "[e](f)"]:
+        rule.match(line)
+
+    info = rule.cache_info()
+
+    assert info.hits == 1
+    assert info.misses == 4
+    assert info.evictions == 2
+    assert info.currsize == 2
+
+    rule.cache_clear()
+
+    assert rule.cache_info().currsize == 0
+    assert rule.cache_info().hits == 0
+
+
+# -------------
+# Test - RuleRegistry
+
+
+def test_rule_registry_shares_instances():
+
+    registry = RuleRegistry()
+
+    rule = registry.get(MarkdownLinkRule)
+
+    assert registry.get(MarkdownLinkRule) is rule
+    assert registry.get(MarkdownLinkRule, cache_size=8) is not rule
+    assert registry.get(MarkdownLinkRule, cache_size=8).cache_info().maxsize == 8
+    assert len(registry) == 2
+
+    rule.match("[a](b)")
+
+    assert registry.cache_info()["MarkdownLinkRule"].misses == 1
+
+
+def test_rule_registry_threads():
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    registry = RuleRegistry()
+
+    def worker(i):
+        rule = registry.get(MarkdownLinkRule, cache_size=16)
+        rule.match(f"[{i % 32}](./file.md)")
+        return rule
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        rules = list(executor.map(worker, range(2000)))
+
+    assert all(r is rules[0] for r in rules)
+    assert rules[0].cache_info().currsize == 16
+
+
+def test_shared_rule():
+
+    assert shared_rule(AbsoluteURLRule) is shared_rule(AbsoluteURLRule)
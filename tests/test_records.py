@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+
+"""
+-----------
+SPDX-License-Identifier: MIT
+Copyright (c) 2021 Troy Williams
+
+uuid       = 7c5e0e2a-fe9c-11eb-9a03-0242ac130003
+author     = Troy Williams
+email      = troy.williams@bluebill.net
+date       = 2021-08-16
+-----------
+"""
+
+import json
+import pickle
+
+import pytest
+
+from documentos.documentos.records import (
+    Link,
+    RelativeLink,
+    ImageLink,
+    Header,
+    link_record,
+)
+
+from documentos.documentos.markdown import (
+    scan_markdown,
+    scan_to_json,
+    scan_from_json,
+)
+
+# -----------
+# Dictionary compatibility
+
+data = []
+
+data.append(
+    (
+        Link("[a](./a.md)", "a", "./a.md"),
+        {"full": "[a](./a.md)", "text": "a", "url": "./a.md"},
+    )
+)
+
+data.append(
+    (
+        RelativeLink("[a](./a.md#b)", "a", "./a.md#b", (0, 6), "./a.md", (6, 8), "#b"),
+        {
+            "full": "[a](./a.md#b)",
+            "text": "a",
+            "url": "./a.md#b",
+            "md_span": (0, 6),
+            "md": "./a.md",
+            "section_span": (6, 8),
+            "section": "#b",
+        },
+    )
+)
+
+data.append(
+    (
+        ImageLink("![c](./c.png)", "c", "./c.png"),
+        {"full": "![c](./c.png)", "caption": "c", "url": "./c.png"},
+    )
+)
+
+
+@pytest.mark.parametrize("data", data)
+def test_record_dictionary_access(data):
+
+    record, d = data
+
+    assert record == d
+    assert dict(record) == d
+    assert record["url"] == d["url"]
+    assert record.get("missing") is None
+    assert "url" in record
+    assert record | {} == d
+
+    with pytest.raises(KeyError):
+        record["missing"]
+
+    with pytest.raises(AttributeError):
+        record.url = "./other.md"
+
+    assert pickle.loads(pickle.dumps(record)) == record
+    assert link_record(json.loads(json.dumps(dict(record)))) == record
+
+    # no per-instance dictionary
+    assert not hasattr(record, "__dict__")
+
+
+def test_record_interned():
+
+    url = "".join(["./a", ".md"])
+
+    a = Link("[a](./a.md)", "a", url).interned()
+    b = Link("[b](./a.md)", "b", "".join(["./", "a.md"])).interned()
+
+    assert a.url is b.url
+
+
+def test_header():
+
+    header = Header(3, 1, "Title")
+
+    line, depth, text = header
+
+    assert (line, depth, text) == (3, 1, "Title")
+    assert header == (3, 1, "Title")
+    assert header[2] == "Title"
+    assert pickle.loads(pickle.dumps(header)) == header
+
+
+def test_scan_json_round_trip():
+
+    contents = [
+        "# Title\n",
+        "[a](./a.md#b) [c](https://example.com) ![d](./d.png)\n",
+    ]
+
+    scan = scan_markdown(contents, intern_urls=True)
+
+    restored = scan_from_json(json.loads(json.dumps(scan_to_json(scan))))
+
+    assert restored == scan
+    assert isinstance(restored.relative_links[0][1], RelativeLink)
+    assert isinstance(restored.image_links[0][1], ImageLink)
+    assert isinstance(restored.headers[0], Header)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+
+"""
+-----------
+SPDX-License-Identifier: MIT
+Copyright (c) 2021 Troy Williams
+
+uuid       = 6c1f2b0e-0a4d-11ec-9a03-0242ac130003
+author     = Troy Williams
+email      = troy.williams@bluebill.net
+date       = 2021-08-26
+-----------
+"""
+
+import pickle
+
+from documentos.documentos.cache import ParseCache
+
+from documentos.tools.validate import (
+    ValidationResult,
+    multiprocessing_wrapper,
+)
+
+# -----------
+# multiprocessing_wrapper
+
+
+def test_validation_result(tmp_path):
+
+    root = tmp_path / "docs"
+    root.mkdir()
+
+    a = root / "a.md"
+    a.write_text(
+        "---\nUUID: abc\n---\n# A\n\n[b](./b.md) [x](./missing.md)\n![i](./none.png)\n",
+        encoding="utf-8",
+    )
+
+    (root / "b.md").write_text("# B\n", encoding="utf-8")
+
+    cache = ParseCache(tmp_path / "cache")
+
+    result = multiprocessing_wrapper(root, {"cache": cache}, a)
+
+    assert isinstance(result, ValidationResult)
+    assert result.filename == a
+    assert len(result.url_messages) == 1
+    assert "missing.md" in result.url_messages[0]
+    assert len(result.image_messages) == 1
+    assert result.yaml_block
+    assert result.uuid == "abc"
+    assert result.text_lines == 4
+    assert result.links == 3
+
+    # The result is what is pickled back to the parent, not the document
+    assert pickle.loads(pickle.dumps(result)) == result
+
+    # The worker filled the cache
+    assert cache.stats()["entries"] == 1
+
+    result = multiprocessing_wrapper(root, {}, root / "b.md")
+
+    assert not result.yaml_block
+    assert result.uuid is None